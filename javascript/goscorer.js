@@ -241,6 +241,50 @@ function areaScoring(
 }
 
 
+// Layout of an encoded scoring result, see ScoringResult.encode in the Python version: a version byte, then ysize
+// and xsize as one byte each, then one plane for each of these fields in order, packing the field's value for each
+// location with the given number of bits, in row-major order, with the first location of each byte in its lowest bits.
+const ENCODED_SCORING_VERSION = 1;
+const ENCODED_LOCSCORE_FIELD_BITS = [
+    ["isTerritoryFor", 2],
+    ["belongsToSekiGroup", 2],
+    ["eyeValue", 2],
+    ["isFalseEye", 1],
+    ["isUnscorableFalseEye", 1],
+    ["isDame", 1],
+];
+
+/**
+ * @param {Uint8Array|ArrayBuffer|number[]} data - a scoring result encoded by ScoringResult.encode in the Python version.
+ * @return {LocScore[][]}
+ */
+function decodeScoring(data) {
+    const bytes = data instanceof ArrayBuffer ? new Uint8Array(data) : data;
+    if(bytes.length < 3 || bytes[0] !== ENCODED_SCORING_VERSION)
+        throw new Error("Not an encoded scoring result of a known version");
+    const ysize = bytes[1];
+    const xsize = bytes[2];
+    const scoring = makeArrayFromCallable(ysize, xsize, () => new LocScore());
+
+    const numLocs = ysize * xsize;
+    let start = 3;
+    for(const [field, bits] of ENCODED_LOCSCORE_FIELD_BITS) {
+        const perByte = 8 / bits;
+        const mask = (1 << bits) - 1;
+        const end = start + Math.ceil(numLocs / perByte);
+        if(end > bytes.length)
+            throw new Error(`Encoded scoring result is too short for a ${ysize}x${xsize} board`);
+        for(let i = 0; i<numLocs; i++) {
+            const value = (bytes[start + Math.floor(i / perByte)] >> (bits * (i % perByte))) & mask;
+            scoring[Math.floor(i / xsize)][i % xsize][field] = bits === 1 ? value === 1 : value;
+        }
+        start = end;
+    }
+    if(start !== bytes.length)
+        throw new Error(`Encoded scoring result is too long for a ${ysize}x${xsize} board`);
+    return scoring;
+}
+
 function getOpp(pla) {
     return 3 - pla;
 }
@@ -1497,6 +1541,7 @@ export {
     finalAreaScore,
     territoryScoring,
     areaScoring,
+    decodeScoring,
 
     // Other utils
     getOpp,
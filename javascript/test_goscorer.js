@@ -1,5 +1,5 @@
 
-import { EMPTY, BLACK, WHITE, string2d2, finalTerritoryScore, finalAreaScore, territoryScoring } from "./goscorer.js";
+import { EMPTY, BLACK, WHITE, string2d2, finalTerritoryScore, finalAreaScore, territoryScoring, decodeScoring } from "./goscorer.js";
 
 function stonesAndMarkedDeadOfStr(stonestr) {
     const rows = stonestr.split("\n").map(row => row.trim()).filter(row => row !== "");
@@ -77,6 +77,29 @@ function testFinalScoring() {
     }
 }
 
+function testDecodeScoring() {
+    let stonestr = `
+    .xo.oxxo.
+    x.o.oxo.o
+    ooooxxob.
+    xxxxxxooo
+    `;
+    let { stones,markedDead } = stonesAndMarkedDeadOfStr(stonestr);
+    // Encoded by ScoringResult.encode in the Python version, see test_encode_scoring there.
+    const hex = "010409000002000200280000a516841aa05a405501410001010100140000000000000000000000000004000000";
+    const data = new Uint8Array(hex.match(/../g).map(byte => parseInt(byte, 16)));
+    console.assert(JSON.stringify(decodeScoring(data)) == JSON.stringify(territoryScoring(stones,markedDead)));
+    console.assert(JSON.stringify(decodeScoring(data.buffer)) == JSON.stringify(territoryScoring(stones,markedDead)));
+
+    let threw = false;
+    try {
+        decodeScoring(data.subarray(0, data.length-1));
+    } catch(e) {
+        threw = true;
+    }
+    console.assert(threw);
+}
+
 function getOutput(stonestr) {
     const { stones, markedDead } = stonesAndMarkedDeadOfStr(stonestr);
     const rows = stonestr.split("\n").map(row => row.trim()).filter(row => row !== "");
@@ -1221,6 +1244,7 @@ function runAllTests() {
 export {
     stonesAndMarkedDeadOfStr,
     testFinalScoring,
+    testDecodeScoring,
     getOutput,
     printTest,
     runTest,
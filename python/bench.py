@@ -1,6 +1,14 @@
-from goscorer import territory_scoring, string2d, string2d2, EMPTY, BLACK, WHITE
+import time
 
-def process(stonestr):
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from goscorer import territory_scoring, final_territory_score, area_scoring, ScoringSession, ScratchPool, string2d, string2d2, EMPTY, BLACK, WHITE
+from goscorer import WALL, get_geometry, flatten_array, make_flat_array, mark_connection_blocks, mark_reachability, mark_regions
+
+def parse(stonestr):
     rows = stonestr.split("\n")
     rows = [row.strip() for row in rows if row.strip() != ""]
     ysize = len(rows)
@@ -20,9 +28,171 @@ def process(stonestr):
             if c == "w":
                 stones[y][x] = WHITE
                 marked_dead[y][x] = True
+    return (stones,marked_dead)
+
+def process(stonestr):
+    stones,marked_dead = parse(stonestr)
     scoring = territory_scoring(stones,marked_dead)
 
-if __name__ == "__main__":
+def mirror_tile(stonestr):
+    """Build a (2n-1)x(2m-1) position out of an nxm one by reflecting it across its last row and column."""
+    rows = [row.strip() for row in stonestr.split("\n") if row.strip() != ""]
+    rows = [row + row[-2::-1] for row in rows]
+    rows = rows + rows[-2::-1]
+    return "\n".join(rows)
+
+def time_per_call(stonestr, num_calls, score_only=False, scratch=None):
+    stones,marked_dead = parse(stonestr)
+    start = time.perf_counter()
+    for i in range(num_calls):
+        if score_only:
+            final_territory_score(stones,marked_dead,0,0,0,scratch=scratch)
+        else:
+            territory_scoring(stones,marked_dead,scratch=scratch)
+    return (time.perf_counter() - start) / num_calls
+
+stonestr_19x19 = """
+....x.xo.o.........
+.x..x.xooo....o....
+....x.xo.o.w.......
+xxxxx.xoooo....o...
+....xxxxxxo........
+..x...x.ooooooo.o..
+......xo.o.....oo..
+.b....xooxoo.o.o...
+......xo.xxo.......
+xxxxxxxoo.xooooooo.
+oooooooxxxxxxxxxxoo
+.o.o..oox.......xo.
+..o.w.ox..x.o...xxo
+ooo...ox........xo.
+.x.o.oox..x..b..xoo
+o.oooxx.........xxo
+.ooxxx..........x.o
+oxx.x....x.....xxoo
+..x........x..x.o..
+"""
+
+stonestr_37x37 = mirror_tile(stonestr_19x19)
+
+def run_per_call_benchmarks():
+    for name, stonestr, num_calls in [
+        ("19x19", stonestr_19x19, 200),
+        ("37x37", stonestr_37x37, 50),
+    ]:
+        seconds = time_per_call(stonestr, num_calls)
+        print(f"territory_scoring {name}: {seconds * 1000.0:.3f} ms per call")
+        seconds = time_per_call(stonestr, num_calls, score_only=True)
+        print(f"final_territory_score {name}: {seconds * 1000.0:.3f} ms per call")
+        seconds = time_per_call(stonestr, num_calls, scratch=ScratchPool())
+        print(f"territory_scoring {name} with ScratchPool: {seconds * 1000.0:.3f} ms per call")
+
+def time_numpy_vs_lists(func, stonestr, num_calls):
+    """Time func on the position given as nested lists and as numpy arrays, alternating between the two
+    for a few rounds and keeping the best round of each, so that both see the same machine load."""
+    stones,marked_dead = parse(stonestr)
+    np_stones,np_marked_dead = np.array(stones,dtype=np.uint8), np.array(marked_dead)
+    best = [float("inf"), float("inf")]
+    for _ in range(3):
+        for (i, (s, m)) in enumerate([(stones,marked_dead), (np_stones,np_marked_dead)]):
+            start = time.perf_counter()
+            for i in range(num_calls):
+                func(s,m)
+            best[i] = min(best[i], (time.perf_counter() - start) / num_calls)
+    return best
+
+def run_numpy_benchmarks():
+    for name, stonestr, num_calls in [
+        ("19x19", stonestr_19x19, 100),
+        ("37x37", stonestr_37x37, 25),
+    ]:
+        for func_name, func in [
+            ("territory_scoring", territory_scoring),
+            ("final_territory_score", lambda stones, marked_dead: final_territory_score(stones,marked_dead,0,0,0)),
+            ("area_scoring", area_scoring),
+        ]:
+            (list_seconds, numpy_seconds) = time_numpy_vs_lists(func, stonestr, num_calls)
+            print(f"{func_name} {name} lists: {list_seconds * 1000.0:.3f} ms, numpy: {numpy_seconds * 1000.0:.3f} ms per call, numpy/lists {numpy_seconds / list_seconds:.2f}")
+
+def time_per_toggle(stonestr, num_toggles):
+    stones,marked_dead = parse(stonestr)
+    session = ScoringSession(stones,marked_dead)
+    stone_locs = [(y,x) for y in range(len(stones)) for x in range(len(stones[y])) if stones[y][x] != EMPTY]
+    start = time.perf_counter()
+    for i in range(num_toggles):
+        (y,x) = stone_locs[(i // 2 * 7) % len(stone_locs)]
+        session.toggle_dead(y,x)
+    return (time.perf_counter() - start) / num_toggles
+
+def run_toggle_benchmarks():
+    for name, stonestr, num_toggles in [
+        ("19x19", stonestr_19x19, 200),
+        ("37x37", stonestr_37x37, 50),
+    ]:
+        seconds = time_per_toggle(stonestr, num_toggles)
+        fresh_seconds = time_per_call(stonestr, num_toggles)
+        print(f"ScoringSession.toggle_dead {name}: {seconds * 1000.0:.3f} ms per toggle, territory_scoring from scratch: {fresh_seconds * 1000.0:.3f} ms per call")
+
+def cells_position(size, spacing):
+    """A size x size board divided by white walls every spacing points into cells of black stones,
+    each with one empty point, so that every cell is its own region."""
+    stones = [[BLACK for x in range(size)] for y in range(size)]
+    for y in range(size):
+        for x in range(size):
+            if y % spacing == 0 or x % spacing == 0:
+                stones[y][x] = WHITE
+            elif y % spacing == 1 and x % spacing == 1:
+                stones[y][x] = EMPTY
+    marked_dead = [[False for x in range(size)] for y in range(size)]
+    return (stones,marked_dead)
+
+def time_mark_regions(stones, marked_dead, num_calls):
+    geom = get_geometry(len(stones),len(stones[0]))
+    stones_flat = flatten_array(geom,stones,WALL)
+    marked_dead_flat = flatten_array(geom,marked_dead,False)
+    connection_blocks = make_flat_array(geom,EMPTY)
+    mark_connection_blocks(geom,stones_flat,marked_dead_flat,connection_blocks)
+    reaches_black = make_flat_array(geom,False)
+    reaches_white = make_flat_array(geom,False)
+    mark_reachability(geom,stones_flat,marked_dead_flat,connection_blocks,reaches_black,reaches_white)
+    start = time.perf_counter()
+    for i in range(num_calls):
+        region_infos_by_id = {}
+        mark_regions(geom,stones_flat,marked_dead_flat,connection_blocks,reaches_black,reaches_white,make_flat_array(geom,-1),region_infos_by_id)
+    return ((time.perf_counter() - start) / num_calls, len(region_infos_by_id))
+
+def run_region_benchmarks():
+    for spacing in [12, 6, 4, 3]:
+        stones,marked_dead = cells_position(37, spacing)
+        seconds, num_regions = time_mark_regions(stones, marked_dead, 20)
+        print(f"mark_regions 37x37 with {num_regions} regions: {seconds * 1000.0:.3f} ms per call, {seconds * 1e6 / num_regions:.2f} us per region")
+
+def large_eye_position(size):
+    """A size x size board split in half, with black living in the top half around one huge eye
+    containing a scattering of dead white stones."""
+    stones = [[EMPTY for x in range(size)] for y in range(size)]
+    marked_dead = [[False for x in range(size)] for y in range(size)]
+    half = size // 2
+    for x in range(size):
+        stones[half][x] = BLACK
+        stones[half+1][x] = WHITE
+    for y in range(0, half, 3):
+        for x in range(1, size, 4):
+            stones[y][x] = WHITE
+            marked_dead[y][x] = True
+    return (stones,marked_dead)
+
+def run_large_eye_benchmarks():
+    for size in [13, 19, 25]:
+        stones,marked_dead = large_eye_position(size)
+        num_calls = 10
+        start = time.perf_counter()
+        for i in range(num_calls):
+            territory_scoring(stones,marked_dead)
+        seconds = (time.perf_counter() - start) / num_calls
+        print(f"territory_scoring {size}x{size} large eye: {seconds * 1000.0:.3f} ms per call")
+
+def run_small_positions():
     for i in range(100):
         stonestr = """
         ......x..
@@ -107,3 +277,14 @@ if __name__ == "__main__":
         o.oxo.......oxw.w
         """
         process(stonestr)
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    run_small_positions()
+    print(f"small positions: {time.perf_counter() - start:.3f} s total")
+    run_per_call_benchmarks()
+    if np is not None:
+        run_numpy_benchmarks()
+    run_toggle_benchmarks()
+    run_region_benchmarks()
+    run_large_eye_benchmarks()
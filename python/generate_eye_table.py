@@ -0,0 +1,127 @@
+"""
+Generates the table of eye values for small solid eyes that is embedded in goscorer.py.
+
+A solid eye is an eye with no false eye points that is bordered only by the living stones of its owner and the
+edges of the board, and whose points are each either empty or an opponent stone marked dead. The eye value of a
+solid eye depends only on its shape, which of its points hold dead stones, and which edges of the board it touches.
+So this script enumerates every shape of up to EYE_VALUE_TABLE_MAX_EYE_SIZE points, with every arrangement of
+dead stones for shapes of up to EYE_VALUE_TABLE_MAX_DEAD_STONE_EYE_SIZE points, placed against each combination of
+at most one horizontal and one vertical edge. It scores each one with the full heuristics in
+goscorer.compute_eye_value, and rewrites the table in goscorer.py in place.
+
+Usage: python generate_eye_table.py [--check]
+With --check, only verify that the table in goscorer.py is up to date.
+"""
+
+import os
+import sys
+
+import goscorer
+from goscorer import territory_scoring, EMPTY, BLACK, WHITE, EYE_VALUE_TABLE_MAX_EYE_SIZE, EYE_VALUE_TABLE_MAX_DEAD_STONE_EYE_SIZE
+
+BEGIN_MARKER = "# BEGIN GENERATED EYE VALUE TABLE\n"
+END_MARKER = "# END GENERATED EYE VALUE TABLE\n"
+
+def enumerate_shapes(max_size):
+    """All edge-connected sets of up to max_size points, translated so that their minimum row and column are 0,
+    as sorted tuples of (y,x)."""
+    shapes = set()
+    frontier = set([((0,0),)])
+    for size in range(1, max_size+1):
+        shapes.update(frontier)
+        if size == max_size:
+            break
+        next_frontier = set()
+        for shape in frontier:
+            points = set(shape)
+            for (y,x) in shape:
+                for (dy,dx) in [(-1,0),(1,0),(0,-1),(0,1)]:
+                    point = (y+dy,x+dx)
+                    if point in points:
+                        continue
+                    grown = points | set([point])
+                    min_y = min(py for (py,px) in grown)
+                    min_x = min(px for (py,px) in grown)
+                    next_frontier.add(tuple(sorted((py-min_y,px-min_x) for (py,px) in grown)))
+        frontier = next_frontier
+    return sorted(shapes, key=lambda shape: (len(shape), shape))
+
+def eye_value_of_placement(shape, dead_points, offset_y, offset_x):
+    """Score a board two rows and two columns larger than the shape, filled with black stones except for the shape
+    placed at the given offset, with dead white stones on dead_points, and return the eye value of the shape."""
+    height = max(y for (y,x) in shape) + 1
+    width = max(x for (y,x) in shape) + 1
+    stones = [[BLACK for x in range(width+2)] for y in range(height+2)]
+    marked_dead = [[False for x in range(width+2)] for y in range(height+2)]
+    for (y,x) in shape:
+        if (y,x) in dead_points:
+            stones[y+offset_y][x+offset_x] = WHITE
+            marked_dead[y+offset_y][x+offset_x] = True
+        else:
+            stones[y+offset_y][x+offset_x] = EMPTY
+    scoring = territory_scoring(stones,marked_dead)
+    locscores = [scoring[y+offset_y][x+offset_x] for (y,x) in shape]
+    assert not any(locscore.is_false_eye for locscore in locscores)
+    assert len(set(locscore.eye_value for locscore in locscores)) == 1
+    return locscores[0].eye_value
+
+def generate_table():
+    # Score every shape without the existing table, so that the full heuristics are used.
+    goscorer.EYE_VALUE_TABLE = {}
+    table = {}
+    for shape in enumerate_shapes(EYE_VALUE_TABLE_MAX_EYE_SIZE):
+        height = max(y for (y,x) in shape) + 1
+        width = max(x for (y,x) in shape) + 1
+        mask = 0
+        for (y,x) in shape:
+            mask |= 1 << (y * width + x)
+        num_dead_masks = 1 << len(shape) if len(shape) <= EYE_VALUE_TABLE_MAX_DEAD_STONE_EYE_SIZE else 1
+        for dead_mask in range(num_dead_masks):
+            dead_points = set(point for (i,point) in enumerate(shape) if dead_mask & (1 << i))
+            board_dead_mask = 0
+            for (y,x) in dead_points:
+                board_dead_mask |= 1 << (y * width + x)
+            # Offsets 0, 1, 2 place the shape against the top or left edge, away from the edges, or against the
+            # bottom or right edge, matching the order of goscorer.get_solid_eye_edge_index.
+            values = "".join(
+                str(eye_value_of_placement(shape, dead_points, offset_y, offset_x))
+                for offset_y in range(3)
+                for offset_x in range(3)
+            )
+            # Most shapes don't care about the edges, so store just one value for those.
+            if values == values[0] * len(values):
+                values = values[0]
+            table[(height,width,mask,board_dead_mask)] = values
+    return table
+
+def format_table(table, entries_per_line=6):
+    lines = [BEGIN_MARKER, "EYE_VALUE_TABLE = {\n"]
+    entries = [f"({height},{width},{mask},{dead_mask}):\"{values}\"," for ((height,width,mask,dead_mask),values) in table.items()]
+    for i in range(0, len(entries), entries_per_line):
+        lines.append("    " + " ".join(entries[i:i+entries_per_line]) + "\n")
+    lines.append("}\n")
+    lines.append(END_MARKER)
+    return "".join(lines)
+
+def main():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "goscorer.py")
+    with open(path) as f:
+        source = f.read()
+    start = source.index(BEGIN_MARKER)
+    end = source.index(END_MARKER) + len(END_MARKER)
+    table = generate_table()
+    new_source = source[:start] + format_table(table) + source[end:]
+
+    if "--check" in sys.argv[1:]:
+        if new_source != source:
+            print("Eye value table in goscorer.py is out of date, run generate_eye_table.py")
+            sys.exit(1)
+        print("Eye value table in goscorer.py is up to date")
+        return
+
+    with open(path, "w") as f:
+        f.write(new_source)
+    print(f"Wrote {len(table)} eye shapes to {path}")
+
+if __name__ == "__main__":
+    main()
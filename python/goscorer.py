@@ -5,9 +5,18 @@ Original Author: lightvector
 Released under MIT license (https://github.com/lightvector/goscorer/blob/main/LICENSE.txt)
 """
 
-from typing import List, Dict, Tuple, Set, Optional
+from typing import List, Dict, Tuple, Set, Optional, Sequence, Union, Callable
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+import functools
+import itertools
+import multiprocessing
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 Color = int
 EMPTY = 0
@@ -62,13 +71,197 @@ class LocScore:
     finished game positions. This is just an informational indicator."""
 
 
+LOCSCORE_FIELDS = ("is_territory_for","belongs_to_seki_group","is_false_eye","is_unscorable_false_eye","is_dame","eye_value")
+
+class ScoringResult:
+    """The detailed territory map returned by territory_scoring.
+
+    Stores each field of LocScore for all locations of the board in its own packed bytearray in row-major order,
+    available as the attributes of the same names (such as result.is_territory_for[y*xsize+x]) or together via
+    arrays(). For compatibility it also behaves like the 2-dimensional List[List[LocScore]] that territory_scoring
+    used to return: result[y][x] is the LocScore for that location, created on demand. Since such a LocScore is
+    a fresh object, modifying it does not modify the result. Use to_lists() to get an actual list of lists."""
+
+    def __init__(self, ysize: int, xsize: int):
+        self.ysize = ysize
+        self.xsize = xsize
+        self.is_territory_for = bytearray(ysize * xsize)
+        self.belongs_to_seki_group = bytearray(ysize * xsize)
+        self.is_false_eye = bytearray(ysize * xsize)
+        self.is_unscorable_false_eye = bytearray(ysize * xsize)
+        self.is_dame = bytearray(ysize * xsize)
+        self.eye_value = bytearray(ysize * xsize)
+
+    def arrays(self) -> Dict[str,bytearray]:
+        """Returns the packed array for each field of LocScore, by field name. These are not copies."""
+        return { field: getattr(self,field) for field in LOCSCORE_FIELDS }
+
+    def get_locscore(self, y: int, x: int) -> LocScore:
+        i = y * self.xsize + x
+        return LocScore(
+            is_territory_for=self.is_territory_for[i],
+            belongs_to_seki_group=self.belongs_to_seki_group[i],
+            is_false_eye=bool(self.is_false_eye[i]),
+            is_unscorable_false_eye=bool(self.is_unscorable_false_eye[i]),
+            is_dame=bool(self.is_dame[i]),
+            eye_value=self.eye_value[i],
+        )
+
+    def to_lists(self) -> List[List[LocScore]]:
+        return [[self.get_locscore(y,x) for x in range(self.xsize)] for y in range(self.ysize)]
+
+    def clear(self):
+        """Reset every field of every location to 0, so that the result can be filled in again."""
+        zeros = bytes(self.ysize * self.xsize)
+        for field in LOCSCORE_FIELDS:
+            getattr(self,field)[:] = zeros
+
+    def copy(self) -> "ScoringResult":
+        result = ScoringResult(self.ysize,self.xsize)
+        for field in LOCSCORE_FIELDS:
+            getattr(result,field)[:] = getattr(self,field)
+        return result
+
+    def encode(self) -> bytes:
+        """Encode the result compactly for sending elsewhere, such as to a browser, see ENCODED_LOCSCORE_FIELD_BITS.
+        Decode with ScoringResult.decode, or decodeScoring in the javascript version."""
+        if self.ysize > 255 or self.xsize > 255:
+            raise ValueError(f"Board is too large to encode {self.ysize}x{self.xsize}")
+        header = bytes([ENCODED_SCORING_VERSION, self.ysize, self.xsize])
+        return header + b"".join(pack_bit_plane(getattr(self,field),bits) for (field,bits) in ENCODED_LOCSCORE_FIELD_BITS)
+
+    @staticmethod
+    def decode(data: bytes) -> "ScoringResult":
+        """Decode a result encoded by ScoringResult.encode."""
+        if len(data) < 3 or data[0] != ENCODED_SCORING_VERSION:
+            raise ValueError("Not an encoded scoring result of a known version")
+        (ysize, xsize) = (data[1], data[2])
+        result = ScoringResult(ysize,xsize)
+        num_locs = ysize * xsize
+        start = 3
+        for (field,bits) in ENCODED_LOCSCORE_FIELD_BITS:
+            end = start + get_bit_plane_length(num_locs,bits)
+            if end > len(data):
+                raise ValueError(f"Encoded scoring result is too short for a {ysize}x{xsize} board")
+            getattr(result,field)[:] = unpack_bit_plane(data[start:end],bits,num_locs)
+            start = end
+        if start != len(data):
+            raise ValueError(f"Encoded scoring result is too long for a {ysize}x{xsize} board")
+        return result
+
+    def __len__(self) -> int:
+        return self.ysize
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [ScoringResultRow(self,i) for i in range(*y.indices(self.ysize))]
+        if y < 0:
+            y += self.ysize
+        if y < 0 or y >= self.ysize:
+            raise IndexError(f"Row index out of range {y}")
+        return ScoringResultRow(self,y)
+
+    def __iter__(self):
+        for y in range(self.ysize):
+            yield ScoringResultRow(self,y)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ScoringResult):
+            return (self.ysize, self.xsize) == (other.ysize, other.xsize) and self.arrays() == other.arrays()
+        if isinstance(other, list):
+            return self.to_lists() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ScoringResult({self.to_lists()!r})"
+
+class ScoringResultRow:
+    """A row y of a ScoringResult, behaving like a List[LocScore]."""
+
+    def __init__(self, result: ScoringResult, y: int):
+        self.result = result
+        self.y = y
+
+    def __len__(self) -> int:
+        return self.result.xsize
+
+    def __getitem__(self, x):
+        xsize = self.result.xsize
+        if isinstance(x, slice):
+            return [self.result.get_locscore(self.y,i) for i in range(*x.indices(xsize))]
+        if x < 0:
+            x += xsize
+        if x < 0 or x >= xsize:
+            raise IndexError(f"Column index out of range {x}")
+        return self.result.get_locscore(self.y,x)
+
+    def __iter__(self):
+        for x in range(self.result.xsize):
+            yield self.result.get_locscore(self.y,x)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, ScoringResultRow)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+# Layout of ScoringResult.encode: a version byte, then ysize and xsize as one byte each, then one plane for each
+# of these fields in order, packing the field's value for each location with the given number of bits, in
+# row-major order. Within each byte of a plane the first location is in the lowest bits, and the last byte of
+# each plane is padded with zeros. A 19x19 board takes 3 + 3*91 + 3*46 = 414 bytes.
+ENCODED_SCORING_VERSION = 1
+ENCODED_LOCSCORE_FIELD_BITS = (
+    ("is_territory_for", 2),
+    ("belongs_to_seki_group", 2),
+    ("eye_value", 2),
+    ("is_false_eye", 1),
+    ("is_unscorable_false_eye", 1),
+    ("is_dame", 1),
+)
+
+def get_bit_plane_length(num_locs: int, bits: int) -> int:
+    per_byte = 8 // bits
+    return (num_locs + per_byte - 1) // per_byte
+
+def pack_bit_plane(values: bytes, bits: int) -> bytes:
+    """Pack the values, each less than 1 << bits, into bits each, with 8 // bits values per byte."""
+    per_byte = 8 // bits
+    padded = bytes(values) + bytes(-len(values) % per_byte)
+    # Each lane holds every per_byte-th value, one per byte, so shifting a lane as one big int moves each of its
+    # values into place within its own byte.
+    packed = 0
+    for i in range(per_byte):
+        packed |= int.from_bytes(padded[i::per_byte],"little") << (bits * i)
+    return packed.to_bytes(len(padded) // per_byte,"little")
+
+# For each number of bits, the values packed in each possible byte.
+BIT_PLANE_UNPACK_TABLES = {
+    bits: [bytes((byte >> (bits * i)) & ((1 << bits) - 1) for i in range(8 // bits)) for byte in range(256)]
+    for bits in (1, 2)
+}
+
+def unpack_bit_plane(data: bytes, bits: int, num_locs: int) -> bytes:
+    """Inverse of pack_bit_plane, for the first num_locs values."""
+    return b"".join(map(BIT_PLANE_UNPACK_TABLES[bits].__getitem__, data))[:num_locs]
+
+
 def final_territory_score(
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
+    stones: Union[List[List[Color]],"Board"],
+    marked_dead: Optional[List[List[bool]]],
     black_points_from_captures: float,
     white_points_from_captures: float,
     komi: float,
     score_false_eyes: bool = False,
+    use_bitboards: bool = False,
+    scratch: Optional["ScratchPool"] = None,
+    ysize: Optional[int] = None,
+    xsize: Optional[int] = None,
 ) -> Dict[Color,float]:
     """Perform territory scoring with seki detection assuming user or AI-supplied life and death markings,
     and return the final score.
@@ -82,8 +275,9 @@ def final_territory_score(
     scoring algorithm that can't be corrected by further play should be rare and exotic.
 
     Parameters:
-    stones[y][x] - BLACK or WHITE or EMPTY indicating the stones on the board.
-    marked_dead[y][x] - True if the location has a stone marked as dead, and False otherwise.
+    stones[y][x] - BLACK or WHITE or EMPTY indicating the stones on the board, or a Board.
+    marked_dead[y][x] - True if the location has a stone marked as dead, and False otherwise. Must be None if
+      stones is a Board.
     black_points_from_captures - the number of points to add to black's score due to stones already captured
       and removed from the board.
     white_points_from_captures - the number of points to add to white's score due to stones already captured
@@ -91,67 +285,70 @@ def final_territory_score(
     komi - the number of points to add to white's score due to playing second.
     score_false_eyes - defaults to False, if set to True will score territory in false eyes even if
       is_unscorable_false_eye is True.
+    use_bitboards - defaults to False, see territory_scoring.
+    scratch - defaults to None, see territory_scoring.
+    ysize, xsize - defaults to None, see territory_scoring.
+
+    This only counts the points for each player as it goes, without building the detailed territory map.
 
     Returns a dict { BLACK: final_black_score, WHITE: final_white_score }.
     """
-    scoring: List[List[LocScore]] = territory_scoring(stones,marked_dead,score_false_eyes=score_false_eyes)
-
-    ysize = len(stones)
-    xsize = len(stones[0])
-    final_black_score = 0
-    final_white_score = 0
-    for y in range(ysize):
-        for x in range(xsize):
-            if scoring[y][x].is_territory_for == BLACK:
-                final_black_score += 1
-            elif scoring[y][x].is_territory_for == WHITE:
-                final_white_score += 1
-
-            if stones[y][x] == BLACK and marked_dead[y][x]:
-                final_white_score += 1
-            elif stones[y][x] == WHITE and marked_dead[y][x]:
-                final_black_score += 1
-
+    (_, (final_black_score, final_white_score)) = score_territory(stones,marked_dead,score_false_eyes,use_bitboards,score_only=True,scratch=scratch,ysize=ysize,xsize=xsize)
     final_black_score += black_points_from_captures
     final_white_score += white_points_from_captures
     final_white_score += komi
     return { BLACK: final_black_score, WHITE: final_white_score }
 
 def final_area_score(
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
+    stones: Union[List[List[Color]],"Board"],
+    marked_dead: Optional[List[List[bool]]],
     komi: float,
+    use_bitboards: bool = False,
+    ysize: Optional[int] = None,
+    xsize: Optional[int] = None,
 ) -> Dict[Color,float]:
     """Perform area scoring assuming user or AI-supplied life and death markings,
     and return the final score.
 
     Parameters:
-    stones[y][x] - BLACK or WHITE or EMPTY indicating the stones on the board.
-    marked_dead[y][x] - True if the location has a stone marked as dead, and False otherwise.
+    stones[y][x] - BLACK or WHITE or EMPTY indicating the stones on the board, or a Board.
+    marked_dead[y][x] - True if the location has a stone marked as dead, and False otherwise. Must be None if
+      stones is a Board.
     komi - the number of points to add to white's score due to playing second.
+    use_bitboards - defaults to False, see area_scoring.
+    ysize, xsize - defaults to None, see area_scoring.
 
     Returns a dict { BLACK: final_black_score, WHITE: final_white_score }.
     """
-    scoring: List[List[Color]] = area_scoring(stones,marked_dead)
+    scoring: List[List[Color]] = area_scoring(stones,marked_dead,use_bitboards=use_bitboards,ysize=ysize,xsize=xsize)
+
+    if is_numpy_array(stones):
+        return {
+            BLACK: int(np.count_nonzero(scoring == BLACK)),
+            WHITE: int(np.count_nonzero(scoring == WHITE)) + komi,
+        }
 
-    ysize = len(stones)
-    xsize = len(stones[0])
     final_black_score = 0
     final_white_score = 0
-    for y in range(ysize):
-        for x in range(xsize):
-            if scoring[y][x] == BLACK:
+    for row in scoring:
+        for color in row:
+            if color == BLACK:
                 final_black_score += 1
-            elif scoring[y][x] == WHITE:
+            elif color == WHITE:
                 final_white_score += 1
     final_white_score += komi
     return { BLACK: final_black_score, WHITE: final_white_score }
 
 def territory_scoring(
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
+    stones: Union[List[List[Color]],"Board"],
+    marked_dead: Optional[List[List[bool]]] = None,
     score_false_eyes: bool = False,
-) -> List[List[LocScore]]:
+    use_bitboards: bool = False,
+    scratch: Optional["ScratchPool"] = None,
+    out: Optional[ScoringResult] = None,
+    ysize: Optional[int] = None,
+    xsize: Optional[int] = None,
+) -> ScoringResult:
     """Perform territory scoring with seki detection assuming user or AI-supplied life and death markings,
     and return the detailed territory map.
 
@@ -164,117 +361,347 @@ def territory_scoring(
     scoring algorithm that can't be corrected by further play should be rare and exotic.
 
     Parameters:
-    stones[y][x] - BLACK or WHITE or EMPTY indicating the stones on the board.
-    marked_dead[y][x] - True if the location has a stone marked as dead, and False otherwise.
+    stones[y][x] - BLACK or WHITE or EMPTY indicating the stones on the board, or a Board.
+    marked_dead[y][x] - True if the location has a stone marked as dead, and False otherwise. Must be None if
+      stones is a Board.
     score_false_eyes - defaults to False, if set to True will score territory in false eyes even if
       is_unscorable_false_eye is True.
+    use_bitboards - defaults to False, if set to True will compute reachability and regions using Python ints
+      as bitboards rather than by walking the board point by point. The results are identical.
+    scratch - defaults to None, if set to a ScratchPool will reuse its working arrays for this board size instead
+      of allocating new ones.
+    out - defaults to None, if set to a ScoringResult of the same size, such as one returned by a previous call,
+      will fill in and return that instead of a new ScoringResult.
+    ysize, xsize - defaults to None, the size of the board, only used when stones and marked_dead are buffers.
+
+    If numpy is installed, stones and marked_dead may also be 2-dimensional numpy arrays, so that callers holding
+    arrays need not convert them to lists. Connection blocks and reachability are then computed with whole-array
+    operations and use_bitboards is ignored, but the later stages run on Python lists as usual, so this takes about
+    as long as scoring lists, see run_numpy_benchmarks in bench.py.
+
+    stones and marked_dead may also be flat buffers, such as bytes, bytearray, memoryview or array.array, with one
+    byte per location in row-major order, in which case ysize and xsize must be given. They are read through a
+    memoryview without building nested lists.
+
+    Returns a ScoringResult, which acts as a 2-dimensional array of LocScore objects that indicate how the points
+    on the board should be scored, and also gives direct access to the packed arrays of each field."""
+    (scoring, _) = score_territory(stones,marked_dead,score_false_eyes,use_bitboards,score_only=False,scratch=scratch,out=out,ysize=ysize,xsize=xsize)
+    return scoring
 
-    Returns an array of PointScore objects that indicate how the points on the board should be scored."""
-
-    ysize = len(stones)
-    xsize = len(stones[0])
-    for row in stones:
-        if len(row) != xsize:
-            raise ValueError(f"Not all rows in stones are the same length {xsize}")
-        for value in row:
-            if value != EMPTY and value != BLACK and value != WHITE:
-                raise ValueError(f"Unexpected value in stones {value}")
-    if len(marked_dead) != ysize:
-        raise ValueError(f"marked_dead is not the same length as stones {ysize}")
-    for row in marked_dead:
-        if len(row) != xsize:
-            raise ValueError(f"Not all rows in marked_dead are the same length as stones {xsize}")
+def score_territory(
+    stones: Union[List[List[Color]],"Board"],
+    marked_dead: Optional[List[List[bool]]],
+    score_false_eyes: bool,
+    use_bitboards: bool,
+    score_only: bool,
+    scratch: Optional["ScratchPool"] = None,
+    out: Optional[ScoringResult] = None,
+    ysize: Optional[int] = None,
+    xsize: Optional[int] = None,
+) -> Tuple[Optional[ScoringResult],Tuple[int,int]]:
+    """Run all the stages of territory_scoring. Returns the ScoringResult, or None if score_only is True, along with
+    the points on the board for (BLACK, WHITE), counting each player's territory and the opponent's dead stones."""
+    if is_numpy_array(stones):
+        (geom, stones_arr, marked_dead_arr) = flatten_numpy_inputs(stones,marked_dead)
+        buffers = ScratchBuffers(geom) if scratch is None else scratch.get_buffers(geom)
+        connection_blocks_arr = mark_connection_blocks_numpy(geom,stones_arr,marked_dead_arr)
+        (strict_reaches_black_arr, strict_reaches_white_arr) = mark_reachability_numpy(geom,stones_arr,marked_dead_arr,None)
+        (reaches_black_arr, reaches_white_arr) = mark_reachability_numpy(geom,stones_arr,marked_dead_arr,connection_blocks_arr)
+
+        # The remaining stages work on the same flat layout as plain Python lists.
+        stones_flat: List[Color] = stones_arr.tolist()
+        marked_dead_flat: List[bool] = marked_dead_arr.tolist()
+        connection_blocks: List[Color] = connection_blocks_arr.tolist()
+        strict_reaches_black: List[bool] = strict_reaches_black_arr.tolist()
+        strict_reaches_white: List[bool] = strict_reaches_white_arr.tolist()
+        reaches_black: List[bool] = reaches_black_arr.tolist()
+        reaches_white: List[bool] = reaches_white_arr.tolist()
+        return territory_scoring_from_reachability(geom,stones_flat,marked_dead_flat,score_false_eyes,connection_blocks,strict_reaches_black,strict_reaches_white,reaches_black,reaches_white,mark_regions,score_only,buffers,out)
+
+    # All internal stages operate on a flat padded board, see BoardGeometry.
+    if isinstance(stones, Board):
+        check_board_marked_dead(marked_dead)
+        geom = stones.geom
+        buffers = ScratchBuffers(geom) if scratch is None else scratch.get_buffers(geom)
+        buffers.stones_flat[:] = stones.stones_flat
+        buffers.marked_dead_flat[:] = stones.marked_dead_flat
+    elif is_buffer(stones):
+        (geom, stones_view, marked_dead_view) = view_buffer_inputs(stones,marked_dead,ysize,xsize)
+        buffers = ScratchBuffers(geom) if scratch is None else scratch.get_buffers(geom)
+        load_buffer_board(geom,stones_view,marked_dead_view,buffers.stones_flat,buffers.marked_dead_flat)
+    else:
+        (ysize, xsize) = validate_inputs(stones,marked_dead)
+        geom = get_geometry(ysize,xsize)
+        buffers = ScratchBuffers(geom) if scratch is None else scratch.get_buffers(geom)
+        buffers.load_board(stones,marked_dead)
+    stones_flat: List[Color] = buffers.stones_flat
+    marked_dead_flat: List[bool] = buffers.marked_dead_flat
+
+    mark_reachability_impl = mark_reachability_bitboard if use_bitboards else mark_reachability
+    mark_regions_impl = mark_regions_bitboard if use_bitboards else mark_regions
 
     # Marks points where reachability should not be pathed through by the opponent.
-    connection_blocks: List[List[Color]] = make_array(ysize,xsize,EMPTY)
-    mark_connection_blocks(ysize,xsize,stones,marked_dead,connection_blocks)
+    connection_blocks: List[Color] = buffers.connection_blocks
+    mark_connection_blocks(geom,stones_flat,marked_dead_flat,connection_blocks)
     # print("CONNECTIONBLOCKS:")
-    # print2d(connection_blocks, lambda c: ("." if c == -1 else color_to_str(c)))
+    # print2d(unflatten_array(geom,connection_blocks), lambda c: ("." if c == -1 else color_to_str(c)))
 
     # Is there a path from this location to a living stone of the given color
     # that doesn't contain a living stone of the opponent?
-    strict_reaches_black: List[List[bool]] = make_array(ysize,xsize,False)
-    strict_reaches_white: List[List[bool]] = make_array(ysize,xsize,False)
-    mark_reachability(ysize,xsize,stones,marked_dead,None,strict_reaches_black,strict_reaches_white)
+    strict_reaches_black: List[bool] = buffers.strict_reaches_black
+    strict_reaches_white: List[bool] = buffers.strict_reaches_white
+    mark_reachability_impl(geom,stones_flat,marked_dead_flat,None,strict_reaches_black,strict_reaches_white)
 
     # Is there a path from this location to a living stone of the given color
     # that doesn't contain a living stone of the opponent and that doesn't pass through a connection block?
-    reaches_black: List[List[bool]] = make_array(ysize,xsize,False)
-    reaches_white: List[List[bool]] = make_array(ysize,xsize,False)
-    mark_reachability(ysize,xsize,stones,marked_dead,connection_blocks,reaches_black,reaches_white)
+    reaches_black: List[bool] = buffers.reaches_black
+    reaches_white: List[bool] = buffers.reaches_white
+    mark_reachability_impl(geom,stones_flat,marked_dead_flat,connection_blocks,reaches_black,reaches_white)
+
+    return territory_scoring_from_reachability(geom,stones_flat,marked_dead_flat,score_false_eyes,connection_blocks,strict_reaches_black,strict_reaches_white,reaches_black,reaches_white,mark_regions_impl,score_only,buffers,out)
+
+def territory_scoring_from_reachability(
+    geom: "BoardGeometry",
+    stones_flat: List[Color],
+    marked_dead_flat: List[bool],
+    score_false_eyes: bool,
+    connection_blocks: List[Color],
+    strict_reaches_black: List[bool],
+    strict_reaches_white: List[bool],
+    reaches_black: List[bool],
+    reaches_white: List[bool],
+    mark_regions_impl,
+    score_only: bool,
+    buffers: "ScratchBuffers",
+    out: Optional[ScoringResult],
+) -> Tuple[Optional[ScoringResult],Tuple[int,int]]:
+    """The stages of score_territory from regions onward, given the connection blocks and reachability."""
+    ysize = geom.ysize
+    xsize = geom.xsize
 
     # Maximal contiguous areas that reach only one player, maximally unioned based on reachability.
-    region_ids: List[List[RegionId]] = make_array(ysize,xsize,-1)
+    region_ids: List[RegionId] = buffers.region_ids
     region_infos_by_id: Dict[RegionId,RegionInfo] = {}
-    mark_regions(ysize,xsize,stones,marked_dead,connection_blocks,reaches_black,reaches_white,region_ids,region_infos_by_id)
+    mark_regions_impl(geom,stones_flat,marked_dead_flat,connection_blocks,reaches_black,reaches_white,region_ids,region_infos_by_id)
     # print("REGIONS:")
-    # print2d(region_ids, lambda region_id: ".0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[region_id+1])
+    # print2d(unflatten_array(geom,region_ids), lambda region_id: ".0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[region_id+1])
     # print("REGION COLOR:")
-    # print2d(region_ids, lambda region_id: ("." if region_id == -1 else color_to_str(region_infos_by_id[region_id].color)))
+    # print2d(unflatten_array(geom,region_ids), lambda region_id: ("." if region_id == -1 else color_to_str(region_infos_by_id[region_id].color)))
 
     # Maximal contiguous areas of the same color and liveness
-    chain_ids: List[List[ChainId]] = make_array(ysize,xsize,-1)
+    chain_ids: List[ChainId] = buffers.chain_ids
     chain_infos_by_id: Dict[ChainId,ChainInfo] = {}
-    mark_chains(ysize,xsize,stones,marked_dead,region_ids,chain_ids,chain_infos_by_id)
+    mark_chains(geom,stones_flat,marked_dead_flat,region_ids,chain_ids,chain_infos_by_id)
     # print("CHAINS:")
-    # print2d(chain_ids, lambda chain_id: ".0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[chain_id+1])
+    # print2d(unflatten_array(geom,chain_ids), lambda chain_id: ".0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[chain_id+1])
+
+    # Where each player could play, for the eye value heuristics
+    is_pseudolegal_for = buffers.is_pseudolegal_for
+    mark_pseudolegal_points(geom,stones_flat,chain_ids,chain_infos_by_id,is_pseudolegal_for)
 
     # Maximal unions of non-empty chains based on reachability by the owner of that chain passing through
     # non-region space that is not connection-blocked.
-    macrochain_ids: List[List[MacroChainId]] = make_array(ysize,xsize,-1)
+    macrochain_ids: List[MacroChainId] = buffers.macrochain_ids
     macrochain_infos_by_id: Dict[MacroChainId,MacroChainInfo] = {}
-    mark_macrochains(ysize,xsize,stones,marked_dead,connection_blocks,region_ids,region_infos_by_id,chain_ids,chain_infos_by_id,macrochain_ids,macrochain_infos_by_id)
+    mark_macrochains(geom,stones_flat,marked_dead_flat,connection_blocks,region_ids,region_infos_by_id,chain_ids,chain_infos_by_id,macrochain_ids,macrochain_infos_by_id)
     # print("MACROCHAINS:")
-    # print2d(macrochain_ids, lambda i: ".0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[i+1])
+    # print2d(unflatten_array(geom,macrochain_ids), lambda i: ".0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[i+1])
 
     # Eyes or potential eyes of regions
     # Does NOT fill in eye_value - all eyes are assumed to have eye value 0 for now.
-    eye_ids: List[List[EyeId]] = make_array(ysize,xsize,-1)
+    eye_ids: List[EyeId] = buffers.eye_ids
     eye_infos_by_id: Dict[EyeId,EyeInfo] = {}
-    mark_potential_eyes(ysize,xsize,stones,marked_dead,strict_reaches_black,strict_reaches_white,region_ids,region_infos_by_id,macrochain_ids,macrochain_infos_by_id,eye_ids,eye_infos_by_id)
+    mark_potential_eyes(geom,stones_flat,marked_dead_flat,strict_reaches_black,strict_reaches_white,region_ids,region_infos_by_id,macrochain_ids,macrochain_infos_by_id,eye_ids,eye_infos_by_id)
     # print("EYES:")
-    # print2d(eye_ids, lambda i: ".0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[i+1])
+    # print2d(unflatten_array(geom,eye_ids), lambda i: ".0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[i+1])
 
     # Detect points that should not be counted as part of eyes
     # Do this right now while eyes have value 0, to get the initial set of false eye points.
-    is_false_eye_point: List[List[bool]] = make_array(ysize,xsize,False)
-    mark_false_eye_points(ysize,xsize,region_ids,macrochain_ids,macrochain_infos_by_id,eye_infos_by_id,is_false_eye_point)
+    is_false_eye_point: List[bool] = buffers.is_false_eye_point
+    failed_false_eye_searches: List[FailedFalseEyeSearch] = []
+    mark_false_eye_points(geom,region_ids,macrochain_ids,macrochain_infos_by_id,eye_infos_by_id,is_false_eye_point,failed_false_eye_searches)
     # print("FALSE EYE POINTS:")
-    # print2d(is_false_eye_point, lambda b: ("F" if b else "."))
+    # print2d(unflatten_array(geom,is_false_eye_point), lambda b: ("F" if b else "."))
 
     # Now fill in eye values
-    mark_eye_values(ysize,xsize,stones,marked_dead,region_ids,region_infos_by_id,chain_ids,chain_infos_by_id,is_false_eye_point,eye_ids,eye_infos_by_id)
+    mark_eye_values(geom,stones_flat,marked_dead_flat,region_ids,region_infos_by_id,is_pseudolegal_for,is_false_eye_point,eye_ids,eye_infos_by_id,buffers.eye_value_cache)
     # print("EYEVALUES:")
-    # print2d(eye_ids, lambda eye_id: ("." if eye_id == -1 else "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[eye_infos_by_id[eye_id].eye_value]))
-
-    # Now do the false eye detection again with proper eye values, to get the unscorable false eyes.
-    is_unscorable_false_eye_point: List[List[bool]] = make_array(ysize,xsize,False)
-    mark_false_eye_points(ysize,xsize,region_ids,macrochain_ids,macrochain_infos_by_id,eye_infos_by_id,is_unscorable_false_eye_point)
+    # print2d(unflatten_array(geom,eye_ids), lambda eye_id: ("." if eye_id == -1 else "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[eye_infos_by_id[eye_id].eye_value]))
+
+    # Now use the proper eye values to get the unscorable false eyes.
+    # Only the macrochains that failed to reach around a false eye point the first time need to be revisited.
+    # These only affect the score if false eyes are not being scored anyway.
+    is_unscorable_false_eye_point: List[bool] = buffers.is_unscorable_false_eye_point
+    if not (score_only and score_false_eyes):
+        mark_unscorable_false_eye_points(eye_infos_by_id,failed_false_eye_searches,is_unscorable_false_eye_point)
     # print("UNSCORABLE FALSE EYE POINTS:")
-    # print2d(is_unscorable_false_eye_point, lambda b: ("F" if b else "."))
+    # print2d(unflatten_array(geom,is_unscorable_false_eye_point), lambda b: ("F" if b else "."))
 
     # Final processing
-    make_locscore = lambda: LocScore(is_territory_for=EMPTY,belongs_to_seki_group=EMPTY,is_false_eye=False,is_unscorable_false_eye=False,is_dame=False,eye_value=0)
-    scoring: List[List[LocScore]] = make_array_from_callable(ysize,xsize,make_locscore)
-
-    mark_scoring(ysize,xsize,stones,marked_dead,score_false_eyes,strict_reaches_black,strict_reaches_white,region_ids,region_infos_by_id,chain_ids,chain_infos_by_id,is_false_eye_point,eye_ids,eye_infos_by_id,is_unscorable_false_eye_point,scoring)
-
-    return scoring
+    if score_only:
+        scoring = None
+    elif out is not None:
+        if (out.ysize, out.xsize) != (ysize, xsize):
+            raise ValueError(f"out has size {out.ysize}x{out.xsize} but the board is {ysize}x{xsize}")
+        scoring = out
+        scoring.clear()
+    else:
+        scoring = ScoringResult(ysize,xsize)
+    board_score = mark_scoring(geom,stones_flat,marked_dead_flat,score_false_eyes,strict_reaches_black,strict_reaches_white,region_ids,region_infos_by_id,chain_ids,chain_infos_by_id,is_false_eye_point,eye_ids,eye_infos_by_id,is_unscorable_false_eye_point,scoring)
+
+    return (scoring, board_score)
+
+# Names and initial values of the flat arrays in ScratchBuffers that the stages fill in.
+SCRATCH_ARRAY_INITIAL_VALUES = (
+    ("connection_blocks", EMPTY),
+    ("strict_reaches_black", False),
+    ("strict_reaches_white", False),
+    ("reaches_black", False),
+    ("reaches_white", False),
+    ("region_ids", -1),
+    ("chain_ids", -1),
+    ("macrochain_ids", -1),
+    ("eye_ids", -1),
+    ("is_false_eye_point", False),
+    ("is_unscorable_false_eye_point", False),
+)
+
+class ScratchBuffers:
+    """The flat arrays for one territory scoring call on a board of a given size, see ScratchPool."""
+
+    def __init__(self, geom: "BoardGeometry"):
+        self.geom = geom
+        self.stones_flat: List[Color] = make_flat_array(geom,WALL)
+        self.marked_dead_flat: List[bool] = make_flat_array(geom,False)
+        for (name, initial_value) in SCRATCH_ARRAY_INITIAL_VALUES:
+            setattr(self, name, make_flat_array(geom,initial_value))
+        self.is_pseudolegal_for: List[List[bool]] = make_pseudolegality_index(geom)
+        # Shared by all the buffers of a ScratchPool, see ScratchPool.
+        self.eye_value_cache: Optional[EyeValueCache] = None
+        # Arrays by name to copy from when resetting, made on the first reset so that buffers used only once don't.
+        self.templates: Optional[Dict[str,list]] = None
+
+    def reset(self):
+        """Restore every array to its initial value, in place."""
+        if self.templates is None:
+            self.templates = { name: make_flat_array(self.geom,initial_value) for (name, initial_value) in SCRATCH_ARRAY_INITIAL_VALUES }
+            self.templates["is_pseudolegal_for"] = make_flat_array(self.geom,False)
+        for (name, _) in SCRATCH_ARRAY_INITIAL_VALUES:
+            getattr(self,name)[:] = self.templates[name]
+        self.is_pseudolegal_for[BLACK][:] = self.templates["is_pseudolegal_for"]
+        self.is_pseudolegal_for[WHITE][:] = self.templates["is_pseudolegal_for"]
+
+    def load_board(self, stones: List[List[Color]], marked_dead: List[List[bool]]):
+        """Copy the board into stones_flat and marked_dead_flat, like flatten_array. Only the rows are overwritten,
+        since the padding around them never changes."""
+        xsize = self.geom.xsize
+        for y in range(self.geom.ysize):
+            start = get_loc(y,0,xsize)
+            self.stones_flat[start:start+xsize] = stones[y]
+            self.marked_dead_flat[start:start+xsize] = marked_dead[y]
+
+class ScratchPool:
+    """Working arrays kept across calls of territory_scoring and final_territory_score, so that a program scoring
+    many positions doesn't allocate a dozen new board-sized arrays on every call. Pass the same pool as the scratch
+    argument to each call. Holds one set of arrays for each board size it has seen, which are reset before each use.
+
+    A pool also keeps an EyeValueCache of the eye values of the larger eyes it has scored, since eye shapes recur
+    often across positions.
+
+    A pool must not be used by more than one call at a time, so give each thread its own pool."""
+
+    def __init__(self):
+        self.buffers_by_size: Dict[Tuple[int,int],ScratchBuffers] = {}
+        self.eye_value_cache = EyeValueCache()
+
+    def get_buffers(self, geom: "BoardGeometry") -> ScratchBuffers:
+        buffers = self.buffers_by_size.get((geom.ysize,geom.xsize))
+        if buffers is None:
+            buffers = ScratchBuffers(geom)
+            buffers.eye_value_cache = self.eye_value_cache
+            self.buffers_by_size[(geom.ysize,geom.xsize)] = buffers
+        else:
+            buffers.reset()
+        return buffers
+
+    def clear(self):
+        self.buffers_by_size.clear()
+        self.eye_value_cache.clear()
 
 
 def area_scoring(
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
+    stones: Union[List[List[Color]],"Board"],
+    marked_dead: Optional[List[List[bool]]] = None,
+    use_bitboards: bool = False,
+    ysize: Optional[int] = None,
+    xsize: Optional[int] = None,
 ) -> List[List[Color]]:
     """Perform area scoring assuming user or AI-supplied life and death markings,
     and return the detailed area map.
 
     Parameters:
-    stones[y][x] - BLACK or WHITE or EMPTY indicating the stones on the board.
-    marked_dead[y][x] - True if the location has a stone marked as dead, and False otherwise.
+    stones[y][x] - BLACK or WHITE or EMPTY indicating the stones on the board, or a Board.
+    marked_dead[y][x] - True if the location has a stone marked as dead, and False otherwise. Must be None if
+      stones is a Board.
+    use_bitboards - defaults to False, if set to True will compute reachability using Python ints as bitboards
+      rather than by walking the board point by point. The results are identical.
+    ysize, xsize - defaults to None, the size of the board, only used when stones and marked_dead are buffers.
+
+    If numpy is installed, stones and marked_dead may also be 2-dimensional numpy arrays, in which case the
+    area map is computed with whole-array operations and returned as a numpy array of the same shape.
+
+    stones and marked_dead may also be flat buffers, see territory_scoring.
 
     Returns an array of Colors that indicate how the points on the board should be scored - which points are who's area."""
 
+    if is_numpy_array(stones):
+        (geom, stones_arr, marked_dead_arr) = flatten_numpy_inputs(stones,marked_dead)
+        (strict_reaches_black_arr, strict_reaches_white_arr) = mark_reachability_numpy(geom,stones_arr,marked_dead_arr,None)
+        scoring_arr = np.zeros(geom.arrsize, dtype=np.uint8)
+        scoring_arr[strict_reaches_white_arr & ~strict_reaches_black_arr] = WHITE
+        scoring_arr[strict_reaches_black_arr & ~strict_reaches_white_arr] = BLACK
+        return unflatten_numpy_array(geom,scoring_arr)
+
+    if isinstance(stones, Board):
+        check_board_marked_dead(marked_dead)
+        geom = stones.geom
+        stones_flat: Sequence[Color] = stones.stones_flat
+        marked_dead_flat: Sequence[bool] = stones.marked_dead_flat
+    elif is_buffer(stones):
+        (geom, stones_view, marked_dead_view) = view_buffer_inputs(stones,marked_dead,ysize,xsize)
+        stones_flat = make_flat_array(geom,WALL)
+        marked_dead_flat = make_flat_array(geom,False)
+        load_buffer_board(geom,stones_view,marked_dead_view,stones_flat,marked_dead_flat)
+    else:
+        (ysize, xsize) = validate_inputs(stones,marked_dead)
+        geom = get_geometry(ysize,xsize)
+        stones_flat = flatten_array(geom,stones,WALL)
+        marked_dead_flat = flatten_array(geom,marked_dead,False)
+    (ysize, xsize) = (geom.ysize, geom.xsize)
+
+    # Is there a path from this location to a living stone of the given color
+    # that doesn't contain a living stone of the opponent?
+    strict_reaches_black: List[bool] = make_flat_array(geom,False)
+    strict_reaches_white: List[bool] = make_flat_array(geom,False)
+    mark_reachability_impl = mark_reachability_bitboard if use_bitboards else mark_reachability
+    mark_reachability_impl(geom,stones_flat,marked_dead_flat,None,strict_reaches_black,strict_reaches_white)
+
+    scoring: List[List[Color]] = make_array(ysize,xsize,EMPTY)
+    for y in range(ysize):
+        row = scoring[y]
+        loc = get_loc(y,0,xsize)
+        for x in range(xsize):
+            if strict_reaches_white[loc] and not strict_reaches_black[loc]:
+                row[x] = WHITE
+            if strict_reaches_black[loc] and not strict_reaches_white[loc]:
+                row[x] = BLACK
+            loc += 1
+    return scoring
+
+def validate_inputs(stones: List[List[Color]], marked_dead: Optional[List[List[bool]]]) -> Tuple[int,int]:
+    """Raise ValueError unless stones and marked_dead are well-formed boards of the same size, and return that size."""
+    if marked_dead is None:
+        raise ValueError("marked_dead must be given unless stones is a Board")
     ysize = len(stones)
     xsize = len(stones[0])
     for row in stones:
@@ -288,22 +715,326 @@ def area_scoring(
     for row in marked_dead:
         if len(row) != xsize:
             raise ValueError(f"Not all rows in marked_dead are the same length as stones {xsize}")
+    return (ysize, xsize)
+
+class Board:
+    """An immutable board position that is validated once on construction. A Board may be passed as the stones
+    argument of any of the public scoring functions, with marked_dead left as None, and those functions then skip
+    validating and flattening the nested lists. This helps when the same position is scored several times, such as
+    with different options.
+
+    Boards compare equal when their stones and marked_dead are equal, and their hash is computed once on
+    construction, so they can be used as dict keys. The flat padded arrays of the board, see BoardGeometry,
+    are available as the tuples stones_flat and marked_dead_flat."""
+
+    __slots__ = ("ysize", "xsize", "geom", "stones_flat", "marked_dead_flat", "stones_bytes", "marked_dead_bytes", "hash_value")
+
+    def __init__(
+        self,
+        stones: List[List[Color]],
+        marked_dead: Optional[List[List[bool]]] = None,
+    ):
+        """Parameters:
+        stones[y][x] - BLACK or WHITE or EMPTY indicating the stones on the board.
+        marked_dead[y][x] - True if the location has a stone marked as dead, and False otherwise. Defaults to None,
+          meaning that no stones are marked dead.
+
+        If numpy is installed, stones and marked_dead may also be 2-dimensional numpy arrays."""
+        if is_numpy_array(stones):
+            stones = stones.tolist()
+        if marked_dead is None:
+            marked_dead = [[False] * len(row) for row in stones]
+        elif is_numpy_array(marked_dead):
+            marked_dead = marked_dead.tolist()
+        (ysize, xsize) = validate_inputs(stones,marked_dead)
+        marked_dead = [[bool(value) for value in row] for row in marked_dead]
+
+        geom = get_geometry(ysize,xsize)
+        (_, _, stones_bytes, marked_dead_bytes) = pack_position(stones,marked_dead)
+        object.__setattr__(self, "ysize", ysize)
+        object.__setattr__(self, "xsize", xsize)
+        object.__setattr__(self, "geom", geom)
+        object.__setattr__(self, "stones_flat", tuple(flatten_array(geom,stones,WALL)))
+        object.__setattr__(self, "marked_dead_flat", tuple(flatten_array(geom,marked_dead,False)))
+        object.__setattr__(self, "stones_bytes", stones_bytes)
+        object.__setattr__(self, "marked_dead_bytes", marked_dead_bytes)
+        object.__setattr__(self, "hash_value", hash((ysize, xsize, stones_bytes, marked_dead_bytes)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Board is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Board is immutable")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Board):
+            return NotImplemented
+        return (
+            self.hash_value == other.hash_value
+            and (self.ysize, self.xsize, self.stones_bytes, self.marked_dead_bytes)
+            == (other.ysize, other.xsize, other.stones_bytes, other.marked_dead_bytes)
+        )
+
+    def __hash__(self) -> int:
+        return self.hash_value
+
+    def __repr__(self) -> str:
+        return f"Board({self.get_stones()!r}, {self.get_marked_dead()!r})"
+
+    def get_stones(self) -> List[List[Color]]:
+        return [list(row) for row in unflatten_array(self.geom,self.stones_flat)]
+
+    def get_marked_dead(self) -> List[List[bool]]:
+        return [list(row) for row in unflatten_array(self.geom,self.marked_dead_flat)]
+
+def check_board_marked_dead(marked_dead):
+    """Raise ValueError if marked_dead is given along with a Board, which already holds its own marked_dead."""
+    if marked_dead is not None:
+        raise ValueError("marked_dead must be None when stones is a Board")
+
+Position = Union[Tuple[List[List[Color]],List[List[bool]]],Board]
+
+def territory_scoring_batch(
+    positions: Sequence[Position],
+    score_false_eyes: bool = False,
+    processes: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> List[ScoringResult]:
+    """Perform territory_scoring on each of a sequence of (stones, marked_dead) positions, spreading the work
+    over a pool of worker processes.
 
-    # Is there a path from this location to a living stone of the given color
-    # that doesn't contain a living stone of the opponent?
-    strict_reaches_black: List[List[bool]] = make_array(ysize,xsize,False)
-    strict_reaches_white: List[List[bool]] = make_array(ysize,xsize,False)
-    mark_reachability(ysize,xsize,stones,marked_dead,None,strict_reaches_black,strict_reaches_white)
+    Parameters:
+    positions - a sequence of (stones, marked_dead) pairs, in the same format as for territory_scoring, or Boards.
+    score_false_eyes - see territory_scoring.
+    processes - the number of worker processes, defaults to the number of CPUs. If 1, scores in the current
+      process without starting a pool.
+    chunksize - the number of positions sent to a worker at a time, defaults to the multiprocessing default.
+
+    Positions are sent to the workers and results sent back in a compact packed format, with one byte per
+    location for each result.
+
+    Returns a list with the territory_scoring result for each position, in the same order as positions."""
+    packed_positions = [pack_batch_position(position) + (score_false_eyes,) for position in positions]
+    packed_results = map_positions(territory_scoring_packed,packed_positions,processes,chunksize)
+    return [
+        unpack_locscores(ysize,xsize,packed_result)
+        for ((ysize,xsize,_,_,_),packed_result) in zip(packed_positions,packed_results)
+    ]
 
-    scoring: List[List[Color]] = make_array(ysize,xsize,EMPTY)
-    for y in range(ysize):
-        for x in range(xsize):
-            if strict_reaches_white[y][x] and not strict_reaches_black[y][x]:
-                scoring[y][x] = WHITE
-            if strict_reaches_black[y][x] and not strict_reaches_white[y][x]:
-                scoring[y][x] = BLACK
+def final_territory_score_batch(
+    positions: Sequence[Position],
+    black_points_from_captures: Union[float,Sequence[float]],
+    white_points_from_captures: Union[float,Sequence[float]],
+    komi: Union[float,Sequence[float]],
+    score_false_eyes: bool = False,
+    processes: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> List[Dict[Color,float]]:
+    """Perform final_territory_score on each of a sequence of (stones, marked_dead) positions, spreading the work
+    over a pool of worker processes.
+
+    Parameters:
+    positions - a sequence of (stones, marked_dead) pairs, in the same format as for final_territory_score, or Boards.
+    black_points_from_captures, white_points_from_captures, komi - see final_territory_score. Each may be either
+      a single number used for every position, or a sequence with one number for each position.
+    score_false_eyes, processes, chunksize - see territory_scoring_batch.
+
+    Returns a list with the final_territory_score result for each position, in the same order as positions."""
+    num_positions = len(positions)
+    def per_position(value, name):
+        if not hasattr(value, "__len__"):
+            return [value] * num_positions
+        if len(value) != num_positions:
+            raise ValueError(f"{name} has length {len(value)} but there are {num_positions} positions")
+        return list(value)
+    black_points_from_captures = per_position(black_points_from_captures,"black_points_from_captures")
+    white_points_from_captures = per_position(white_points_from_captures,"white_points_from_captures")
+    komi = per_position(komi,"komi")
+
+    packed_positions = [pack_batch_position(position) + (score_false_eyes,) for position in positions]
+    scores = map_positions(final_territory_score_packed,packed_positions,processes,chunksize)
+    return [
+        { BLACK: black_score + black_points_from_captures[i], WHITE: white_score + white_points_from_captures[i] + komi[i] }
+        for (i,(black_score,white_score)) in enumerate(scores)
+    ]
+
+def map_positions(f, packed_positions, processes: Optional[int], chunksize: Optional[int]) -> list:
+    if processes == 1 or len(packed_positions) <= 1:
+        return [f(packed_position) for packed_position in packed_positions]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(f,packed_positions,chunksize)
+
+def pack_position(stones, marked_dead) -> Tuple[int,int,bytes,bytes]:
+    if isinstance(stones, Board):
+        check_board_marked_dead(marked_dead)
+        return (stones.ysize, stones.xsize, stones.stones_bytes, stones.marked_dead_bytes)
+    ysize = len(stones)
+    xsize = len(stones[0])
+    stones_bytes = bytes(itertools.chain.from_iterable(stones))
+    if len(stones_bytes) != ysize * xsize:
+        raise ValueError(f"Not all rows in stones are the same length {xsize}")
+    marked_dead_bytes = bytes(map(bool,itertools.chain.from_iterable(marked_dead)))
+    if len(marked_dead) != ysize or len(marked_dead_bytes) != ysize * xsize:
+        raise ValueError(f"marked_dead is not the same size as stones {ysize}x{xsize}")
+    return (ysize, xsize, stones_bytes, marked_dead_bytes)
+
+def pack_batch_position(position: Position) -> Tuple[int,int,bytes,bytes]:
+    if isinstance(position, Board):
+        return pack_position(position,None)
+    (stones, marked_dead) = position
+    return pack_position(stones,marked_dead)
+
+def unpack_position(ysize: int, xsize: int, stones_bytes: bytes, marked_dead_bytes: bytes) -> Tuple[List[List[Color]],List[List[bool]]]:
+    stones = [list(stones_bytes[y*xsize:(y+1)*xsize]) for y in range(ysize)]
+    marked_dead = [[bool(value) for value in marked_dead_bytes[y*xsize:(y+1)*xsize]] for y in range(ysize)]
+    return (stones, marked_dead)
+
+# Every LocScore, as a tuple of its fields, mapped to and from a one byte code.
+LOCSCORE_FIELD_VALUES = list(itertools.product((EMPTY,BLACK,WHITE),(EMPTY,BLACK,WHITE),(False,True),(False,True),(False,True),(0,1,2)))
+LOCSCORE_CODE_BY_FIELD_VALUES = { field_values: code for (code,field_values) in enumerate(LOCSCORE_FIELD_VALUES) }
+
+def pack_locscores(scoring: ScoringResult) -> bytes:
+    codes = LOCSCORE_CODE_BY_FIELD_VALUES
+    return bytes(codes[field_values] for field_values in zip(*scoring.arrays().values()))
+
+# For each field of LocScore, a bytes.translate table from the one byte code to the value of that field.
+LOCSCORE_FIELD_BY_CODE_TABLES = [
+    bytes(field_values[i] for field_values in LOCSCORE_FIELD_VALUES).ljust(256, b"\0")
+    for i in range(len(LOCSCORE_FIELDS))
+]
+
+def unpack_locscores(ysize: int, xsize: int, packed: bytes) -> ScoringResult:
+    scoring = ScoringResult(ysize,xsize)
+    for (field,table) in zip(LOCSCORE_FIELDS,LOCSCORE_FIELD_BY_CODE_TABLES):
+        getattr(scoring,field)[:] = packed.translate(table)
     return scoring
 
+def territory_scoring_packed(packed_position) -> bytes:
+    (ysize, xsize, stones_bytes, marked_dead_bytes, score_false_eyes) = packed_position
+    (stones, marked_dead) = unpack_position(ysize,xsize,stones_bytes,marked_dead_bytes)
+    return pack_locscores(territory_scoring(stones,marked_dead,score_false_eyes=score_false_eyes))
+
+def final_territory_score_packed(packed_position) -> Tuple[int,int]:
+    (ysize, xsize, stones_bytes, marked_dead_bytes, score_false_eyes) = packed_position
+    (stones, marked_dead) = unpack_position(ysize,xsize,stones_bytes,marked_dead_bytes)
+    score = final_territory_score(stones,marked_dead,0,0,0,score_false_eyes=score_false_eyes)
+    return (score[BLACK], score[WHITE])
+
+
+class ScoringCache:
+    """An LRU cache of scoring results by position, for when the same positions are scored repeatedly.
+
+    Positions are looked up by a Zobrist hash of stones, marked_dead and score_false_eyes, and on a hash match
+    the full position is compared too, so a hash collision can never return the wrong result. Results are stored
+    in a packed form and a fresh copy is returned on every call, so callers may freely modify what they get.
+
+    The hits, misses and evictions counters may be read or reset by callers."""
+
+    def __init__(self, capacity: int = 1024):
+        """capacity - the maximum number of results to keep, evicting the least recently used result beyond that."""
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive {capacity}")
+        self.capacity = capacity
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+    def territory_scoring(
+        self,
+        stones: Union[List[List[Color]],"Board"],
+        marked_dead: Optional[List[List[bool]]] = None,
+        score_false_eyes: bool = False,
+    ) -> ScoringResult:
+        """Same as territory_scoring, using the cache."""
+        (ysize, xsize, stones_bytes, marked_dead_bytes) = pack_position(stones,marked_dead)
+        key = ("territory_scoring", ysize, xsize, stones_bytes, marked_dead_bytes, bool(score_false_eyes))
+        hash_key = zobrist_hash(key)
+        packed = self.lookup(hash_key,key)
+        if packed is None:
+            packed = pack_locscores(territory_scoring(stones,marked_dead,score_false_eyes=score_false_eyes))
+            self.store(hash_key,key,packed)
+        return unpack_locscores(ysize,xsize,packed)
+
+    def area_scoring(
+        self,
+        stones: Union[List[List[Color]],"Board"],
+        marked_dead: Optional[List[List[bool]]] = None,
+    ) -> List[List[Color]]:
+        """Same as area_scoring, using the cache."""
+        (ysize, xsize, stones_bytes, marked_dead_bytes) = pack_position(stones,marked_dead)
+        key = ("area_scoring", ysize, xsize, stones_bytes, marked_dead_bytes, False)
+        hash_key = zobrist_hash(key)
+        packed = self.lookup(hash_key,key)
+        if packed is None:
+            packed = bytes(itertools.chain.from_iterable(area_scoring(stones,marked_dead)))
+            self.store(hash_key,key,packed)
+        if is_numpy_array(stones):
+            return np.frombuffer(packed, dtype=np.uint8).reshape(ysize,xsize).copy()
+        return [list(packed[y*xsize:(y+1)*xsize]) for y in range(ysize)]
+
+    def final_territory_score(
+        self,
+        stones: Union[List[List[Color]],"Board"],
+        marked_dead: Optional[List[List[bool]]],
+        black_points_from_captures: float,
+        white_points_from_captures: float,
+        komi: float,
+        score_false_eyes: bool = False,
+    ) -> Dict[Color,float]:
+        """Same as final_territory_score, using the cache. Captures and komi are not part of the cache key."""
+        (ysize, xsize, stones_bytes, marked_dead_bytes) = pack_position(stones,marked_dead)
+        key = ("final_territory_score", ysize, xsize, stones_bytes, marked_dead_bytes, bool(score_false_eyes))
+        hash_key = zobrist_hash(key)
+        board_score = self.lookup(hash_key,key)
+        if board_score is None:
+            score = final_territory_score(stones,marked_dead,0,0,0,score_false_eyes=score_false_eyes)
+            board_score = (score[BLACK], score[WHITE])
+            self.store(hash_key,key,board_score)
+        (black_score, white_score) = board_score
+        return { BLACK: black_score + black_points_from_captures, WHITE: white_score + white_points_from_captures + komi }
+
+    def lookup(self, hash_key, key):
+        entry = self.entries.get(hash_key)
+        if entry is None or entry[0] != key:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(hash_key)
+        self.hits += 1
+        return entry[1]
+
+    def store(self, hash_key, key, value):
+        self.entries[hash_key] = (key, value)
+        self.entries.move_to_end(hash_key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+ZOBRIST_NUM_STATES = 6  # EMPTY, BLACK, WHITE, each either not marked dead or marked dead
+ZOBRIST_SCORE_FALSE_EYES = random.Random("score_false_eyes").getrandbits(64)
+
+@functools.lru_cache(maxsize=64)
+def get_zobrist_table(ysize: int, xsize: int) -> Tuple[Tuple[int,...],...]:
+    """Random 64-bit values for each state of each location in row-major order, generated deterministically per size."""
+    rand = random.Random(f"{ysize}x{xsize}")
+    return tuple(tuple(rand.getrandbits(64) for state in range(ZOBRIST_NUM_STATES)) for i in range(ysize * xsize))
+
+def zobrist_hash(key) -> Tuple[str,int]:
+    (kind, ysize, xsize, stones_bytes, marked_dead_bytes, score_false_eyes) = key
+    table = get_zobrist_table(ysize,xsize)
+    h = ZOBRIST_SCORE_FALSE_EYES if score_false_eyes else 0
+    for (values, stone, is_dead) in zip(table, stones_bytes, marked_dead_bytes):
+        if stone > WHITE:
+            raise ValueError(f"Unexpected value in stones {stone}")
+        h ^= values[stone * 2 + is_dead]
+    return (kind, h)
+
 
 def get_opp(pla: Color) -> Color:
     return 3 - pla
@@ -312,22 +1043,77 @@ RegionId = int
 ChainId = int
 MacroChainId = int
 EyeId = int
-
-def make_array(ysize, xsize, initial_value):
-    rows = []
+Loc = int
+
+# Sentinel value for the ring of off-board locations surrounding the board in the flat board representation.
+WALL = 3
+
+@dataclass(frozen=True)
+class BoardGeometry:
+    """Layout of the flat padded board representation used by all the internal scoring stages.
+
+    A board of size ysize x xsize is stored as a single flat array of length arrsize, with location
+    (y,x) at index (x+1) + (y+1)*(xsize+1), surrounded by a ring of sentinel locations (WALL in the stones
+    array, and a neutral value like False or -1 in the other arrays). Horizontally adjacent rows share one
+    sentinel column, so for any on-board loc, loc+offset for each offset in adj_offsets is always a valid index,
+    and neighbor steps need no bounds checks. The order of adj_offsets is up, down, left, right."""
+    ysize: int
+    xsize: int
+    stride: int
+    arrsize: int
+    adj_offsets: Tuple[int,int,int,int]
+    locs: Tuple[Loc,...]  # all on-board locations in row-major order
+    is_border: Tuple[bool,...]  # indexed by loc, True for on-board locations on the edge of the board
+    onboard_mask: int  # bitboard with the bit (1 << loc) set for every on-board location
+
+@functools.lru_cache(maxsize=64)
+def get_geometry(ysize: int, xsize: int) -> BoardGeometry:
+    stride = xsize + 1
+    arrsize = (ysize + 2) * stride + 1
+    locs = tuple(get_loc(y,x,xsize) for y in range(ysize) for x in range(xsize))
+    is_border = [False] * arrsize
     for y in range(ysize):
-        row = []
         for x in range(xsize):
-            row.append(initial_value)
-        rows.append(row)
+            is_border[get_loc(y,x,xsize)] = is_on_border(y,x,ysize,xsize)
+    return BoardGeometry(
+        ysize=ysize,
+        xsize=xsize,
+        stride=stride,
+        arrsize=arrsize,
+        adj_offsets=(-stride,stride,-1,1),
+        locs=locs,
+        is_border=tuple(is_border),
+        onboard_mask=sum(1 << loc for loc in locs),
+    )
+
+def get_loc(y: int, x: int, xsize: int) -> Loc:
+    return (x+1) + (y+1)*(xsize+1)
+
+def make_flat_array(geom: BoardGeometry, initial_value):
+    return [initial_value] * geom.arrsize
+
+def flatten_array(geom: BoardGeometry, board, border_value):
+    arr = [border_value] * geom.arrsize
+    xsize = geom.xsize
+    for y in range(geom.ysize):
+        start = get_loc(y,0,xsize)
+        arr[start:start+xsize] = board[y]
+    return arr
+
+def unflatten_array(geom: BoardGeometry, arr):
+    xsize = geom.xsize
+    rows = []
+    for y in range(geom.ysize):
+        start = get_loc(y,0,xsize)
+        rows.append(arr[start:start+xsize])
     return rows
 
-def make_array_from_callable(ysize, xsize, f):
+def make_array(ysize, xsize, initial_value):
     rows = []
     for y in range(ysize):
         row = []
         for x in range(xsize):
-            row.append(f())
+            row.append(initial_value)
         rows.append(row)
     return rows
 
@@ -337,9 +1123,6 @@ def is_on_board(y, x, ysize, xsize):
 def is_on_border(y, x, ysize, xsize):
     return y == 0 or x == 0 or y == ysize-1 or x == xsize-1
 
-def is_adjacent(y1, x1, y2, x2):
-    return (y1 == y2 and (x1 == x2 + 1 or x1 == x2 - 1)) or (x1 == x2 and (y1 == y2 + 1 or y1 == y2 - 1))
-
 def print2d(board, f):
     print(string2d(board,f))
 
@@ -373,48 +1156,73 @@ def color_to_str(color):
     return "."
 
 
-def mark_connection_blocks(
-    ysize: int,
-    xsize: int,
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
-    connection_blocks: List[List[Color]],  # mutated by this function
-):
-    patterns = [
-        [
-            "pp",
-            "@e",
-            "pe",
-        ],
-        [
-            "ep?",
-            "e@e",
-            "ep?",
-        ],
-        [
-            "pee",
-            "e@p",
-            "pee",
-        ],
-        [
-            "?e?",
-            "p@p",
-            "xxx",
-        ],
-        [
-            "pp",
-            "@e",
-            "xx",
-        ],
-        [
-            "ep?",
-            "e@e",
-            "xxx",
-        ],
-    ]
-
-    for pla in [BLACK,WHITE]:
-        opp = get_opp(pla)
+# Local shapes around an empty point "@" such that the opponent should not be able to path through that point,
+# because it is effectively a point of player "p"'s own shape. Each pattern is matched in all 8 orientations.
+# "p" - living player stone
+# "e" - empty or living player stone or dead opponent stone
+# "@" - empty, and the point that is marked as a connection block
+# "?" - any on-board location
+# "x" - off the board (edge patterns)
+CONNECTION_BLOCK_PATTERNS = [
+    [
+        "pp",
+        "@e",
+        "pe",
+    ],
+    [
+        "ep?",
+        "e@e",
+        "ep?",
+    ],
+    [
+        "pee",
+        "e@p",
+        "pee",
+    ],
+    [
+        "?e?",
+        "p@p",
+        "xxx",
+    ],
+    [
+        "pp",
+        "@e",
+        "xx",
+    ],
+    [
+        "ep?",
+        "e@e",
+        "xxx",
+    ],
+]
+
+# Every pattern fits within the 3x3 neighborhood of its "@" point, so a neighborhood is encoded as a key
+# with 2 bits for each of the 8 surrounding locations in this order, holding one of the NEIGHBOR_ classes below
+# from the point of view of the player whose connection blocks are being computed.
+NEIGHBORHOOD_DYDX = [(-1,-1),(-1,0),(-1,1),(0,-1),(0,1),(1,-1),(1,0),(1,1)]
+NEIGHBOR_EMPTY_OR_DEAD_OPP = 0
+NEIGHBOR_LIVING_PLA = 1
+NEIGHBOR_OTHER = 2  # living opponent stone or dead player stone
+NEIGHBOR_OFF_BOARD = 3
+
+# Above the 16 neighborhood bits, the key also has flags for the column of the point, see below.
+COLUMN_FLAG_THIRD_FROM_LEFT = 1 << 16
+COLUMN_FLAG_THIRD_FROM_RIGHT = 1 << 17
+
+def compile_connection_block_table() -> bytearray:
+    """Returns a table indexed by encoded neighborhood and column flags that is 1 wherever an empty point
+    matches some orientation of some pattern in CONNECTION_BLOCK_PATTERNS."""
+    allowed_by_char = {
+        "p": [NEIGHBOR_LIVING_PLA],
+        "e": [NEIGHBOR_EMPTY_OR_DEAD_OPP, NEIGHBOR_LIVING_PLA],
+        "?": [NEIGHBOR_EMPTY_OR_DEAD_OPP, NEIGHBOR_LIVING_PLA, NEIGHBOR_OTHER],
+        "x": [NEIGHBOR_OFF_BOARD],
+    }
+    any_class = [NEIGHBOR_EMPTY_OR_DEAD_OPP, NEIGHBOR_LIVING_PLA, NEIGHBOR_OTHER, NEIGHBOR_OFF_BOARD]
+
+    table = bytearray(4 * 4 ** len(NEIGHBORHOOD_DYDX))
+    for pattern in CONNECTION_BLOCK_PATTERNS:
+        (aty,atx) = next((pdy,pdx) for pdy in range(len(pattern)) for pdx in range(len(pattern[pdy])) if pattern[pdy][pdx] == "@")
         # Orient pattern 8 ways
         for pdydy, pdydx, pdxdy, pdxdx in [
             (1,0,0,1),
@@ -426,248 +1234,558 @@ def mark_connection_blocks(
             (0,1,-1,0),
             (0,-1,-1,0),
         ]:
-            for pattern in patterns:
-                pylen = len(pattern)
-                pxlen = len(pattern[0])
-                is_edge_pattern = "x" in pattern[pylen-1]
-                if is_edge_pattern:
-                    pylen -= 1  # We check the edge specially
-
-                y_range = list(range(ysize))
-                x_range = list(range(xsize))
-
-                if is_edge_pattern:
-                    if pdydy == -1:
-                        y_range = [ len(pattern)-2 ]
-                    elif pdydy == 1:
-                        y_range = [ ysize - (len(pattern)-1) ]
-                    elif pdxdy == -1:
-                        x_range = [ len(pattern)-2 ]
-                    elif pdxdy == 1:
-                        x_range = [ xsize - (len(pattern)-1) ]
-
-                for y in y_range:
-                    for x in x_range:
-                        def get_target_yx(pdy,pdx):
-                            return (y + pdydy * pdy + pdxdy * pdx, x + pdydx * pdy + pdxdx * pdx)
-
-                        ty,tx = get_target_yx(pylen-1,pxlen-1)
-                        if not is_on_board(ty,tx,ysize,xsize):
-                            continue
-                        if not is_on_board(y,x,ysize,xsize):
-                            continue
-
-                        atloc = None
-                        mismatch = False
-                        for pdy in range(pylen):
-                            for pdx in range(pxlen):
-                                c = pattern[pdy][pdx]
-                                # Anything allowed
-                                if c == "?":
-                                    continue
-                                ty,tx = get_target_yx(pdy,pdx)
-                                # Living player
-                                if c == "p":
-                                    if not (stones[ty][tx] == pla and not marked_dead[ty][tx]):
-                                        mismatch = True
-                                        break
-                                # Empty or living player or dead opponent
-                                elif c == "e":
-                                    if (
-                                        stones[ty][tx] != EMPTY and
-                                        not (stones[ty][tx] == pla and not marked_dead[ty][tx]) and
-                                        not (stones[ty][tx] == opp and marked_dead[ty][tx])
-                                    ):
-                                        mismatch = True
-                                        break
-                                # Empty, and special point
-                                elif c == "@":
-                                    if stones[ty][tx] != EMPTY:
-                                        mismatch = True
-                                        break
-                                    atloc = (ty,tx)
-                                else:
-                                    assert False, c
-
-                            if mismatch:
-                                break
-
-                        if not mismatch:
-                            assert atloc is not None
-                            (ty,tx) = atloc
-                            connection_blocks[ty][tx] = pla
+            # Edge patterns are anchored against the edge that their "x" row points towards, except for two of
+            # the transposed orientations where the historical placement rule anchored them by the other axis.
+            # There, the pattern only ever applied with "@" in the third column from the left or right edge of
+            # the board, and with the "x" row unchecked. This is preserved so that results are unchanged and stay
+            # the same as the Javascript implementation.
+            is_edge_pattern = "x" in pattern[-1]
+            required_column_flag = 0
+            if is_edge_pattern and pdydy == 0 and pdydx != pdxdy:
+                required_column_flag = COLUMN_FLAG_THIRD_FROM_LEFT if pdydx == 1 else COLUMN_FLAG_THIRD_FROM_RIGHT
+
+            allowed = [any_class for _ in NEIGHBORHOOD_DYDX]
+            for pdy in range(len(pattern)):
+                for pdx in range(len(pattern[pdy])):
+                    c = pattern[pdy][pdx]
+                    if c == "@":
+                        continue
+                    if c == "x" and required_column_flag != 0:
+                        continue
+                    dy = pdydy * (pdy-aty) + pdxdy * (pdx-atx)
+                    dx = pdydx * (pdy-aty) + pdxdx * (pdx-atx)
+                    allowed[NEIGHBORHOOD_DYDX.index((dy,dx))] = allowed_by_char[c]
+            for classes in itertools.product(*allowed):
+                key = 0
+                for i, neighbor_class in enumerate(classes):
+                    key |= neighbor_class << (2*i)
+                for column_flags in range(4):
+                    column_flags <<= 16
+                    if required_column_flag == 0 or (column_flags & required_column_flag) != 0:
+                        table[key | column_flags] = 1
+    return table
+
+CONNECTION_BLOCK_TABLE = compile_connection_block_table()
+
+def mark_connection_blocks(
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    connection_blocks: List[Color],  # mutated by this function
+    locs: Optional[List[Loc]] = None,  # if provided, only recompute the connection blocks at these locations
+):
+    table = CONNECTION_BLOCK_TABLE
+    stride = geom.stride
+    (o0,o1,o2,o3,o4,o5,o6,o7) = [dy * stride + dx for (dy,dx) in NEIGHBORHOOD_DYDX]
+
+    # Classify every location from each player's point of view. Off-board locations keep NEIGHBOR_OFF_BOARD.
+    black_classes = [NEIGHBOR_OFF_BOARD] * geom.arrsize
+    white_classes = [NEIGHBOR_OFF_BOARD] * geom.arrsize
+    for loc in geom.locs:
+        stone = stones[loc]
+        if stone == EMPTY:
+            black_classes[loc] = NEIGHBOR_EMPTY_OR_DEAD_OPP
+            white_classes[loc] = NEIGHBOR_EMPTY_OR_DEAD_OPP
+        elif (stone == BLACK) != bool(marked_dead[loc]):
+            # Living black or dead white
+            black_classes[loc] = NEIGHBOR_LIVING_PLA if stone == BLACK else NEIGHBOR_EMPTY_OR_DEAD_OPP
+            white_classes[loc] = NEIGHBOR_OTHER
+        else:
+            # Living white or dead black
+            black_classes[loc] = NEIGHBOR_OTHER
+            white_classes[loc] = NEIGHBOR_LIVING_PLA if stone == WHITE else NEIGHBOR_EMPTY_OR_DEAD_OPP
+
+    def mark_connection_block(loc: Loc, column_flags: int):
+        for (pla,c) in ((BLACK,black_classes),(WHITE,white_classes)):
+            key = column_flags | (
+                c[loc+o0] | (c[loc+o1] << 2) | (c[loc+o2] << 4) | (c[loc+o3] << 6) |
+                (c[loc+o4] << 8) | (c[loc+o5] << 10) | (c[loc+o6] << 12) | (c[loc+o7] << 14)
+            )
+            # If both players match, white takes precedence, same as if each player's patterns were applied in turn.
+            if table[key]:
+                connection_blocks[loc] = pla
+
+    xsize = geom.xsize
+    column_flags_by_x = [
+        (COLUMN_FLAG_THIRD_FROM_LEFT if x == 2 else 0) | (COLUMN_FLAG_THIRD_FROM_RIGHT if x == xsize-3 else 0)
+        for x in range(xsize)
+    ]
+    if locs is not None:
+        for loc in locs:
+            connection_blocks[loc] = EMPTY
+            if stones[loc] == EMPTY:
+                mark_connection_block(loc,column_flags_by_x[loc % stride - 1])
+        return
+
+    for y in range(geom.ysize):
+        loc = get_loc(y,0,xsize)
+        for column_flags in column_flags_by_x:
+            if stones[loc] == EMPTY:
+                mark_connection_block(loc,column_flags)
+            loc += 1
 
 def mark_reachability(
-    ysize: int,
-    xsize: int,
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
-    connection_blocks: Optional[List[List[Color]]],
-    reaches_black: List[List[bool]],  # mutated by this function
-    reaches_white: List[List[bool]],  # mutated by this function
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    connection_blocks: Optional[List[Color]],
+    reaches_black: List[bool],  # mutated by this function
+    reaches_white: List[bool],  # mutated by this function
 ):
-    # Recursively walk and fill non-pla areas, going through dead stones.
-    def fill_reach(y: int, x: int, reaches_pla: List[List[bool]], pla: Color):
-        if not is_on_board(y,x,ysize,xsize):
-            return
-        if reaches_pla[y][x]:
-            return
-        if stones[y][x] == get_opp(pla) and not marked_dead[y][x]:
-            return
-        reaches_pla[y][x] = True
+    adj_offsets = geom.adj_offsets
 
-        # Connection block spots might be reachable, but stop further propagation
-        if connection_blocks is not None and connection_blocks[y][x] == get_opp(pla):
-            return
+    # Walk and fill non-pla areas, going through dead stones.
+    def fill_reach(start: Loc, reaches_pla: List[bool], pla: Color):
+        opp = get_opp(pla)
+        stack = [start]
+        while stack:
+            loc = stack.pop()
+            if reaches_pla[loc]:
+                continue
+            if stones[loc] == WALL:
+                continue
+            if stones[loc] == opp and not marked_dead[loc]:
+                continue
+            reaches_pla[loc] = True
 
-        fill_reach(y-1,x,reaches_pla,pla)
-        fill_reach(y+1,x,reaches_pla,pla)
-        fill_reach(y,x-1,reaches_pla,pla)
-        fill_reach(y,x+1,reaches_pla,pla)
+            # Connection block spots might be reachable, but stop further propagation
+            if connection_blocks is not None and connection_blocks[loc] == opp:
+                continue
 
-    for y in range(ysize):
-        for x in range(xsize):
-            if stones[y][x] == BLACK and not marked_dead[y][x]:
-                fill_reach(y,x,reaches_black,BLACK)
-            if stones[y][x] == WHITE and not marked_dead[y][x]:
-                fill_reach(y,x,reaches_white,WHITE)
+            for offset in adj_offsets:
+                if not reaches_pla[loc+offset]:
+                    stack.append(loc+offset)
+
+    for loc in geom.locs:
+        if stones[loc] == BLACK and not marked_dead[loc]:
+            fill_reach(loc,reaches_black,BLACK)
+        if stones[loc] == WHITE and not marked_dead[loc]:
+            fill_reach(loc,reaches_white,WHITE)
 
 @dataclass
 class RegionInfo:
     region_id: RegionId
     color: Color
-    region_and_dame: Set[Tuple[int,int]]
+    region_and_dame: int  # bitboard of locations, see iter_mask_locs
     eyes: Set[EyeId]
 
 def mark_regions(
-    ysize: int,
-    xsize: int,
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
-    connection_blocks: List[List[Color]],
-    reaches_black: List[List[bool]],
-    reaches_white: List[List[bool]],
-    region_ids: List[List[RegionId]],  # mutated by this function
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    connection_blocks: List[Color],
+    reaches_black: List[bool],
+    reaches_white: List[bool],
+    region_ids: List[RegionId],  # mutated by this function
     region_infos_by_id: Dict[RegionId,RegionInfo],  # mutated by this function
 ):
+    adj_offsets = geom.adj_offsets
 
-    # Recursively walk and fill regions that reach only pla and not opp, but passing through anything
+    # Walk and fill regions that reach only pla and not opp, but passing through anything
     # that's not an opponent living stone or a connection block
-    def fill_region(y: int, x: int, with_id: RegionId, opp: Color, reaches_pla: List[List[bool]], reaches_opp: List[List[bool]], visited: List[List[bool]]):
-        if not is_on_board(y,x,ysize,xsize):
-            return
-        if visited[y][x]:
-            return
-        if region_ids[y][x] != -1:
-            return
-        if stones[y][x] == opp and not marked_dead[y][x]:
-            return
-
-        visited[y][x] = True
-        region_infos_by_id[with_id].region_and_dame.add((y,x))
-        if reaches_pla[y][x] and not reaches_opp[y][x]:
-            region_ids[y][x] = with_id
+    # Scratch state shared by all regions, holding the id of the region whose fill last visited each location.
+    visited_by_region: List[RegionId] = make_flat_array(geom,-1)
+
+    def fill_region(start: Loc, with_id: RegionId, opp: Color, reaches_pla: List[bool], reaches_opp: List[bool]):
+        # Flag the locations in a byte array and convert it to a bitboard once at the end, since or-ing
+        # each bit into a growing int one by one would copy the int for every location.
+        in_region_and_dame = bytearray(geom.arrsize)
+        stack = [start]
+        while stack:
+            loc = stack.pop()
+            if visited_by_region[loc] == with_id:
+                continue
+            if region_ids[loc] != -1:
+                continue
+            if stones[loc] == WALL:
+                continue
+            if stones[loc] == opp and not marked_dead[loc]:
+                continue
 
-        # Connection block spots might be reachable, but stop further propagation
-        if connection_blocks[y][x] == opp:
-            return
+            visited_by_region[loc] = with_id
+            in_region_and_dame[loc] = 1
+            if reaches_pla[loc] and not reaches_opp[loc]:
+                region_ids[loc] = with_id
+
+            # Connection block spots might be reachable, but stop further propagation
+            if connection_blocks[loc] == opp:
+                continue
 
-        fill_region(y-1,x,with_id,opp,reaches_pla,reaches_opp,visited)
-        fill_region(y+1,x,with_id,opp,reaches_pla,reaches_opp,visited)
-        fill_region(y,x-1,with_id,opp,reaches_pla,reaches_opp,visited)
-        fill_region(y,x+1,with_id,opp,reaches_pla,reaches_opp,visited)
+            for offset in adj_offsets:
+                if visited_by_region[loc+offset] != with_id:
+                    stack.append(loc+offset)
+        region_infos_by_id[with_id].region_and_dame = mask_of_bytes(in_region_and_dame, BYTE_IS_NONZERO)
 
     next_region_id = 0
-    for y in range(ysize):
-        for x in range(xsize):
-            if reaches_black[y][x] and not reaches_white[y][x] and region_ids[y][x] == -1:
-                region_id = next_region_id
-                next_region_id += 1
-                region_infos_by_id[region_id] = RegionInfo(region_id=region_id, color=BLACK, region_and_dame=set(), eyes=set())
-                visited = make_array(ysize,xsize,False)
-                fill_region(y,x,region_id,WHITE,reaches_black,reaches_white,visited)
-            if reaches_white[y][x] and not reaches_black[y][x] and region_ids[y][x] == -1:
-                region_id = next_region_id
-                next_region_id += 1
-                region_infos_by_id[region_id] = RegionInfo(region_id=region_id, color=WHITE, region_and_dame=set(), eyes=set())
-                visited = make_array(ysize,xsize,False)
-                fill_region(y,x,region_id,BLACK,reaches_white,reaches_black,visited)
+    for loc in geom.locs:
+        if reaches_black[loc] and not reaches_white[loc] and region_ids[loc] == -1:
+            region_id = next_region_id
+            next_region_id += 1
+            region_infos_by_id[region_id] = RegionInfo(region_id=region_id, color=BLACK, region_and_dame=0, eyes=set())
+            fill_region(loc,region_id,WHITE,reaches_black,reaches_white)
+        if reaches_white[loc] and not reaches_black[loc] and region_ids[loc] == -1:
+            region_id = next_region_id
+            next_region_id += 1
+            region_infos_by_id[region_id] = RegionInfo(region_id=region_id, color=WHITE, region_and_dame=0, eyes=set())
+            fill_region(loc,region_id,BLACK,reaches_white,reaches_black)
+
+# Optional alternative implementations of mark_reachability and mark_regions that represent sets of locations
+# as Python ints, with bit (1 << loc) for each loc in the flat board layout, and propagate reachability
+# by shift-and-mask dilation of the whole set at once until reaching a fixpoint.
+# Union, intersection and difference of such sets are just |, & and & ~ of the ints.
+# Because of the sentinel ring, shifting by 1 or by the stride never carries a bit from one side of the board to the
+# other without passing through an off-board bit, which the dilation masks away.
+
+def make_byte_to_bit_table(predicate) -> bytes:
+    return bytes((ord("1") if predicate(value) else ord("0")) for value in range(256))
+
+BYTE_IS_BLACK = make_byte_to_bit_table(lambda value: value == BLACK)
+BYTE_IS_WHITE = make_byte_to_bit_table(lambda value: value == WHITE)
+BYTE_IS_NONZERO = make_byte_to_bit_table(lambda value: value != 0)
+
+def mask_of_bytes(data: bytes, byte_to_bit_table: bytes) -> int:
+    """Build a bitboard from a flat array of bytes, with the bits set where byte_to_bit_table maps the byte to "1"."""
+    return int(data.translate(byte_to_bit_table)[::-1], 2)
+
+ASCII_BIT_TO_FLAG = bytes.maketrans(b"01", b"\x00\x01")
+
+def flags_of_mask(geom: BoardGeometry, mask: int) -> List[bool]:
+    """Convert a bitboard to a flat array of 0/1 flags."""
+    return list(format(mask, "b")[::-1].ljust(geom.arrsize, "0").encode().translate(ASCII_BIT_TO_FLAG))
+
+def iter_mask_locs(mask: int):
+    """Iterate over the locations of the set bits of a bitboard, in increasing order."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+def dilate_mask(geom: BoardGeometry, mask: int) -> int:
+    """Returns the locations in mask together with all locations on the board adjacent to them."""
+    stride = geom.stride
+    return ((mask << 1) | (mask >> 1) | (mask << stride) | (mask >> stride)) & geom.onboard_mask
+
+def fill_mask(geom: BoardGeometry, seeds: int, passable: int, spreading: int) -> int:
+    """Returns all the locations in passable that are connected to seeds through a path whose locations
+    before the final one are all in spreading, where seeds is a subset of passable."""
+    filled = seeds
+    frontier = seeds
+    while frontier:
+        frontier = dilate_mask(geom, frontier & spreading) & passable & ~filled
+        filled |= frontier
+    return filled
+
+def mark_reachability_bitboard(
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    connection_blocks: Optional[List[Color]],
+    reaches_black: List[bool],  # mutated by this function
+    reaches_white: List[bool],  # mutated by this function
+):
+    """Same as mark_reachability, computed with bitboards."""
+    stones_bytes = bytes(stones)
+    dead_mask = mask_of_bytes(bytes(map(bool,marked_dead)), BYTE_IS_NONZERO)
+    living_black = mask_of_bytes(stones_bytes, BYTE_IS_BLACK) & ~dead_mask
+    living_white = mask_of_bytes(stones_bytes, BYTE_IS_WHITE) & ~dead_mask
+    blocked_by_black = 0
+    blocked_by_white = 0
+    if connection_blocks is not None:
+        connection_blocks_bytes = bytes(connection_blocks)
+        blocked_by_black = mask_of_bytes(connection_blocks_bytes, BYTE_IS_BLACK)
+        blocked_by_white = mask_of_bytes(connection_blocks_bytes, BYTE_IS_WHITE)
+
+    onboard_mask = geom.onboard_mask
+    # Connection block spots might be reachable, but stop further propagation
+    reach_black_mask = fill_mask(geom, living_black, onboard_mask & ~living_white, ~blocked_by_white)
+    reach_white_mask = fill_mask(geom, living_white, onboard_mask & ~living_black, ~blocked_by_black)
+    reaches_black[:] = flags_of_mask(geom, reach_black_mask)
+    reaches_white[:] = flags_of_mask(geom, reach_white_mask)
+
+def mark_regions_bitboard(
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    connection_blocks: List[Color],
+    reaches_black: List[bool],
+    reaches_white: List[bool],
+    region_ids: List[RegionId],  # mutated by this function
+    region_infos_by_id: Dict[RegionId,RegionInfo],  # mutated by this function
+):
+    """Same as mark_regions, computed with bitboards."""
+    stones_bytes = bytes(stones)
+    dead_mask = mask_of_bytes(bytes(map(bool,marked_dead)), BYTE_IS_NONZERO)
+    living_black = mask_of_bytes(stones_bytes, BYTE_IS_BLACK) & ~dead_mask
+    living_white = mask_of_bytes(stones_bytes, BYTE_IS_WHITE) & ~dead_mask
+    connection_blocks_bytes = bytes(connection_blocks)
+    blocked_by_black = mask_of_bytes(connection_blocks_bytes, BYTE_IS_BLACK)
+    blocked_by_white = mask_of_bytes(connection_blocks_bytes, BYTE_IS_WHITE)
+    reach_black_mask = mask_of_bytes(bytes(reaches_black), BYTE_IS_NONZERO)
+    reach_white_mask = mask_of_bytes(bytes(reaches_white), BYTE_IS_NONZERO)
+
+    onboard_mask = geom.onboard_mask
+    black_only = reach_black_mask & ~reach_white_mask
+    white_only = reach_white_mask & ~reach_black_mask
+
+    # Regions are started in the same order as mark_regions, from the lowest unassigned location that reaches
+    # only one player, and cannot pass through locations already assigned to an earlier region.
+    assigned = 0
+    next_region_id = 0
+    while True:
+        unassigned = (black_only | white_only) & ~assigned
+        if not unassigned:
+            break
+        seed = unassigned & -unassigned
+        if seed & black_only:
+            (color, living_opp, blocked_by_opp, pla_only) = (BLACK, living_white, blocked_by_white, black_only)
+        else:
+            (color, living_opp, blocked_by_opp, pla_only) = (WHITE, living_black, blocked_by_black, white_only)
+
+        region_id = next_region_id
+        next_region_id += 1
+        filled = fill_mask(geom, seed, onboard_mask & ~living_opp & ~assigned, ~blocked_by_opp)
+        region_infos_by_id[region_id] = RegionInfo(region_id=region_id, color=color, region_and_dame=filled, eyes=set())
+        newly_assigned = filled & pla_only
+        for loc in iter_mask_locs(newly_assigned):
+            region_ids[loc] = region_id
+        assigned |= newly_assigned
+
+# When numpy is installed, the public functions also accept 2-dimensional numpy arrays. Validation, connection blocks,
+# reachability and area classification are then computed with whole-array operations over the same flat padded
+# layout, dilating reachability by shifted slices of the flat array in the same way as mark_reachability_bitboard.
+# The region, chain, eye and seki stages still run on Python lists and dominate territory scoring, so that only
+# area scoring is markedly faster for arrays than for lists.
+
+def is_numpy_array(value) -> bool:
+    return np is not None and isinstance(value, np.ndarray)
+
+def flatten_numpy_array(geom: BoardGeometry, board, border_value):
+    arr = np.full(geom.arrsize, border_value, dtype=board.dtype)
+    arr[:-1].reshape(geom.ysize+2, geom.stride)[1:-1,1:] = board
+    return arr
+
+def unflatten_numpy_array(geom: BoardGeometry, arr):
+    return arr[:-1].reshape(geom.ysize+2, geom.stride)[1:-1,1:].copy()
+
+def flatten_numpy_inputs(stones, marked_dead):
+    """Validate numpy inputs and return (geom, stones_flat, marked_dead_flat) as flat padded numpy arrays."""
+    if stones.ndim != 2:
+        raise ValueError(f"stones is not a 2-dimensional array {stones.shape}")
+    marked_dead = np.asarray(marked_dead)
+    if marked_dead.shape != stones.shape:
+        raise ValueError(f"marked_dead is not the same shape as stones {stones.shape}")
+    is_valid = (stones == EMPTY) | (stones == BLACK) | (stones == WHITE)
+    if not is_valid.all():
+        raise ValueError(f"Unexpected value in stones {stones[~is_valid][0]}")
+
+    (ysize, xsize) = stones.shape
+    geom = get_geometry(ysize,xsize)
+    stones_flat = flatten_numpy_array(geom, stones.astype(np.uint8), WALL)
+    marked_dead_flat = flatten_numpy_array(geom, marked_dead.astype(bool), False)
+    return (geom, stones_flat, marked_dead_flat)
+
+def is_buffer(value) -> bool:
+    """True for objects other than lists, tuples and numpy arrays that support the buffer protocol."""
+    if isinstance(value, (list, tuple)) or is_numpy_array(value):
+        return False
+    try:
+        memoryview(value)
+    except TypeError:
+        return False
+    return True
+
+def view_buffer_inputs(stones, marked_dead, ysize: Optional[int], xsize: Optional[int]) -> Tuple[BoardGeometry,memoryview,memoryview]:
+    """Validate flat buffer inputs with one byte per location and return (geom, stones_view, marked_dead_view),
+    with the views as memoryviews of unsigned bytes."""
+    if ysize is None or xsize is None:
+        raise ValueError("ysize and xsize must be given when stones is a buffer")
+    if marked_dead is None:
+        raise ValueError("marked_dead must be given unless stones is a Board")
+    stones_view = memoryview(stones).cast("B")
+    marked_dead_view = memoryview(marked_dead).cast("B")
+    if len(stones_view) != ysize * xsize:
+        raise ValueError(f"stones has {len(stones_view)} bytes but the board is {ysize}x{xsize}")
+    if len(marked_dead_view) != ysize * xsize:
+        raise ValueError(f"marked_dead has {len(marked_dead_view)} bytes but the board is {ysize}x{xsize}")
+    if len(stones_view) > 0 and max(stones_view) > WHITE:
+        raise ValueError(f"Unexpected value in stones {max(stones_view)}")
+    return (get_geometry(ysize,xsize), stones_view, marked_dead_view)
+
+def load_buffer_board(geom: BoardGeometry, stones_view: memoryview, marked_dead_view: memoryview, stones_flat: List[Color], marked_dead_flat: List[bool]):
+    """Copy the rows of the buffer views into the flat padded arrays, like ScratchBuffers.load_board."""
+    xsize = geom.xsize
+    for y in range(geom.ysize):
+        start = get_loc(y,0,xsize)
+        stones_flat[start:start+xsize] = stones_view[y*xsize:(y+1)*xsize]
+        marked_dead_flat[start:start+xsize] = map(bool,marked_dead_view[y*xsize:(y+1)*xsize])
+
+def dilate_numpy(geom: BoardGeometry, mask):
+    stride = geom.stride
+    dilated = np.zeros_like(mask)
+    dilated[1:] |= mask[:-1]
+    dilated[:-1] |= mask[1:]
+    dilated[stride:] |= mask[:-stride]
+    dilated[:-stride] |= mask[stride:]
+    return dilated
+
+def fill_numpy(geom: BoardGeometry, seeds, passable, spreading):
+    """Same as fill_mask, on flat boolean numpy arrays."""
+    filled = seeds.copy()
+    frontier = seeds
+    while frontier.any():
+        frontier = dilate_numpy(geom, frontier & spreading) & passable & ~filled
+        filled |= frontier
+    return filled
+
+def mark_connection_blocks_numpy(geom: BoardGeometry, stones, marked_dead):
+    """Same as mark_connection_blocks, returning the connection blocks as a flat numpy array."""
+    living_black = (stones == BLACK) & ~marked_dead
+    living_white = (stones == WHITE) & ~marked_dead
+    empty_or_dead = (stones == EMPTY) | marked_dead
+
+    stride = geom.stride
+    xsize = geom.xsize
+    x = np.arange(geom.arrsize) % stride - 1
+    column_flags = (
+        np.where(x == 2, COLUMN_FLAG_THIRD_FROM_LEFT, 0) | np.where(x == xsize-3, COLUMN_FLAG_THIRD_FROM_RIGHT, 0)
+    ).astype(np.uint32)
+
+    # Every on-board location and its whole 3x3 neighborhood lies within the range [start-stride-1, end+stride].
+    start = stride + 1
+    end = geom.arrsize - stride - 1
+    is_empty = stones[start:end] == EMPTY
+    table = np.frombuffer(CONNECTION_BLOCK_TABLE, dtype=np.uint8)
+    connection_blocks = np.zeros(geom.arrsize, dtype=np.uint8)
+    # If both players match, white takes precedence, same as mark_connection_blocks.
+    for (pla,living_pla,living_opp) in ((BLACK,living_black,living_white),(WHITE,living_white,living_black)):
+        classes = np.full(geom.arrsize, NEIGHBOR_OFF_BOARD, dtype=np.uint32)
+        classes[empty_or_dead] = NEIGHBOR_EMPTY_OR_DEAD_OPP
+        classes[(stones == pla) & marked_dead] = NEIGHBOR_OTHER
+        classes[living_opp] = NEIGHBOR_OTHER
+        classes[living_pla] = NEIGHBOR_LIVING_PLA
+        keys = column_flags[start:end].copy()
+        for (i,(dy,dx)) in enumerate(NEIGHBORHOOD_DYDX):
+            offset = dy * stride + dx
+            keys |= classes[start+offset:end+offset] << (2*i)
+        connection_blocks[start:end][is_empty & (table[keys] != 0)] = pla
+    return connection_blocks
+
+def mark_reachability_numpy(geom: BoardGeometry, stones, marked_dead, connection_blocks):
+    """Same as mark_reachability, returning (reaches_black, reaches_white) as flat boolean numpy arrays."""
+    onboard = stones != WALL
+    living_black = (stones == BLACK) & ~marked_dead
+    living_white = (stones == WHITE) & ~marked_dead
+    if connection_blocks is None:
+        spreading_black = onboard
+        spreading_white = onboard
+    else:
+        # Connection block spots might be reachable, but stop further propagation
+        spreading_black = connection_blocks != WHITE
+        spreading_white = connection_blocks != BLACK
+    reaches_black = fill_numpy(geom, living_black, onboard & ~living_white, spreading_black)
+    reaches_white = fill_numpy(geom, living_white, onboard & ~living_black, spreading_white)
+    return (reaches_black, reaches_white)
 
 @dataclass
 class ChainInfo:
     chain_id: ChainId
     region_id: RegionId  # -1 unless a chain ENTIRELY belongs to a region (empty chain may cross regions due to connection blockers)
     color: Color
-    points: List[Tuple[int,int]]
-    neighbors: Set[ChainId]
-    adjacents: Set[Tuple[int,int]]
-    liberties: Set[Tuple[int,int]]
+    points: List[Loc]
+    num_liberties: int  # only counted for chains of stones
     is_marked_dead: bool
 
 def mark_chains(
-    ysize: int,
-    xsize: int,
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
-    region_ids: List[List[RegionId]],
-    chain_ids: List[List[ChainId]],  # mutated by this function
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    region_ids: List[RegionId],
+    chain_ids: List[ChainId],  # mutated by this function
     chain_infos_by_id: Dict[ChainId,ChainInfo],  # mutated by this function
 ):
-    # Recursively walk and fill contiguous areas of the same color and liveness
+    adj_offsets = geom.adj_offsets
+
+    # Walk and fill contiguous areas of the same color and liveness
     # while accumulating the various properties
-    def fill_chain(y: int, x: int, with_id: ChainId, color: Color, is_marked_dead: bool):
-        if not is_on_board(y,x,ysize,xsize):
-            return
-        if chain_ids[y][x] == with_id:
-            return
-        if chain_ids[y][x] != -1:
-            other_id = chain_ids[y][x]
-            chain_infos_by_id[other_id].neighbors.add(with_id)
-            chain_infos_by_id[with_id].neighbors.add(other_id)
-            chain_infos_by_id[with_id].adjacents.add((y,x))
-            if stones[y][x] == EMPTY:
-                chain_infos_by_id[with_id].liberties.add((y,x))
-            return
-        if stones[y][x] != color or marked_dead[y][x] != is_marked_dead:
-            chain_infos_by_id[with_id].adjacents.add((y,x))
-            if stones[y][x] == EMPTY:
-                chain_infos_by_id[with_id].liberties.add((y,x))
-            return
-        chain_ids[y][x] = with_id
-        chain_infos_by_id[with_id].points.append((y,x))
-        # If chain would seem to belong to more than one region then set its region to -1.
-        if chain_infos_by_id[with_id].region_id != region_ids[y][x]:
-            chain_infos_by_id[with_id].region_id = -1
-
-        # Any contiguous chain of the same liveness and color if it's nonempty should always belong to the
-        # same region, or -1 if they don't belong to any region.
-        assert color == EMPTY or region_ids[y][x] == chain_infos_by_id[with_id].region_id
-
-        fill_chain(y-1,x,with_id,color,is_marked_dead)
-        fill_chain(y+1,x,with_id,color,is_marked_dead)
-        fill_chain(y,x-1,with_id,color,is_marked_dead)
-        fill_chain(y,x+1,with_id,color,is_marked_dead)
+    def fill_chain(start: Loc, with_id: ChainId, color: Color, is_marked_dead: bool):
+        chain_info = chain_infos_by_id[with_id]
+        liberties = set()
+        stack = [start]
+        while stack:
+            loc = stack.pop()
+            if stones[loc] == WALL:
+                continue
+            if chain_ids[loc] == with_id:
+                continue
+            if stones[loc] != color or marked_dead[loc] != is_marked_dead:
+                if stones[loc] == EMPTY and color != EMPTY:
+                    liberties.add(loc)
+                continue
+            chain_ids[loc] = with_id
+            chain_info.points.append(loc)
+            # If chain would seem to belong to more than one region then set its region to -1.
+            if chain_info.region_id != region_ids[loc]:
+                chain_info.region_id = -1
+
+            # Any contiguous chain of the same liveness and color if it's nonempty should always belong to the
+            # same region, or -1 if they don't belong to any region.
+            assert color == EMPTY or region_ids[loc] == chain_info.region_id
+
+            for offset in adj_offsets:
+                stack.append(loc+offset)
+        chain_info.num_liberties = len(liberties)
 
     next_chain_id = 0
-    for y in range(ysize):
-        for x in range(xsize):
-            if chain_ids[y][x] == -1:
-                chain_id = next_chain_id
-                next_chain_id += 1
-                color = stones[y][x]
-                is_marked_dead = marked_dead[y][x]
-                chain_infos_by_id[chain_id] = ChainInfo(
-                    chain_id=chain_id,
-                    region_id=region_ids[y][x],
-                    color=color,
-                    points=[],
-                    neighbors=set(),
-                    adjacents=set(),
-                    liberties=set(),
-                    is_marked_dead=is_marked_dead,
-                )
-                assert is_marked_dead or color == EMPTY or region_ids[y][x] != -1
-                fill_chain(y,x,chain_id,color,is_marked_dead)
+    for loc in geom.locs:
+        if chain_ids[loc] == -1:
+            chain_id = next_chain_id
+            next_chain_id += 1
+            color = stones[loc]
+            is_marked_dead = marked_dead[loc]
+            chain_infos_by_id[chain_id] = ChainInfo(
+                chain_id=chain_id,
+                region_id=region_ids[loc],
+                color=color,
+                points=[],
+                num_liberties=0,
+                is_marked_dead=is_marked_dead,
+            )
+            assert is_marked_dead or color == EMPTY or region_ids[loc] != -1
+            fill_chain(loc,chain_id,color,is_marked_dead)
+
+def mark_pseudolegal_points(
+    geom: BoardGeometry,
+    stones: List[Color],
+    chain_ids: List[ChainId],
+    chain_infos_by_id: Dict[ChainId,ChainInfo],
+    is_pseudolegal_for: List[List[bool]],  # by color, mutated by this function
+):
+    """Mark for each player the empty points where they could play without it being immediate suicide - points
+    with some adjacent empty point or stone of their own, or some adjacent opponent chain in atari."""
+    is_pseudolegal_for_black = is_pseudolegal_for[BLACK]
+    is_pseudolegal_for_white = is_pseudolegal_for[WHITE]
+    for loc in geom.locs:
+        if stones[loc] != EMPTY:
+            continue
+        for offset in geom.adj_offsets:
+            aloc = loc + offset
+            stone = stones[aloc]
+            if stone == EMPTY:
+                is_pseudolegal_for_black[loc] = True
+                is_pseudolegal_for_white[loc] = True
+                break
+            if stone == BLACK:
+                is_pseudolegal_for_black[loc] = True
+                if chain_infos_by_id[chain_ids[aloc]].num_liberties <= 1:
+                    is_pseudolegal_for_white[loc] = True
+            elif stone == WHITE:
+                is_pseudolegal_for_white[loc] = True
+                if chain_infos_by_id[chain_ids[aloc]].num_liberties <= 1:
+                    is_pseudolegal_for_black[loc] = True
+
+def make_pseudolegality_index(geom: BoardGeometry) -> List[List[bool]]:
+    """Arrays for mark_pseudolegal_points, indexed by color and then by location."""
+    return [[], make_flat_array(geom,False), make_flat_array(geom,False)]
 
 
 @dataclass
@@ -675,378 +1793,572 @@ class MacroChainInfo:
     macrochain_id: ChainId
     region_id: RegionId
     color: Color
-    points: List[Tuple[int,int]]
+    points: List[Loc]
     chains: Set[ChainId]
-    eye_neighbors_from: Dict[EyeId,Set[Tuple[int,int]]]  # For each eye, which points of this macrochain touch it
+    eye_neighbors_from: Dict[EyeId,Set[Loc]]  # For each eye, which points of this macrochain touch it
+
+def find_union_root(parent: Dict[Loc,Loc], node: Loc) -> Loc:
+    """Find the representative of node in a union-find forest, halving the path along the way."""
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
 
 def mark_macrochains(
-    ysize: int,
-    xsize: int,
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
-    connection_blocks: List[List[Color]],
-    region_ids: List[List[RegionId]],
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    connection_blocks: List[Color],
+    region_ids: List[RegionId],
     region_infos_by_id: Dict[RegionId,RegionInfo],
-    chain_ids: List[List[ChainId]],
+    chain_ids: List[ChainId],
     chain_infos_by_id: Dict[ChainId,ChainInfo],
-    macrochain_ids: List[List[MacroChainId]],
+    macrochain_ids: List[MacroChainId],
     macrochain_infos_by_id: Dict[MacroChainId,MacroChainInfo],
 ):
+    """Union the living chains of each player that are connected through regionless space that is not blocked by
+    the opponent. Living chains are contracted to a single union-find node each, so only the points of the
+    chains that don't entirely belong to some region are ever visited individually."""
+    adj_offsets = geom.adj_offsets
     next_macrochain_id = 0
 
+    # Regionless space can only be found within chains that don't entirely belong to a region.
+    regionless_locs = [
+        loc
+        for chain_info in chain_infos_by_id.values()
+        if chain_info.region_id == -1
+        for loc in chain_info.points
+        if region_ids[loc] == -1
+    ]
+
     for pla in [BLACK,WHITE]:
         opp = get_opp(pla)
 
-        chains_handled: Set[ChainId] = set()
-        visited = make_array(ysize,xsize,False)
+        # Union-find nodes are the first point of each living chain and each point of passable regionless space.
+        parent: Dict[Loc,Loc] = {}
+        for chain_info in chain_infos_by_id.values():
+            if chain_info.color == pla and not chain_info.is_marked_dead:
+                parent[chain_info.points[0]] = chain_info.points[0]
+        passable_locs = [loc for loc in regionless_locs if connection_blocks[loc] != opp]
+        for loc in passable_locs:
+            parent[loc] = loc
+
+        for loc in passable_locs:
+            for offset in adj_offsets:
+                aloc = loc + offset
+                if stones[aloc] == pla and not marked_dead[aloc]:
+                    aloc = chain_infos_by_id[chain_ids[aloc]].points[0]
+                elif aloc not in parent:
+                    continue
+                root = find_union_root(parent,loc)
+                aroot = find_union_root(parent,aloc)
+                if root != aroot:
+                    parent[aroot] = root
 
+        # Number the macrochains in order of their first chain.
+        macrochain_id_by_root: Dict[Loc,MacroChainId] = {}
         for chain_id, chain_info in chain_infos_by_id.items():
-            # Already done
-            if chain_id in chains_handled:
-                continue
             if not (chain_info.color == pla and not chain_info.is_marked_dead):
                 continue
-            region_id = chain_info.region_id
-            assert region_id != -1
-
-            macrochain_id = next_macrochain_id
-            next_macrochain_id += 1
-
-            points = []
-            chains = set()
-
-            def walk_and_accumulate(y: int, x: int):
-                if not is_on_board(y,x,ysize,xsize):
-                    return
-                if visited[y][x]:
-                    return
-                visited[y][x] = True
-
-                chain_id = chain_ids[y][x]
-                chain_info = chain_infos_by_id[chain_id]
-                should_recurse = False
-                if stones[y][x] == pla and not marked_dead[y][x]:
-                    macrochain_ids[y][x] = macrochain_id
-                    points.append((y,x))
-                    if chain_id not in chains:
-                        chains.add(chain_id)
-                        chains_handled.add(chain_id)
-                    # Walk through player chains
-                    should_recurse = True
-                elif region_ids[y][x] == -1 and connection_blocks[y][x] != opp:
-                    # Walk through regionless unblocked space
-                    should_recurse = True
-
-                if should_recurse:
-                    walk_and_accumulate(y-1,x)
-                    walk_and_accumulate(y+1,x)
-                    walk_and_accumulate(y,x-1)
-                    walk_and_accumulate(y,x+1)
-
-            (y,x) = chain_info.points[0]
-            walk_and_accumulate(y,x)
-
-            macrochain_infos_by_id[macrochain_id] = MacroChainInfo(
-                macrochain_id=macrochain_id,
-                region_id=region_id,
-                color=pla,
-                points=points,
-                chains=chains,
-                eye_neighbors_from={}, # filled in later
-            )
+            assert chain_info.region_id != -1
+            root = find_union_root(parent,chain_info.points[0])
+            if root not in macrochain_id_by_root:
+                macrochain_id = next_macrochain_id
+                next_macrochain_id += 1
+                macrochain_id_by_root[root] = macrochain_id
+                macrochain_infos_by_id[macrochain_id] = MacroChainInfo(
+                    macrochain_id=macrochain_id,
+                    region_id=chain_info.region_id,
+                    color=pla,
+                    points=[],
+                    chains=set(),
+                    eye_neighbors_from={}, # filled in later
+                )
+            macrochain_id = macrochain_id_by_root[root]
+            macrochain_info = macrochain_infos_by_id[macrochain_id]
+            macrochain_info.chains.add(chain_id)
+            macrochain_info.points.extend(chain_info.points)
+            for loc in chain_info.points:
+                macrochain_ids[loc] = macrochain_id
 
 @dataclass
 class EyeInfo:
     pla: Color
     region_id: RegionId
     eye_id: EyeId
-    potential_points: Set[Tuple[int,int]]
-    real_points: Set[Tuple[int,int]]
-    macrochain_neighbors_from: Dict[MacroChainId,Set[Tuple[int,int]]]  # For each macrochain, which potential eye points touch it
+    potential_points: Set[Loc]
+    real_points: Set[Loc]
+    macrochain_neighbors_from: Dict[MacroChainId,Set[Loc]]  # For each macrochain, which potential eye points touch it
     is_loose: bool  # Loosely surrounded eye, strictly reachable by the opponent
     eye_value: int
 
 def mark_potential_eyes(
-    ysize: int,
-    xsize: int,
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
-    strict_reaches_black: List[List[bool]],
-    strict_reaches_white: List[List[bool]],
-    region_ids: List[List[RegionId]],
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    strict_reaches_black: List[bool],
+    strict_reaches_white: List[bool],
+    region_ids: List[RegionId],
     region_infos_by_id: Dict[RegionId,RegionInfo],  # mutated by this function to fill in eyes
-    macrochain_ids: List[List[MacroChainId]],
+    macrochain_ids: List[MacroChainId],
     macrochain_infos_by_id: Dict[MacroChainId,MacroChainInfo],  # mutated by this function to add eye adjacencies
-    eye_ids: List[List[EyeId]],  # mutated by this function
+    eye_ids: List[EyeId],  # mutated by this function
     eye_infos_by_id: Dict[EyeId,EyeInfo],  # mutated by this function
 ):
+    """Mark the potential eyes of each region, along with which points of each eye and of each bordering macrochain
+    touch each other. Unlike mark_macrochains, this walks the eye points one by one, since those touching points are
+    themselves the output: they are the edges of the EyeGraph and part of the ScoringSession cluster signatures."""
+    reversed_adj_offsets = geom.adj_offsets[::-1]
     next_eye_id = 0
 
     # Also heuristically count eyes for connection-blocked area that isn't strictly blocked.
-    visited = make_array(ysize,xsize,False)
-    for y in range(ysize):
-        for x in range(xsize):
-            if visited[y][x]:
-                continue
-            if eye_ids[y][x] != -1:
-                continue
-            if stones[y][x] != EMPTY and not marked_dead[y][x]:
-                continue
-            region_id = region_ids[y][x]
-            if region_id == -1:
-                continue
-            region_info = region_infos_by_id[region_id]
-            pla = region_info.color
-            is_loose = strict_reaches_white[y][x] and strict_reaches_black[y][x]
-
-            # Allocate the new eye id and populate the arrays!
-            eye_id = next_eye_id
-            next_eye_id += 1
-
-            # Recursively accumulate the empty or marked-dead points within the region.
-            potential_points = set()
-            macrochain_neighbors_from = {}
-            def acc_region(y: int, x: int, prevy: int, prevx: int):
-                if not is_on_board(y,x,ysize,xsize):
-                    return
-                if visited[y][x]:
-                    return
-                if region_ids[y][x] != region_id:
-                    return
-                if macrochain_ids[y][x] != -1:
-                    macrochain_id = macrochain_ids[y][x]
+    visited = make_flat_array(geom,False)
+    for loc in geom.locs:
+        if visited[loc]:
+            continue
+        if eye_ids[loc] != -1:
+            continue
+        if stones[loc] != EMPTY and not marked_dead[loc]:
+            continue
+        region_id = region_ids[loc]
+        if region_id == -1:
+            continue
+        region_info = region_infos_by_id[region_id]
+        pla = region_info.color
+        is_loose = bool(strict_reaches_white[loc] and strict_reaches_black[loc])
+
+        # Allocate the new eye id and populate the arrays!
+        eye_id = next_eye_id
+        next_eye_id += 1
+
+        # Accumulate the empty or marked-dead points within the region.
+        potential_points = set()
+        macrochain_neighbors_from = {}
+        def acc_region(start: Loc):
+            # Depth-first, with each entry also remembering the point we came from.
+            # Neighbors are pushed in reverse so that points are visited in up, down, left, right order.
+            stack = [(start,-1)]
+            while stack:
+                (loc,prevloc) = stack.pop()
+                if visited[loc]:
+                    continue
+                if region_ids[loc] != region_id:
+                    continue
+                if macrochain_ids[loc] != -1:
+                    macrochain_id = macrochain_ids[loc]
                     if macrochain_id not in macrochain_neighbors_from:
                         macrochain_neighbors_from[macrochain_id] = set()
-                    macrochain_neighbors_from[macrochain_id].add((prevy,prevx))
+                    macrochain_neighbors_from[macrochain_id].add(prevloc)
                     if eye_id not in macrochain_infos_by_id[macrochain_id].eye_neighbors_from:
                         macrochain_infos_by_id[macrochain_id].eye_neighbors_from[eye_id] = set()
-                    macrochain_infos_by_id[macrochain_id].eye_neighbors_from[eye_id].add((y,x))
-                if stones[y][x] != EMPTY and not marked_dead[y][x]:
-                    return
-                visited[y][x] = True
-                eye_ids[y][x] = eye_id
-                potential_points.add((y,x))
-                acc_region(y-1,x,y,x)
-                acc_region(y+1,x,y,x)
-                acc_region(y,x-1,y,x)
-                acc_region(y,x+1,y,x)
-
-            assert macrochain_ids[y][x] == -1
-            acc_region(y,x,10000,10000)
-
-            eye_infos_by_id[eye_id] = EyeInfo(
-                pla=pla,
-                region_id=region_id,
-                eye_id=eye_id,
-                potential_points=potential_points,
-                real_points=set(),  # filled in later
-                macrochain_neighbors_from=macrochain_neighbors_from,
-                is_loose=is_loose,
-                eye_value=0, # estimated later
-            )
-            # Update the region info with this eye too
-            region_infos_by_id[region_id].eyes.add(eye_id)
+                    macrochain_infos_by_id[macrochain_id].eye_neighbors_from[eye_id].add(loc)
+                if stones[loc] != EMPTY and not marked_dead[loc]:
+                    continue
+                visited[loc] = True
+                eye_ids[loc] = eye_id
+                potential_points.add(loc)
+                for offset in reversed_adj_offsets:
+                    stack.append((loc+offset,loc))
+
+        assert macrochain_ids[loc] == -1
+        acc_region(loc)
+
+        eye_infos_by_id[eye_id] = EyeInfo(
+            pla=pla,
+            region_id=region_id,
+            eye_id=eye_id,
+            potential_points=potential_points,
+            real_points=set(),  # filled in later
+            macrochain_neighbors_from=macrochain_neighbors_from,
+            is_loose=is_loose,
+            eye_value=0, # estimated later
+        )
+        # Update the region info with this eye too
+        region_infos_by_id[region_id].eyes.add(eye_id)
 
 
+@dataclass
+class EyeGraph:
+    """The undirected graph with a node for each macrochain bordering the given eyes and for each point of those
+    eyes, with edges between each macrochain and the eye points it borders, and between adjacent points of the
+    same eye. Each node of the graph is numbered, with adjacency holding the neighboring nodes of each node."""
+    adjacency: List[List[int]]
+    node_of_point: Dict[Loc,int]
+    point_of_node: List[Loc]  # -1 for macrochain nodes
+    eye_of_node: List[EyeId]  # -1 for macrochain nodes
+
+@dataclass
+class GraphForest:
+    """A depth-first search forest over a graph given by adjacency lists, like Bottlenecks but for numbered nodes.
+    Nodes are also numbered in preorder, so the subtree of each node occupies the contiguous range of preorder
+    numbers from the node itself up to subtree_end."""
+    preorder_of_node: List[int]
+    node_at: List[int]  # by preorder index
+    component_root: List[int]  # by preorder index
+    children: List[List[int]]  # by preorder index
+    low: List[int]  # by preorder index, lowest preorder index reachable from the subtree through one non-tree edge
+    subtree_end: List[int]  # by preorder index
+    is_cut_vertex: List[bool]  # by preorder index, whether deleting the node disconnects some of its neighbors
+
+@dataclass
+class FailedFalseEyeSearch:
+    """A piece of the EyeGraph left by deleting the point eloc of eye eye_id, reached by a macrochain bordering eloc
+    that therefore could not reach all the sides of eloc without passing through eloc. The piece consists of the
+    nodes with preorder index in forest from start up to end, except for those in the excluded ranges."""
+    eye_id: EyeId
+    eloc: Loc
+    graph: EyeGraph
+    forest: GraphForest
+    start: int
+    end: int
+    excluded_ranges: List[Tuple[int,int]]
+
+    def contains(self, index: int) -> bool:
+        if not (self.start <= index < self.end):
+            return False
+        return not any(range_start <= index < range_end for (range_start,range_end) in self.excluded_ranges)
+
+    def count(self, prefix_sums: List[int]) -> int:
+        """The number of nodes in the piece that are counted by the prefix sums over preorder indices."""
+        count = prefix_sums[self.end] - prefix_sums[self.start]
+        for (range_start,range_end) in self.excluded_ranges:
+            count -= prefix_sums[range_end] - prefix_sums[range_start]
+        return count
+
+def build_eye_graph(geom: BoardGeometry, eye_infos_by_id: Dict[EyeId,EyeInfo]) -> EyeGraph:
+    node_of_macrochain: Dict[MacroChainId,int] = {}
+    node_of_point: Dict[Loc,int] = {}
+    point_of_node: List[Loc] = []
+    eye_of_node: List[EyeId] = []
+    for eye_id, eye_info in eye_infos_by_id.items():
+        for macrochain_id in eye_info.macrochain_neighbors_from:
+            if macrochain_id not in node_of_macrochain:
+                node_of_macrochain[macrochain_id] = len(point_of_node)
+                point_of_node.append(-1)
+                eye_of_node.append(-1)
+        for loc in eye_info.potential_points:
+            node_of_point[loc] = len(point_of_node)
+            point_of_node.append(loc)
+            eye_of_node.append(eye_id)
+
+    adjacency: List[List[int]] = [[] for _ in point_of_node]
+    for eye_id, eye_info in eye_infos_by_id.items():
+        for macrochain_id, from_points in eye_info.macrochain_neighbors_from.items():
+            macrochain_node = node_of_macrochain[macrochain_id]
+            for loc in from_points:
+                adjacency[macrochain_node].append(node_of_point[loc])
+                adjacency[node_of_point[loc]].append(macrochain_node)
+        for loc in eye_info.potential_points:
+            node = node_of_point[loc]
+            for offset in geom.adj_offsets:
+                if loc + offset in eye_info.potential_points:
+                    adjacency[node].append(node_of_point[loc+offset])
+    return EyeGraph(adjacency=adjacency, node_of_point=node_of_point, point_of_node=point_of_node, eye_of_node=eye_of_node)
+
+def find_graph_forest(adjacency: List[List[int]]) -> GraphForest:
+    """Build the GraphForest of the graph, finding the cut vertices by Tarjan's algorithm with an explicit stack."""
+    num_nodes = len(adjacency)
+    preorder_of_node = [-1] * num_nodes
+    node_at = []
+    component_root = []
+    children = []
+    low = []
+    subtree_end = []
+    is_cut_vertex = [False] * num_nodes
+    for start in range(num_nodes):
+        if preorder_of_node[start] != -1:
+            continue
+        root = len(node_at)
+        preorder_of_node[start] = root
+        node_at.append(start)
+        component_root.append(root)
+        children.append([])
+        low.append(root)
+        subtree_end.append(root)
+        # Each entry is (preorder index, parent preorder index, iterator over the neighbors not yet looked at)
+        stack = [(root, -1, iter(adjacency[start]))]
+        while stack:
+            (index, parent, neighbors) = stack[-1]
+            for neighbor in neighbors:
+                nindex = preorder_of_node[neighbor]
+                if nindex == -1:
+                    nindex = len(node_at)
+                    preorder_of_node[neighbor] = nindex
+                    node_at.append(neighbor)
+                    component_root.append(root)
+                    children.append([])
+                    low.append(nindex)
+                    subtree_end.append(nindex)
+                    children[index].append(nindex)
+                    stack.append((nindex, index, iter(adjacency[neighbor])))
+                    break
+                if nindex != parent:
+                    low[index] = min(low[index], nindex)
+            else:
+                stack.pop()
+                subtree_end[index] = len(node_at)
+                if parent != -1:
+                    low[parent] = min(low[parent], low[index])
+                    if parent != root and low[index] >= parent:
+                        is_cut_vertex[parent] = True
+        if len(children[root]) >= 2:
+            is_cut_vertex[root] = True
+
+    return GraphForest(
+        preorder_of_node=preorder_of_node,
+        node_at=node_at,
+        component_root=component_root,
+        children=children,
+        low=low,
+        subtree_end=subtree_end,
+        is_cut_vertex=is_cut_vertex,
+    )
+
 def mark_false_eye_points(
-    ysize: int,
-    xsize: int,
-    region_ids: List[List[RegionId]],
-    macrochain_ids: List[List[MacroChainId]],
+    geom: BoardGeometry,
+    region_ids: List[RegionId],
+    macrochain_ids: List[MacroChainId],
     macrochain_infos_by_id: Dict[MacroChainId,MacroChainInfo],
     eye_infos_by_id: Dict[EyeId,EyeInfo],
-    is_false_eye_point: List[List[bool]],  # mutated by this function
+    is_false_eye_point: List[bool],  # mutated by this function
+    failed_searches: Optional[List[FailedFalseEyeSearch]] = None,  # if provided, mutated by this function to record the failing macrochains
 ):
     # Check each eye for false eye points
     # A point within a potential eye is a false eye point for life and death if there is some macrochain border of that
     # point that doesn't have any path to reach some other macrochain border of that eye other than connecting through
     # that point itself. It is allowed to go through other eyes or macrochains, following normal adjacency, as well as
     # going through other points *within* the same eye.
-    # A point is additionally an unscorable false eye point if that macrochain doesn't reach any real point of any eye
-    # with eyevalue >= 1, including real points of the eye itself.
-    # This method checks for unscorable false eye points, but it will check for life and death false eye points if you
-    # call it while eyevalues are all 0 (which is good, since eye value computation uses the false eye determination).
+    # See mark_unscorable_false_eye_points for whether a false eye point is additionally unscorable.
+    #
+    # In terms of the EyeGraph, the borders of a point that need to be reached are exactly its neighbors in the graph -
+    # the bordering macrochains, and the adjacent point within the eye if any. So the point is false precisely if it is
+    # a cut vertex of the graph, which is found for all points at once in linear time. The same depth-first search also
+    # gives the pieces left by deleting each point as ranges of its preorder, so no further searches are needed.
+    graph = build_eye_graph(geom,eye_infos_by_id)
+    forest = find_graph_forest(graph.adjacency)
+    preorder_of_node = forest.preorder_of_node
+    subtree_end = forest.subtree_end
+
     for orig_eye_id, orig_eye_info in eye_infos_by_id.items():
-        for orig_macrochain_id, neighbors_from_eye_points in orig_eye_info.macrochain_neighbors_from.items():
-            # Check each point to see if it's going to be false
-            for ey,ex in neighbors_from_eye_points:
-                # Cannot be a false eye point if it is adjacent to more than one other point within the eye.
-                same_eye_adj_count = sum(1 for point in [(ey-1,ex),(ey+1,ex),(ey,ex-1),(ey,ex+1)] if point in orig_eye_info.potential_points)
-                if same_eye_adj_count > 1:
-                    continue
+        # Only points bordering some macrochain are checked
+        candidates = set()
+        for neighbors_from_eye_points in orig_eye_info.macrochain_neighbors_from.values():
+            candidates.update(neighbors_from_eye_points)
+
+        for eloc in candidates:
+            index = preorder_of_node[graph.node_of_point[eloc]]
+            if not forest.is_cut_vertex[index]:
+                continue
+            # Cannot be a false eye point if it is adjacent to more than one other point within the eye.
+            if count_adjacents_in(geom,eloc,orig_eye_info.potential_points) > 1:
+                continue
+            is_false_eye_point[eloc] = True
+
+            if failed_searches is not None:
+                # Each child subtree with no edge leading above the deleted point is its own piece, and the rest of the
+                # component is one more piece. Since the point is a cut vertex, no piece holds all of its neighbors.
+                separated_children = [child for child in forest.children[index] if forest.low[child] >= index]
+                root = forest.component_root[index]
+                rest_excluded_ranges = [(index, index+1)] + [(child, subtree_end[child]) for child in separated_children]
+                pieces_found = set()
+                for neighbor in graph.adjacency[graph.node_of_point[eloc]]:
+                    if graph.eye_of_node[neighbor] != -1:
+                        continue
+                    nindex = preorder_of_node[neighbor]
+                    piece = next((child for child in separated_children if child <= nindex < subtree_end[child]), -1)
+                    if piece in pieces_found:
+                        continue
+                    pieces_found.add(piece)
+                    if piece == -1:
+                        (start, end, excluded_ranges) = (root, subtree_end[root], rest_excluded_ranges)
+                    else:
+                        (start, end, excluded_ranges) = (piece, subtree_end[piece], [])
+                    failed_searches.append(FailedFalseEyeSearch(
+                        eye_id=orig_eye_id,
+                        eloc=eloc,
+                        graph=graph,
+                        forest=forest,
+                        start=start,
+                        end=end,
+                        excluded_ranges=excluded_ranges,
+                    ))
+
+def mark_unscorable_false_eye_points(
+    eye_infos_by_id: Dict[EyeId,EyeInfo],
+    failed_searches: List[FailedFalseEyeSearch],
+    is_unscorable_false_eye_point: List[bool],  # mutated by this function
+):
+    """Mark the false eye points that should not be scored, given eye values and the failed searches recorded
+    by mark_false_eye_points.
+
+    A false eye point is unscorable if some bordering macrochain can neither reach all the sides of that point
+    without passing through it, nor reach any other eye with positive eye value, nor any real point of its own eye
+    if that eye has positive eye value."""
+    # Per forest, prefix sums over the preorder counting real points of eyes with positive eye value, which make any
+    # piece containing them scorable, and the false points of such eyes, which do unless they are in the searched eye.
+    counts_by_forest = {}
+    for search in failed_searches:
+        counts = counts_by_forest.get(id(search.forest))
+        if counts is None:
+            graph = search.graph
+            prefix_sums = [0]
+            false_points = []
+            for (index,node) in enumerate(search.forest.node_at):
+                eye_id = graph.eye_of_node[node]
+                is_positive_real_point = False
+                if eye_id != -1 and eye_infos_by_id[eye_id].eye_value > 0:
+                    if graph.point_of_node[node] in eye_infos_by_id[eye_id].real_points:
+                        is_positive_real_point = True
+                    else:
+                        false_points.append((index,eye_id))
+                prefix_sums.append(prefix_sums[-1] + (1 if is_positive_real_point else 0))
+            counts = (prefix_sums, false_points)
+            counts_by_forest[id(search.forest)] = counts
+
+        (prefix_sums, false_points) = counts
+        if search.count(prefix_sums) > 0:
+            continue
+        if any(eye_id != search.eye_id and search.contains(index) for (index,eye_id) in false_points):
+            continue
+        is_unscorable_false_eye_point[search.eloc] = True
 
-                # See if the macrochain connects recursively to anything that reaches the eye again from *all* possible sides.
-                # Or if it reaches an eye with positive eye value.
-                reaching_sides = set()
-                visited_macro = set()
-                visited_other_eyes = set()
-                visited_orig_eye_points = set()
-                # Add to visited orig eye points so we can exclude any visits to it
-                visited_orig_eye_points.add((ey,ex))
-
-                # How many sides we need to reach for it NOT to be false.
-                target_side_count = 0
-                for (y,x) in [(ey-1,ex),(ey+1,ex),(ey,ex-1),(ey,ex+1)]:
-                    # Obviously we don't need to reach an eye from off the board
-                    # More subtly, we don't need to reach from directions that are out of the region entirely
-                    # This applies to "eyes" that are surrounded loosely.
-                    if is_on_board(y,x,ysize,xsize) and region_ids[y][x] == orig_eye_info.region_id:
-                        target_side_count += 1
-
-                # print(f"TESTING MACRO {orig_macrochain_id} for eye {orig_eye_id} at {ey} {ex}")
-                def search(macrochain_id: MacroChainId):
-                    if macrochain_id in visited_macro:
-                        return False
-                    visited_macro.add(macrochain_id)
-                    # print(f"SEARCH {macrochain_id}")
-
-                    macrochain_info = macrochain_infos_by_id[macrochain_id]
-                    for eye_id, neighbors_from_macro_points in macrochain_info.eye_neighbors_from.items():
-                        if eye_id in visited_other_eyes:
-                            continue
-                        # print(f"SEARCH EYE {eye_id}")
-                        if eye_id == orig_eye_id:
-                            eye_info = eye_infos_by_id[eye_id]
-                            # print(f"REACHED ORIG")
-                            for (y,x) in neighbors_from_macro_points:
-                                if is_adjacent(y,x,ey,ex):
-                                    reaching_sides.add((y,x))
-                                    # print(f"REACHED SIDES {reaching_sides} {target_side_count}")
-                            if len(reaching_sides) >= target_side_count:
-                                return True
-
-                            # If we reached the original eye at other points besides the point being tested for falseness,
-                            # we specially handle propagation through them. Find all points reachable excluding the point being tested.
-                            points_reached = find_recursively_adjacent_points(
-                                within_set=eye_info.potential_points,
-                                from_points=eye_info.macrochain_neighbors_from[macrochain_id],
-                                excluding_points=visited_orig_eye_points,
-                            )
-                            if len(points_reached) == 0:
-                                continue
-                            visited_orig_eye_points.update(points_reached)
-
-                            # Reaches real point of the same eye with positive eye value?
-                            if eye_info.eye_value > 0:
-                                for point in points_reached:
-                                    if point in eye_info.real_points:
-                                        return True
-
-                            # Continue to count sides reached of the possible false eye point
-                            for point in points_reached:
-                                (y,x) = point
-                                if is_adjacent(y,x,ey,ex):
-                                    reaching_sides.add(point)
-                                    # print(f"REACHED SIDES {reaching_sides} {target_side_count}")
-                            if len(reaching_sides) >= target_side_count:
-                                return True
-
-                            # Then find all macrochains adjacent to one of those points and recurse propagation through them
-                            for next_macrochain_id, from_eye_points in eye_info.macrochain_neighbors_from.items():
-                                if any(point in points_reached for point in from_eye_points):
-                                    if search(next_macrochain_id):
-                                        return True
-                        else:
-                            visited_other_eyes.add(eye_id)
-                            eye_info = eye_infos_by_id[eye_id]
-                            if eye_info.eye_value > 0:
-                                return True
-                            for next_macrochain_id in eye_info.macrochain_neighbors_from:
-                                if search(next_macrochain_id):
-                                    return True
-                    return False
-
-                # Found a connection to a second point or reaching from all sides or found a different eye with positive eye value?
-                if search(orig_macrochain_id):
-                    # Not a false eye
-                    # print(f"TESTING MACRO {orig_macrochain_id} for eye {orig_eye_id} TRUE")
-                    pass
-                else:
-                    # print(f"TESTING MACRO {orig_macrochain_id} for eye {orig_eye_id} FALSE")
-                    is_false_eye_point[ey][ex] = True
-
-
-def find_recursively_adjacent_points(
-    within_set: Set[Tuple[int,int]],
-    from_points: Set[Tuple[int,int]],
-    excluding_points: Set[Tuple[int,int]]
-) -> Set[Tuple[int,int]]:
-    expanded = set()
-    from_points = list(from_points)
-    i = 0
-    while i < len(from_points):
-        point = from_points[i]
-        i += 1
-        if point in excluding_points or point in expanded or point not in within_set:
+@dataclass
+class Bottlenecks:
+    """A depth-first search forest over the graph of adjacent points within a set of points, annotated so that the
+    pieces resulting from deleting any single point can be found without flood filling again.
+    Nodes are numbered in preorder, so the subtree of each node occupies the contiguous range of numbers from the
+    node itself up to subtree_end, and counts over a subtree come from prefix sums over the preorder."""
+    index_of: Dict[Loc,int]
+    component_roots: List[int]
+    component_root: List[int]  # by preorder index
+    children: List[List[int]]  # by preorder index
+    low: List[int]  # by preorder index, lowest preorder index reachable from the subtree through one non-tree edge
+    subtree_end: List[int]  # by preorder index
+    count_prefix_sums: List[List[int]]  # for each predicate, by preorder index
+
+def find_bottlenecks(
+    geom: BoardGeometry,
+    points: Set[Loc],
+    predicates: Sequence[Callable[[Loc],bool]] = (),
+) -> Bottlenecks:
+    """Build the Bottlenecks of the given points, counting the points satisfying each predicate for get_piece_counts."""
+    adj_offsets = geom.adj_offsets
+    index_of = {}
+    locs = []
+    component_roots = []
+    component_root = []
+    children = []
+    low = []
+    subtree_end = []
+    for start in points:
+        if start in index_of:
             continue
-        expanded.add(point)
-        (y,x) = point
-        from_points.append((y-1,x))
-        from_points.append((y+1,x))
-        from_points.append((y,x-1))
-        from_points.append((y,x+1))
-    return expanded
-
-
-def get_pieces(ysize: int, xsize: int, points: Set[Tuple[int,int]], points_to_delete: Set[Tuple[int,int]]) -> List[Set[Tuple[int,int]]]:
-    """Get the connected pieces resulting from deleting the given point"""
-    used_points = set()
-
-    def floodfill(point, piece: Set[Tuple[int,int]]):
-        if point in used_points or point in points_to_delete:
-            return
-        used_points.add(point)
-        piece.add(point)
-
-        (y,x) = point
-        adjacents = [(y-1,x),(y+1,x),(y,x-1),(y,x+1)]
-        for point in adjacents:
-            if point in points:
-                floodfill(point,piece)
-
-    pieces = []
-    for point in points:
-        if point not in used_points:
-            piece = set()
-            floodfill(point,piece)
-            if len(piece) > 0:
-                pieces.append(piece)
-    return pieces
-
-def is_pseudolegal(
-    ysize: int,
-    xsize: int,
-    stones: List[List[Color]],
-    chain_ids: List[List[ChainId]],
-    chain_infos_by_id: Dict[ChainId,ChainInfo],
-    y: int,
-    x: int,
-    pla: Color,
-) -> bool:
-    if stones[y][x] != EMPTY:
-        return False
-    adjacents = [(y-1,x),(y+1,x),(y,x-1),(y,x+1)]
-    opp = get_opp(pla)
-    for (ay,ax) in adjacents:
-        if is_on_board(ay,ax,ysize,xsize):
-            if stones[ay][ax] != opp:
-                return True
-            if len(chain_infos_by_id[chain_ids[ay][ax]].liberties) <= 1:
-                return True
-    return False
-
-def count_adjacents_in(y: int, x: int, points: Set[Tuple[int,int]]) -> int:
+        root = len(locs)
+        component_roots.append(root)
+        index_of[start] = root
+        locs.append(start)
+        component_root.append(root)
+        children.append([])
+        low.append(root)
+        subtree_end.append(root)
+        # Each entry is (loc, preorder index, parent preorder index, iterator over offsets not yet looked at)
+        stack = [(start, root, -1, iter(adj_offsets))]
+        while stack:
+            (loc, index, parent, offsets) = stack[-1]
+            for offset in offsets:
+                aloc = loc + offset
+                if aloc not in points:
+                    continue
+                aindex = index_of.get(aloc)
+                if aindex is None:
+                    aindex = len(locs)
+                    index_of[aloc] = aindex
+                    locs.append(aloc)
+                    component_root.append(root)
+                    children.append([])
+                    low.append(aindex)
+                    subtree_end.append(aindex)
+                    children[index].append(aindex)
+                    stack.append((aloc, aindex, index, iter(adj_offsets)))
+                    break
+                if aindex != parent:
+                    low[index] = min(low[index], aindex)
+            else:
+                stack.pop()
+                subtree_end[index] = len(locs)
+                if parent != -1:
+                    low[parent] = min(low[parent], low[index])
+
+    count_prefix_sums = []
+    for predicate in predicates:
+        prefix_sums = [0]
+        for loc in locs:
+            prefix_sums.append(prefix_sums[-1] + (1 if predicate(loc) else 0))
+        count_prefix_sums.append(prefix_sums)
+
+    return Bottlenecks(
+        index_of=index_of,
+        component_roots=component_roots,
+        component_root=component_root,
+        children=children,
+        low=low,
+        subtree_end=subtree_end,
+        count_prefix_sums=count_prefix_sums,
+    )
+
+def get_piece_counts(bottlenecks: Bottlenecks, point_to_delete: Loc) -> List[List[int]]:
+    """For each connected piece of the points left by deleting the given point, how many points of the piece satisfy
+    each predicate."""
+    index = bottlenecks.index_of[point_to_delete]
+    root = bottlenecks.component_root[index]
+    subtree_end = bottlenecks.subtree_end
+    count_prefix_sums = bottlenecks.count_prefix_sums
+
+    def subtree_counts(subtree):
+        return [prefix_sums[subtree_end[subtree]] - prefix_sums[subtree] for prefix_sums in count_prefix_sums]
+
+    piece_counts = [subtree_counts(other_root) for other_root in bottlenecks.component_roots if other_root != root]
+
+    # Each child subtree that has no edge leading above the deleted point becomes its own piece, and whatever is left
+    # of the component above the deleted point and in the remaining child subtrees is one more piece.
+    rest_size = subtree_end[root] - root - 1
+    rest_counts = [prefix_sums[subtree_end[root]] - prefix_sums[root] - prefix_sums[index+1] + prefix_sums[index] for prefix_sums in count_prefix_sums]
+    for child in bottlenecks.children[index]:
+        if bottlenecks.low[child] >= index:
+            counts = subtree_counts(child)
+            piece_counts.append(counts)
+            rest_size -= subtree_end[child] - child
+            rest_counts = [rest_count - count for (rest_count,count) in zip(rest_counts,counts)]
+    if rest_size > 0:
+        piece_counts.append(rest_counts)
+    return piece_counts
+
+def count_pieces(bottlenecks: Bottlenecks, point_to_delete: Loc) -> int:
+    """The number of connected pieces of the points left by deleting the given point."""
+    index = bottlenecks.index_of[point_to_delete]
+    root = bottlenecks.component_root[index]
+    subtree_end = bottlenecks.subtree_end
+    num_pieces = len(bottlenecks.component_roots) - 1
+    rest_size = subtree_end[root] - root - 1
+    for child in bottlenecks.children[index]:
+        if bottlenecks.low[child] >= index:
+            num_pieces += 1
+            rest_size -= subtree_end[child] - child
+    if rest_size > 0:
+        num_pieces += 1
+    return num_pieces
+
+def count_adjacents_in(geom: BoardGeometry, loc: Loc, points: Set[Loc]) -> int:
     count = 0
-    adjacents = [(y-1,x),(y+1,x),(y,x-1),(y,x+1)]
-    for a in adjacents:
-        if a in points:
+    for offset in geom.adj_offsets:
+        if loc + offset in points:
             count += 1
     return count
 
 @dataclass
 class EyePointInfo:
-    adj_points: List[Tuple[int,int]]
-    adj_eye_points: List[Tuple[int,int]]
+    adj_points: List[Loc]
+    adj_eye_points: List[Loc]
     num_empty_adj_points: int = 0
     num_empty_adj_false_points: int = 0
     num_empty_adj_eye_points: int = 0
@@ -1066,336 +2378,995 @@ class EyePointInfo:
 
 def count(points,predicate):
     c = 0
-    for (y,x) in points:
-        if predicate(y,x):
+    for loc in points:
+        if predicate(loc):
             c += 1
     return c
 
 def mark_eye_values(
-    ysize: int,
-    xsize: int,
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
-    region_ids: List[List[RegionId]],
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    region_ids: List[RegionId],
     region_infos_by_id: Dict[RegionId,RegionInfo],
-    chain_ids: List[List[ChainId]],
-    chain_infos_by_id: Dict[ChainId,ChainInfo],
-    is_false_eye_point: List[List[bool]],
-    eye_ids: List[List[EyeId]],
+    is_pseudolegal_for: List[List[bool]],
+    is_false_eye_point: List[bool],
+    eye_ids: List[EyeId],
     eye_infos_by_id: Dict[EyeId,EyeInfo],  # mutated by this function to fill in eye value
+    eye_value_cache: Optional["EyeValueCache"] = None,  # mutated by this function, if given
 ):
     for eye_id, eye_info in eye_infos_by_id.items():
-        pla = eye_info.pla
-        opp = get_opp(pla)
-
         # Fill in real points of eye
-        # And let's accumulate various stats about the points in the eye
-        info_by_point = {}
         assert len(eye_info.real_points) == 0  # shouldn't be filled in yet
-        for (y,x) in eye_info.potential_points:
-            if not is_false_eye_point[y][x]:
-                eye_info.real_points.add((y,x))
-                info = EyePointInfo(adj_points=[],adj_eye_points=[])
-                info_by_point[(y,x)] = info
-
-        for (y,x) in eye_info.real_points:
-            info = info_by_point[(y,x)]
-            adjacents = [(y-1,x),(y+1,x),(y,x-1),(y,x+1)]
-            for (ay,ax) in adjacents:
-                if not is_on_board(ay,ax,ysize,xsize):
-                    continue
-                info.adj_points.append((ay,ax))
-                if (ay,ax) in eye_info.real_points:
-                    info.adj_eye_points.append((ay,ax))
-
-        for (y,x) in eye_info.real_points:
-            info = info_by_point[(y,x)]
-            for (ay,ax) in info.adj_points:
-                if stones[ay][ax] == EMPTY:
-                    info.num_empty_adj_points += 1
-                if stones[ay][ax] == EMPTY and (ay,ax) in eye_info.real_points:
-                    info.num_empty_adj_eye_points += 1
-                if stones[ay][ax] == EMPTY and is_false_eye_point[ay][ax]:
-                    info.num_empty_adj_false_points += 1
-                if stones[ay][ax] == opp and is_false_eye_point[ay][ax]:
-                    info.num_opp_adj_false_points += 1
-
-            if info.num_opp_adj_false_points > 0 and stones[y][x] == opp:
-                info.is_false_eye_poke = True
-            if info.num_empty_adj_false_points >= 2 and stones[y][x] == opp:
-                info.is_false_eye_poke = True  # miai to make the poke
-
-        for (y,x) in eye_info.real_points:
-            info = info_by_point[(y,x)]
-            info.num_moves_to_block = 0
-            info.num_moves_to_block_no_opps = 0
-            for (ay,ax) in info.adj_points:
-                block = 0
-                if stones[ay][ax] == EMPTY and (ay,ax) not in eye_info.real_points:
-                    block = 1
-                if stones[ay][ax] == EMPTY and (ay,ax) in info_by_point and info_by_point[(ay,ax)].num_opp_adj_false_points >= 1:
-                    block = 1
-                if stones[ay][ax] == opp and (ay,ax) in info_by_point and info_by_point[(ay,ax)].num_empty_adj_false_points >= 1:
-                    block = 1
-                if stones[ay][ax] == opp and is_false_eye_point[ay][ax]:
-                    block = 1000
-                if stones[ay][ax] == opp and (ay,ax) in info_by_point and info_by_point[(ay,ax)].is_false_eye_poke:
-                    block = 1000
-                info.num_moves_to_block += block
-
-        # Try to compute the eye value of this eye
-        # A lot of the cases are just heuristic and are not entirely correct, but
-        # it should be very rare for them to not be fixable by playing more dame and connecting more false eye shapes and such.
-        eye_value = 0
-        # General for all eyes - if the eye contains a point that can be blocked off in one move or less,
-        # we treat it at as at least one eye (favoring the defender for unsettled)
-        if count(eye_info.real_points, lambda y,x: info_by_point[(y,x)].num_moves_to_block <= 1) >= 1:
-            eye_value = 1
-
-        # General for all eyes - if the eye contains a topologically interior bottleneck with respect
-        # to the graph of points contained only within the eye itself and it can be played
-        # and there are at least N pieces that have a point with <= 0 moves to block off, count N eye value
+        for loc in eye_info.potential_points:
+            if not is_false_eye_point[loc]:
+                eye_info.real_points.add(loc)
+
+        # Small solid eyes are looked up in the pregenerated table.
+        eye_value = lookup_solid_eye_value(geom,stones,marked_dead,eye_info)
+        if eye_value is not None:
+            eye_info.eye_value = eye_value
+            continue
+
+        if eye_value_cache is None:
+            eye_info.eye_value = compute_eye_value(geom,stones,marked_dead,is_pseudolegal_for,is_false_eye_point,eye_info)
+            continue
+
+        # The eye value only depends on the eye's shape and immediate surroundings, which recur often across positions.
+        key = get_eye_shape_key(geom,stones,marked_dead,is_pseudolegal_for,is_false_eye_point,eye_info)
+        eye_value = eye_value_cache.get(key)
+        if eye_value is None:
+            eye_value = compute_eye_value(geom,stones,marked_dead,is_pseudolegal_for,is_false_eye_point,eye_info)
+            eye_value_cache.store(key,eye_value)
+        eye_info.eye_value = eye_value
+
+# Largest solid eyes in EYE_VALUE_TABLE, and largest with dead stones.
+EYE_VALUE_TABLE_MAX_EYE_SIZE = 7
+EYE_VALUE_TABLE_MAX_DEAD_STONE_EYE_SIZE = 4
+
+def get_solid_eye_edge_index(low: int, high: int, low_edge: int, high_edge: int) -> int:
+    """0 if the eye spanning low to high touches the low edge, 2 if it touches the high edge, 1 if neither,
+    and -1 if both."""
+    if low == low_edge:
+        return -1 if high == high_edge else 0
+    return 2 if high == high_edge else 1
+
+def lookup_solid_eye_value(
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    eye_info: EyeInfo,
+) -> Optional[int]:
+    """Return the eye value of the eye from EYE_VALUE_TABLE if it is a solid eye - no false eye points, bordered only
+    by living stones of its player and the edges of the board, every point either empty or a dead opponent stone -
+    of a shape and placement covered by the table, and None otherwise. See generate_eye_table.py."""
+    real_points = eye_info.real_points
+    if len(real_points) > EYE_VALUE_TABLE_MAX_EYE_SIZE or len(real_points) != len(eye_info.potential_points):
+        return None
+    stride = geom.stride
+    pla = eye_info.pla
+    opp = get_opp(pla)
+    for loc in real_points:
+        if stones[loc] == EMPTY:
+            if marked_dead[loc]:
+                return None
+        elif stones[loc] != opp or not marked_dead[loc]:
+            return None
+        for offset in geom.adj_offsets:
+            aloc = loc + offset
+            if aloc in real_points or stones[aloc] == WALL:
+                continue
+            if stones[aloc] != pla or marked_dead[aloc]:
+                return None
+
+    min_y = min(loc // stride for loc in real_points)
+    max_y = max(loc // stride for loc in real_points)
+    min_x = min(loc % stride for loc in real_points)
+    max_x = max(loc % stride for loc in real_points)
+    row_index = get_solid_eye_edge_index(min_y,max_y,1,geom.ysize)
+    column_index = get_solid_eye_edge_index(min_x,max_x,1,geom.xsize)
+    if row_index < 0 or column_index < 0:
+        return None
+
+    width = max_x - min_x + 1
+    mask = 0
+    dead_mask = 0
+    for loc in real_points:
+        bit = 1 << ((loc // stride - min_y) * width + (loc % stride - min_x))
+        mask |= bit
+        if stones[loc] != EMPTY:
+            dead_mask |= bit
+    values = EYE_VALUE_TABLE.get((max_y - min_y + 1, width, mask, dead_mask))
+    if values is None:
+        return None
+    if len(values) == 1:
+        return int(values)
+    return int(values[row_index * 3 + column_index])
+
+EYE_VALUE_CACHE_CAPACITY = 4096
+
+class EyeValueCache:
+    """The most recently used eye values computed by compute_eye_value, by get_eye_shape_key. Owned by a ScratchPool
+    or a ScoringSession and passed explicitly to mark_eye_values, so like those it must not be used by more than one
+    call at a time."""
+
+    def __init__(self, capacity: int = EYE_VALUE_CACHE_CAPACITY):
+        self.capacity = capacity
+        self.values: "OrderedDict[Tuple[int,...],int]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def clear(self):
+        self.values.clear()
+
+    def get(self, key: Tuple[int,...]) -> Optional[int]:
+        # Reinsert on a hit to mark the key as most recently used.
+        value = self.values.pop(key,None)
+        if value is not None:
+            self.values[key] = value
+        return value
+
+    def store(self, key: Tuple[int,...], value: int):
+        self.values[key] = value
+        if len(self.values) > self.capacity:
+            self.values.popitem(last=False)
+
+def get_eye_shape_key(
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    is_pseudolegal_for: List[List[bool]],
+    is_false_eye_point: List[bool],
+    eye_info: EyeInfo,
+) -> Tuple[int,...]:
+    """Encode everything that compute_eye_value reads about the eye - its real points relative to their top left
+    corner, and for each the stone relative to the eye's player, dead marking, whether it is on the border of the
+    board, pseudolegality and the state of its adjacent points, plus the number of opponent stones in false eye
+    points of the eye - so that eyes with equal keys have equal eye values."""
+    stride = geom.stride
+    adj_offsets = geom.adj_offsets
+    is_border = geom.is_border
+    pla = eye_info.pla
+    opp = get_opp(pla)
+    is_pseudolegal = is_pseudolegal_for[pla]
+    # WALL and EMPTY keep their codes, pla and opp stones are swapped to 1 and 2 for white eyes.
+    relative_color = (EMPTY,BLACK,WHITE,WALL) if pla == BLACK else (EMPTY,WHITE,BLACK,WALL)
+
+    points = sorted(eye_info.real_points)
+    min_y = min((loc // stride for loc in points), default=0)
+    min_x = min((loc % stride for loc in points), default=0)
+    key = [count(eye_info.potential_points, lambda loc: stones[loc] == opp and is_false_eye_point[loc])]
+    for loc in points:
+        code = relative_color[stones[loc]]
+        code = code * 2 + (1 if marked_dead[loc] else 0)
+        code = code * 2 + (1 if is_border[loc] else 0)
+        code = code * 2 + (1 if is_pseudolegal[loc] else 0)
+        for offset in adj_offsets:
+            aloc = loc + offset
+            code = code * 8 + relative_color[stones[aloc]] * 2 + (1 if is_false_eye_point[aloc] else 0)
+        key.append(loc // stride - min_y)
+        key.append(loc % stride - min_x)
+        key.append(code)
+    return tuple(key)
+
+def compute_eye_value(
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    is_pseudolegal_for: List[List[bool]],
+    is_false_eye_point: List[bool],
+    eye_info: EyeInfo,
+) -> int:
+    adj_offsets = geom.adj_offsets
+    is_border = geom.is_border
+    pla = eye_info.pla
+    opp = get_opp(pla)
+    is_pseudolegal = is_pseudolegal_for[pla]
+
+    # Let's accumulate various stats about the points in the eye
+    info_by_point = {}
+    for loc in eye_info.real_points:
+        info_by_point[loc] = EyePointInfo(adj_points=[],adj_eye_points=[])
+
+    for loc in eye_info.real_points:
+        info = info_by_point[loc]
+        for offset in adj_offsets:
+            aloc = loc + offset
+            if stones[aloc] == WALL:
+                continue
+            info.adj_points.append(aloc)
+            if aloc in eye_info.real_points:
+                info.adj_eye_points.append(aloc)
+
+    for loc in eye_info.real_points:
+        info = info_by_point[loc]
+        for aloc in info.adj_points:
+            if stones[aloc] == EMPTY:
+                info.num_empty_adj_points += 1
+            if stones[aloc] == EMPTY and aloc in eye_info.real_points:
+                info.num_empty_adj_eye_points += 1
+            if stones[aloc] == EMPTY and is_false_eye_point[aloc]:
+                info.num_empty_adj_false_points += 1
+            if stones[aloc] == opp and is_false_eye_point[aloc]:
+                info.num_opp_adj_false_points += 1
+
+        if info.num_opp_adj_false_points > 0 and stones[loc] == opp:
+            info.is_false_eye_poke = True
+        if info.num_empty_adj_false_points >= 2 and stones[loc] == opp:
+            info.is_false_eye_poke = True  # miai to make the poke
+
+    for loc in eye_info.real_points:
+        info = info_by_point[loc]
+        info.num_moves_to_block = 0
+        info.num_moves_to_block_no_opps = 0
+        for aloc in info.adj_points:
+            block = 0
+            if stones[aloc] == EMPTY and aloc not in eye_info.real_points:
+                block = 1
+            if stones[aloc] == EMPTY and aloc in info_by_point and info_by_point[aloc].num_opp_adj_false_points >= 1:
+                block = 1
+            if stones[aloc] == opp and aloc in info_by_point and info_by_point[aloc].num_empty_adj_false_points >= 1:
+                block = 1
+            if stones[aloc] == opp and is_false_eye_point[aloc]:
+                block = 1000
+            if stones[aloc] == opp and aloc in info_by_point and info_by_point[aloc].is_false_eye_poke:
+                block = 1000
+            info.num_moves_to_block += block
+
+    # Try to compute the eye value of this eye
+    # A lot of the cases are just heuristic and are not entirely correct, but
+    # it should be very rare for them to not be fixable by playing more dame and connecting more false eye shapes and such.
+    eye_value = 0
+    # General for all eyes - if the eye contains a point that can be blocked off in one move or less,
+    # we treat it at as at least one eye (favoring the defender for unsettled)
+    if count(eye_info.real_points, lambda loc: info_by_point[loc].num_moves_to_block <= 1) >= 1:
+        eye_value = 1
+
+    # General for all eyes - if the eye contains a topologically interior bottleneck with respect
+    # to the graph of points contained only within the eye itself and it can be played
+    # and there are at least N pieces that have a point with <= 0 moves to block off, count N eye value
+    # The pieces for every bottleneck come from a single traversal of the eye, counting for each piece its points
+    # with <= 0 and <= 1 moves to block.
+    bottlenecks = find_bottlenecks(geom,eye_info.real_points,[
+        lambda loc: info_by_point[loc].num_moves_to_block <= 0,
+        lambda loc: info_by_point[loc].num_moves_to_block <= 1,
+    ])
+    for point_to_delete in eye_info.real_points:
+        if not is_pseudolegal[point_to_delete]:
+            continue
+
+        piece_counts = get_piece_counts(bottlenecks,point_to_delete)
+        if len(piece_counts) < 2:
+            continue
+
+        # Also, pieces should accrue -1 moves to block if the bottleneck itself was the only reason.
+        # Since playing the bottleneck move will actually perform that block
+        should_bonus = info_by_point[point_to_delete].num_opp_adj_false_points == 1
+
+        num_definite_eye_pieces = count(piece_counts, lambda counts: counts[0] > 0 or (should_bonus and counts[1] > 0))
+        eye_value = max(eye_value, num_definite_eye_pieces)
+
+    # General for all eyes - assume 1 eye value if there are at least 5 stones marked as dead in the eye
+    # General for all eyes - assume 2 eye value if there are at least 8 stones marked as dead in the eye
+    marked_dead_count = count(eye_info.real_points, lambda loc: stones[loc] == opp and marked_dead[loc])
+    if marked_dead_count >= 5:
+        eye_value = max(eye_value, 1)
+    if marked_dead_count >= 8:
+        eye_value = max(eye_value, 2)
+
+    # General for all eyes - assume 2 eye value if the size of the eye minus the number of weaknesses (counting severe weaknesses 2x)
+    # minus the number of opponent stones inside on degree >= 2 points is at least 6.
+    if eye_value < 2 and (
+        len(eye_info.real_points)
+        - count(eye_info.real_points, lambda loc: info_by_point[loc].num_moves_to_block >= 1)
+        - count(eye_info.real_points, lambda loc: info_by_point[loc].num_moves_to_block >= 2)
+        - count(eye_info.real_points, lambda loc: stones[loc] == opp and len(info_by_point[loc].adj_eye_points) >= 2)
+        >= 6
+    ):
+        eye_value = max(eye_value, 2)
+
+    # General for all eyes - assume 2 eye value if there are many empty degree 3 or 4 points inside.
+    if eye_value < 2 and (
+        count(eye_info.real_points, lambda loc: stones[loc] == EMPTY and len(info_by_point[loc].adj_eye_points) >= 4) +
+        count(eye_info.real_points, lambda loc: stones[loc] == EMPTY and len(info_by_point[loc].adj_eye_points) >= 3)
+        >= 6
+    ):
+        eye_value = max(eye_value, 2)
+
+
+    # General for all eyes - assume 2 eye value if there are two adjacent degree >= 3 points at least one of which is playable
+    # and not on the border and the other is empty or has an empty eye neighbor besides the first.
+    # And it splits the space into at least two pieces for which each piece has a point with num_moves_to_block == 0 and
+    # at least one piece has two such points and at least two such pieces if the other point was not also empty.
+    if eye_value < 2:
         for point_to_delete in eye_info.real_points:
-            (dy,dx) = point_to_delete
-            if not is_pseudolegal(ysize,xsize,stones,chain_ids,chain_infos_by_id,dy,dx,pla):
+            if stones[point_to_delete] != EMPTY:
+                continue
+            if is_border[point_to_delete]:
+                continue
+            if not is_pseudolegal[point_to_delete]:
                 continue
 
-            pieces = get_pieces(ysize,xsize,eye_info.real_points,set([point_to_delete]))
-            if len(pieces) < 2:
+            info1 = info_by_point[point_to_delete]
+            if info1.num_moves_to_block > 1 or len(info1.adj_eye_points) < 3:
                 continue
 
-            # Also, pieces should accrue -1 moves to block if the bottleneck itself was the only reason.
-            # Since playing the bottleneck move will actually perform that block
-            should_bonus = info_by_point[(dy,dx)].num_opp_adj_false_points == 1
-
-            num_definite_eye_pieces = 0
-            for piece in pieces:
-                zero_moves_to_block = False
-                for point in piece:
-                    if info_by_point[point].num_moves_to_block <= 0:
-                        zero_moves_to_block = True
-                        break
-                    if should_bonus and info_by_point[point].num_moves_to_block <= 1:
-                        zero_moves_to_block = True
-                        break
-                if zero_moves_to_block:
-                    num_definite_eye_pieces += 1
-            eye_value = max(eye_value, num_definite_eye_pieces)
-
-        # General for all eyes - assume 1 eye value if there are at least 5 stones marked as dead in the eye
-        # General for all eyes - assume 2 eye value if there are at least 8 stones marked as dead in the eye
-        marked_dead_count = count(eye_info.real_points, lambda y,x: stones[y][x] == opp and marked_dead[y][x])
-        if marked_dead_count >= 5:
-            eye_value = max(eye_value, 1)
-        if marked_dead_count >= 8:
-            eye_value = max(eye_value, 2)
-
-        # General for all eyes - assume 2 eye value if the size of the eye minus the number of weaknesses (counting severe weaknesses 2x)
-        # minus the number of opponent stones inside on degree >= 2 points is at least 6.
-        if eye_value < 2 and (
-            len(eye_info.real_points)
-            - count(eye_info.real_points, lambda y,x: info_by_point[(y,x)].num_moves_to_block >= 1)
-            - count(eye_info.real_points, lambda y,x: info_by_point[(y,x)].num_moves_to_block >= 2)
-            - count(eye_info.real_points, lambda y,x: stones[y][x] == opp and len(info_by_point[(y,x)].adj_eye_points) >= 2)
-            >= 6
-        ):
-            eye_value = max(eye_value, 2)
-
-        # General for all eyes - assume 2 eye value if there are many empty degree 3 or 4 points inside.
-        if eye_value < 2 and (
-            count(eye_info.real_points, lambda y,x: stones[y][x] == EMPTY and len(info_by_point[(y,x)].adj_eye_points) >= 4) +
-            count(eye_info.real_points, lambda y,x: stones[y][x] == EMPTY and len(info_by_point[(y,x)].adj_eye_points) >= 3)
-            >= 6
-        ):
-            eye_value = max(eye_value, 2)
-
-
-        # General for all eyes - assume 2 eye value if there are two adjacent degree >= 3 points at least one of which is playable
-        # and not on the border and the other is empty or has an empty eye neighbor besides the first.
-        # And it splits the space into at least two pieces for which each piece has a point with num_moves_to_block == 0 and
-        # at least one piece has two such points and at least two such pieces if the other point was not also empty.
-        if eye_value < 2:
-            for point_to_delete in eye_info.real_points:
-                (dy,dx) = point_to_delete
-                if stones[dy][dx] != EMPTY:
+            # Pieces after deleting both points are the pieces of the eye without the first point after deleting
+            # the second, so one traversal without the first point covers all the choices of the second.
+            bottlenecks_without = None
+            for adjacent in info1.adj_eye_points:
+                info2 = info_by_point[adjacent]
+                if len(info2.adj_eye_points) < 3:
                     continue
-                if is_on_border(dy,dx,ysize,xsize):
+                if info2.num_moves_to_block > 1:
                     continue
-                if not is_pseudolegal(ysize,xsize,stones,chain_ids,chain_infos_by_id,dy,dx,pla):
+                if stones[adjacent] != EMPTY and info2.num_empty_adj_eye_points <= 1:
                     continue
 
-                info1 = info_by_point[point_to_delete]
-                if info1.num_moves_to_block > 1 or len(info1.adj_eye_points) < 3:
-                    continue
 
-                for adjacent in info1.adj_eye_points:
-                    info2 = info_by_point[adjacent]
-                    if len(info2.adj_eye_points) < 3:
-                        continue
-                    if info2.num_moves_to_block > 1:
-                        continue
-                    dy2,dx2 = adjacent
-                    if stones[dy2][dx2] != EMPTY and info2.num_empty_adj_eye_points <= 1:
-                        continue
+                if bottlenecks_without is None:
+                    bottlenecks_without = find_bottlenecks(geom,eye_info.real_points - set([point_to_delete]),[
+                        lambda loc: info_by_point[loc].num_moves_to_block <= 0,
+                    ])
+                piece_counts = get_piece_counts(bottlenecks_without,adjacent)
+                if len(piece_counts) < 2:
+                    continue
 
+                num_definite_eye_pieces = count(piece_counts, lambda counts: counts[0] >= 1)
+                num_double_definite_eye_pieces = count(piece_counts, lambda counts: counts[0] >= 2)
 
-                    pieces = get_pieces(ysize,xsize,eye_info.real_points,set([point_to_delete,adjacent]))
-                    if len(pieces) < 2:
-                        continue
+                if (
+                    num_definite_eye_pieces >= 2 and
+                    num_double_definite_eye_pieces >= 1 and
+                    (stones[adjacent] == EMPTY or num_double_definite_eye_pieces >= 2)
+                ):
+                    eye_value = max(eye_value, 2)
+                    break
 
-                    num_definite_eye_pieces = 0
-                    num_double_definite_eye_pieces = 0
-                    for piece in pieces:
-                        num_zero_moves_to_block = 0
-                        for point in piece:
-                            if info_by_point[point].num_moves_to_block <= 0:
-                                num_zero_moves_to_block += 1
-                                if num_zero_moves_to_block >= 2:
-                                    break
-                        if num_zero_moves_to_block >= 1:
-                            num_definite_eye_pieces += 1
-                        if num_zero_moves_to_block >= 2:
-                            num_double_definite_eye_pieces += 1
-
-                    if (
-                        num_definite_eye_pieces >= 2 and
-                        num_double_definite_eye_pieces >= 1 and
-                        (stones[dy2][dx2] == EMPTY or num_double_definite_eye_pieces >= 2)
-                    ):
-                        eye_value = max(eye_value, 2)
-                        break
-
-                if eye_value >= 2:
+            if eye_value >= 2:
+                break
+
+    # General for all eyes - handle the case when the eye has no splittable points due to dead opponent stones
+    # but the dead opponent stones themselves would capture into a living shape
+    # Count how many pieces there are and how many bottleneck points there are that increase the number of pieces.
+    if eye_value < 2:
+        dead_opps_in_eye = set()
+        unplayable_in_eye = []
+        for point in eye_info.real_points:
+            if stones[point] == opp and marked_dead[point]:
+                dead_opps_in_eye.add(point)
+            # Also count any spot that is un-playable
+            elif not is_pseudolegal[point]:
+                unplayable_in_eye.append(point)
+
+        if len(dead_opps_in_eye) > 0:
+            # Penalize for each opponent dead stone lodged in a false eye point
+            num_throwins = 0
+            for loc in eye_info.potential_points:
+                if stones[loc] == opp and is_false_eye_point[loc]:
+                    num_throwins += 1
+
+            # Opponent can choose to omit any single unplayable spot, or none, the rest are treated as
+            # part of the eye.
+            possible_omissions = unplayable_in_eye.copy()
+            possible_omissions.append(None)
+
+            all_good_for_defender = True
+            for omitted in possible_omissions:
+                remaining_shape = dead_opps_in_eye.copy()
+                for point in unplayable_in_eye:
+                    if point != omitted:
+                        remaining_shape.add(point)
+
+                bottlenecks = find_bottlenecks(geom,remaining_shape)
+                initial_piece_count = len(bottlenecks.component_roots)
+                num_bottlenecks = 0
+                num_non_bottlenecks_high_degree = 0
+                for point_to_delete in remaining_shape:
+                    if count_pieces(bottlenecks,point_to_delete) > initial_piece_count:
+                        num_bottlenecks += 1
+                    elif count_adjacents_in(geom,point_to_delete,remaining_shape) >= 3:
+                        num_non_bottlenecks_high_degree += 1
+
+                # 7 point eye is always good for defender unless there are weaknesses
+                bonus = 0
+                if len(remaining_shape) >= 7:
+                    bonus = 1
+
+                if initial_piece_count - num_throwins + (num_bottlenecks + num_non_bottlenecks_high_degree + bonus) // 2 < 2:
+                    # print(f"{remaining_shape=}, {initial_piece_count=}, {num_throwins=}, {num_bottlenecks=}, {num_non_bottlenecks_high_degree=}")
+                    all_good_for_defender = False
                     break
+            if all_good_for_defender:
+                eye_value = 2
 
-        # General for all eyes - handle the case when the eye has no splittable points due to dead opponent stones
-        # but the dead opponent stones themselves would capture into a living shape
-        # Count how many pieces there are and how many bottleneck points there are that increase the number of pieces.
-        if eye_value < 2:
-            dead_opps_in_eye = set()
-            unplayable_in_eye = []
-            for point in eye_info.real_points:
-                (dy,dx) = point
-                if stones[dy][dx] == opp and marked_dead[dy][dx]:
-                    dead_opps_in_eye.add(point)
-                # Also count any spot that is un-playable
-                elif not is_pseudolegal(ysize,xsize,stones,chain_ids,chain_infos_by_id,dy,dx,pla):
-                    unplayable_in_eye.append(point)
-
-            if len(dead_opps_in_eye) > 0:
-                # Penalize for each opponent dead stone lodged in a false eye point
-                num_throwins = 0
-                for (y,x) in eye_info.potential_points:
-                    if stones[y][x] == opp and is_false_eye_point[y][x]:
-                        num_throwins += 1
-
-                # Opponent can choose to omit any single unplayable spot, or none, the rest are treated as
-                # part of the eye.
-                possible_omissions = unplayable_in_eye.copy()
-                possible_omissions.append(None)
-
-                all_good_for_defender = True
-                for omitted in possible_omissions:
-                    remaining_shape = dead_opps_in_eye.copy()
-                    for point in unplayable_in_eye:
-                        if point != omitted:
-                            remaining_shape.add(point)
-
-                    initial_piece_count = len(get_pieces(ysize,xsize,remaining_shape,set()))
-                    num_bottlenecks = 0
-                    num_non_bottlenecks_high_degree = 0
-                    for point_to_delete in remaining_shape:
-                        (dy,dx) = point_to_delete
-                        if len(get_pieces(ysize,xsize,remaining_shape,set([point_to_delete]))) > initial_piece_count:
-                            num_bottlenecks += 1
-                        elif count_adjacents_in(dy,dx,remaining_shape) >= 3:
-                            num_non_bottlenecks_high_degree += 1
-
-                    # 7 point eye is always good for defender unless there are weaknesses
-                    bonus = 0
-                    if len(remaining_shape) >= 7:
-                        bonus = 1
-
-                    if initial_piece_count - num_throwins + (num_bottlenecks + num_non_bottlenecks_high_degree + bonus) // 2 < 2:
-                        # print(f"{remaining_shape=}, {initial_piece_count=}, {num_throwins=}, {num_bottlenecks=}, {num_non_bottlenecks_high_degree=}")
-                        all_good_for_defender = False
-                        break
-                if all_good_for_defender:
-                    eye_value = 2
-
-        eye_value = min(eye_value, 2)
-        eye_info.eye_value = eye_value
+    eye_value = min(eye_value, 2)
+    return eye_value
 
 
 def mark_scoring(
-    ysize: int,
-    xsize: int,
-    stones: List[List[Color]],
-    marked_dead: List[List[bool]],
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
     score_false_eyes: bool,
-    strict_reaches_black: List[List[bool]],
-    strict_reaches_white: List[List[bool]],
-    region_ids: List[List[RegionId]],
+    strict_reaches_black: List[bool],
+    strict_reaches_white: List[bool],
+    region_ids: List[RegionId],
     region_infos_by_id: Dict[RegionId,RegionInfo],
-    chain_ids: List[List[ChainId]],
+    chain_ids: List[ChainId],
     chain_infos_by_id: Dict[ChainId,ChainInfo],
-    is_false_eye_point: List[List[bool]],
-    eye_ids: List[List[EyeId]],
+    is_false_eye_point: List[bool],
+    eye_ids: List[EyeId],
     eye_infos_by_id: Dict[EyeId,EyeInfo],
-    is_unscorable_false_eye_point: List[List[bool]],
-    scoring: List[List[LocScore]],  # mutated by this function
-):
-    # Also avoid scoring points immediately adjacent to false eye points occupied by single dead opponent throwins.
-    extra_black_unscoreable_points = set()
-    extra_white_unscoreable_points = set()
-    for y in range(ysize):
-        for x in range(xsize):
-            if is_unscorable_false_eye_point[y][x] and stones[y][x] != EMPTY and marked_dead[y][x]:
-                adjacents = [(y-1,x),(y+1,x),(y,x-1),(y,x+1)]
-                if stones[y][x] == WHITE:
-                    for point in adjacents:
-                        extra_black_unscoreable_points.add(point);
-                else:
-                    for point in adjacents:
-                        extra_white_unscoreable_points.add(point);
+    is_unscorable_false_eye_point: List[bool],
+    scoring: Optional[ScoringResult],  # mutated by this function, if provided
+) -> Tuple[int,int]:
+    """Fills in scoring, and returns the points on the board for (BLACK, WHITE), counting each player's territory
+    and the opponent's dead stones. If scoring is None, only computes the points."""
+    adj_offsets = geom.adj_offsets
+
+    # Everything that is the same for all points of a region or chain is worked out once up front.
+    color_by_region_id = {}
+    is_seki_by_region_id = {}
+    for region_id, region_info in region_infos_by_id.items():
+        color_by_region_id[region_id] = region_info.color
+        total_eyes = sum(eye_infos_by_id[eye_id].eye_value for eye_id in region_info.eyes)
+        is_seki_by_region_id[region_id] = total_eyes <= 1
+    region_id_by_chain_id = { chain_id: chain_info.region_id for chain_id, chain_info in chain_infos_by_id.items() }
 
-    for y in range(ysize):
-        for x in range(xsize):
-            s = scoring[y][x]
-            region_id = region_ids[y][x]
+    # Also avoid scoring points immediately adjacent to false eye points occupied by single dead opponent throwins.
+    # Unscorable false eye points are always eye points, so only the eyes need to be checked. Holds the colors whose
+    # territory can't include each point, using BLACK and WHITE as bit flags.
+    extra_unscorable_for = make_flat_array(geom,EMPTY)
+    for eye_info in eye_infos_by_id.values():
+        for loc in eye_info.potential_points:
+            if is_unscorable_false_eye_point[loc] and stones[loc] != EMPTY and marked_dead[loc]:
+                for offset in adj_offsets:
+                    extra_unscorable_for[loc+offset] |= get_opp(stones[loc])
+
+    is_detailed = scoring is not None
+    if is_detailed:
+        is_territory_for = scoring.is_territory_for
+        belongs_to_seki_group = scoring.belongs_to_seki_group
+        is_false_eye = scoring.is_false_eye
+        is_unscorable_false_eye = scoring.is_unscorable_false_eye
+        is_dame = scoring.is_dame
+        eye_value = scoring.eye_value
+    points = [0, 0, 0]  # by color
+    i = 0
+    for y in range(geom.ysize):
+        loc = get_loc(y,0,geom.xsize)
+        for x in range(geom.xsize):
+            stone = stones[loc]
+            is_marked_dead = marked_dead[loc]
+            if is_marked_dead and stone != EMPTY:
+                points[get_opp(stone)] += 1
+
+            region_id = region_ids[loc]
             if region_id == -1:
-                s.is_dame = True
+                if is_detailed:
+                    is_dame[i] = True
             else:
-                region_info = region_infos_by_id[region_id]
-                color = region_info.color
-                total_eyes = sum(eye_infos_by_id[eye_id].eye_value for eye_id in region_info.eyes)
-                if total_eyes <= 1:
-                    s.belongs_to_seki_group = region_info.color
-
-                if is_false_eye_point[y][x]:
-                    s.is_false_eye = True
-
-                if is_unscorable_false_eye_point[y][x]:
-                    s.is_unscorable_false_eye = True
-                if (stones[y][x] == EMPTY or marked_dead[y][x]) and (
-                    (color == BLACK and (y,x) in extra_black_unscoreable_points) or
-                    (color == WHITE and (y,x) in extra_white_unscoreable_points)
-                ):
-                    s.is_unscorable_false_eye = True
+                color = color_by_region_id[region_id]
+                is_seki = is_seki_by_region_id[region_id]
+                is_unscorable = is_unscorable_false_eye_point[loc] or (
+                    (stone == EMPTY or is_marked_dead) and (extra_unscorable_for[loc] & color) != 0
+                )
 
-                s.eye_value = 0
-                if eye_ids[y][x] != -1:
-                    s.eye_value = eye_infos_by_id[eye_ids[y][x]].eye_value
+                if is_detailed:
+                    if is_seki:
+                        belongs_to_seki_group[i] = color
+                    if is_false_eye_point[loc]:
+                        is_false_eye[i] = True
+                    if is_unscorable:
+                        is_unscorable_false_eye[i] = True
+                    if eye_ids[loc] != -1:
+                        eye_value[i] = eye_infos_by_id[eye_ids[loc]].eye_value
 
                 if (
-                    (stones[y][x] != color or marked_dead[y][x]) and
-                    s.belongs_to_seki_group == EMPTY and
-                    (score_false_eyes or not s.is_unscorable_false_eye) and
-                    chain_infos_by_id[chain_ids[y][x]].region_id == region_id and
-                    not (color == WHITE and strict_reaches_black[y][x]) and
-                    not (color == BLACK and strict_reaches_white[y][x])
+                    (stone != color or is_marked_dead) and
+                    not is_seki and
+                    (score_false_eyes or not is_unscorable) and
+                    region_id_by_chain_id[chain_ids[loc]] == region_id and
+                    not (color == WHITE and strict_reaches_black[loc]) and
+                    not (color == BLACK and strict_reaches_white[loc])
                 ):
-                    s.is_territory_for = color
+                    points[color] += 1
+                    if is_detailed:
+                        is_territory_for[i] = color
+            i += 1
+            loc += 1
+    return (points[BLACK], points[WHITE])
 
 
+# The false eye and eye value stages only ever look at one cluster of eyes at a time - the eyes connected to each
+# other through the macrochains bordering them, or through directly adjacent points. A ScoringSession remembers the
+# results for each cluster keyed by a signature of everything those stages read about the cluster, so that after a
+# toggle those two stages are only computed again for the clusters that actually changed. All the other stages
+# are rerun over the whole board on every toggle.
 
+EyeClusterSignature = tuple
+
+@dataclass
+class EyeClusterResult:
+    false_eye_points: List[Loc]
+    unscorable_false_eye_points: List[Loc]
+    eye_values: Dict[Loc,int]  # keyed by the smallest potential point of each eye
+
+def group_eyes_into_clusters(
+    geom: BoardGeometry,
+    eye_ids: List[EyeId],
+    macrochain_infos_by_id: Dict[MacroChainId,MacroChainInfo],
+    eye_infos_by_id: Dict[EyeId,EyeInfo],
+) -> List[List[EyeId]]:
+    parent = { eye_id: eye_id for eye_id in eye_infos_by_id }
+    def find(eye_id: EyeId) -> EyeId:
+        while parent[eye_id] != eye_id:
+            parent[eye_id] = parent[parent[eye_id]]
+            eye_id = parent[eye_id]
+        return eye_id
+    def union(eye_id1: EyeId, eye_id2: EyeId):
+        parent[find(eye_id1)] = find(eye_id2)
+
+    for macrochain_info in macrochain_infos_by_id.values():
+        eyes = list(macrochain_info.eye_neighbors_from)
+        for eye_id in eyes[1:]:
+            union(eyes[0],eye_id)
+    for eye_id, eye_info in eye_infos_by_id.items():
+        for loc in eye_info.potential_points:
+            for offset in geom.adj_offsets:
+                other_eye_id = eye_ids[loc+offset]
+                if other_eye_id != -1 and other_eye_id != eye_id:
+                    union(eye_id,other_eye_id)
+
+    clusters: Dict[EyeId,List[EyeId]] = defaultdict(list)
+    for eye_id in eye_infos_by_id:
+        clusters[find(eye_id)].append(eye_id)
+    return list(clusters.values())
+
+def eye_cluster_signature(
+    geom: BoardGeometry,
+    stones: List[Color],
+    marked_dead: List[bool],
+    region_ids: List[RegionId],
+    is_pseudolegal_for: List[List[bool]],
+    macrochain_infos_by_id: Dict[MacroChainId,MacroChainInfo],
+    eye_infos_by_id: Dict[EyeId,EyeInfo],
+    cluster: List[EyeId],
+) -> EyeClusterSignature:
+    """Everything that mark_false_eye_points and mark_eye_values read about the eyes of a cluster, with
+    eyes and macrochains identified by their smallest location rather than by their ids."""
+    adj_offsets = geom.adj_offsets
+    eye_keys = { eye_id: min(eye_infos_by_id[eye_id].potential_points) for eye_id in cluster }
+    macrochain_keys = {}
+    eye_signatures = []
+    for eye_id in cluster:
+        eye_info = eye_infos_by_id[eye_id]
+        for macrochain_id in eye_info.macrochain_neighbors_from:
+            macrochain_keys[macrochain_id] = min(macrochain_infos_by_id[macrochain_id].points)
+        points = sorted(eye_info.potential_points)
+        eye_signatures.append((
+            eye_info.pla,
+            tuple(points),
+            tuple(
+                (
+                    stones[loc],
+                    marked_dead[loc],
+                    is_pseudolegal_for[eye_info.pla][loc],
+                    tuple(stones[loc+offset] for offset in adj_offsets),
+                    tuple(region_ids[loc+offset] == eye_info.region_id for offset in adj_offsets),
+                )
+                for loc in points
+            ),
+            tuple(sorted(
+                (macrochain_keys[macrochain_id], tuple(sorted(from_points)))
+                for (macrochain_id, from_points) in eye_info.macrochain_neighbors_from.items()
+            )),
+        ))
+    macrochain_signatures = [
+        (
+            macrochain_key,
+            tuple(sorted(
+                (eye_keys[eye_id], tuple(sorted(from_points)))
+                for (eye_id, from_points) in macrochain_infos_by_id[macrochain_id].eye_neighbors_from.items()
+            )),
+        )
+        for (macrochain_id, macrochain_key) in macrochain_keys.items()
+    ]
+    return (tuple(sorted(eye_signatures)), tuple(sorted(macrochain_signatures)))
+
+class ScoringSession:
+    """Territory scoring of one position that is rescored as stones are marked dead or alive, such as during the
+    scoring phase of a game where players toggle groups one at a time.
+
+    This is not an incremental update of the toggled area. Every toggle runs a full rescore of the whole board:
+    only the connection blocks around the toggled chain are updated in place, and only the false eye and eye value
+    results are reused, for each cluster of eyes that the toggle did not change. Reachability, regions, chains,
+    macrochains and potential eyes are all recomputed. Limiting those to the regions next to the toggled chain
+    would number regions, chains and eyes differently than territory_scoring does, and a few heuristics depend on
+    that order. A toggle therefore costs only somewhat less than territory_scoring, see run_toggle_benchmarks in
+    bench.py, most of the saving coming from positions with many or large eyes.
+
+    The results are always identical to calling territory_scoring on the current stones and marked_dead.
+    All the intermediate stage state of the latest scoring is kept on the session, on the flat padded board
+    (see BoardGeometry)."""
+
+    def __init__(
+        self,
+        stones: Union[List[List[Color]],"Board"],
+        marked_dead: Optional[List[List[bool]]] = None,
+        score_false_eyes: bool = False,
+    ):
+        """Parameters are the same as for territory_scoring."""
+        if isinstance(stones, Board):
+            check_board_marked_dead(marked_dead)
+            self.geom = stones.geom
+            self.stones: List[Color] = list(stones.stones_flat)
+            self.marked_dead: List[bool] = list(stones.marked_dead_flat)
+        else:
+            (ysize, xsize) = validate_inputs(stones,marked_dead)
+            self.geom = get_geometry(ysize,xsize)
+            self.stones = flatten_array(self.geom,stones,WALL)
+            self.marked_dead = flatten_array(self.geom,[[bool(value) for value in row] for row in marked_dead],False)
+        self.score_false_eyes = score_false_eyes
+        self.connection_blocks: List[Color] = make_flat_array(self.geom,EMPTY)
+        mark_connection_blocks(self.geom,self.stones,self.marked_dead,self.connection_blocks)
+        self.cluster_results: Dict[EyeClusterSignature,EyeClusterResult] = {}
+        self.previous_cluster_results: Dict[EyeClusterSignature,EyeClusterResult] = {}
+        self.eye_value_cache = EyeValueCache()
+        self.scoring: ScoringResult = self.full_rescore()
+
+    def get_marked_dead(self) -> List[List[bool]]:
+        return unflatten_array(self.geom,self.marked_dead)
+
+    def toggle_dead(self, y: int, x: int) -> ScoringResult:
+        """Toggle whether the chain of stones at (y,x) is marked dead, and return the updated scoring.
+        This runs full_rescore."""
+        geom = self.geom
+        if not is_on_board(y,x,geom.ysize,geom.xsize):
+            raise ValueError(f"Location is not on the board {(y,x)}")
+        stones = self.stones
+        start = get_loc(y,x,geom.xsize)
+        color = stones[start]
+        if color == EMPTY:
+            raise ValueError(f"No stone to toggle at {(y,x)}")
+
+        is_dead = not self.marked_dead[start]
+        chain = set()
+        stack = [start]
+        while stack:
+            loc = stack.pop()
+            if loc in chain or stones[loc] != color:
+                continue
+            chain.add(loc)
+            for offset in geom.adj_offsets:
+                stack.append(loc+offset)
+        for loc in chain:
+            self.marked_dead[loc] = is_dead
+
+        # A connection block depends only on the 3x3 neighborhood around it.
+        nearby = set()
+        for loc in chain:
+            for (dy,dx) in NEIGHBORHOOD_DYDX:
+                nearby.add(loc + dy * geom.stride + dx)
+        nearby_on_board = [loc for loc in nearby if stones[loc] != WALL]
+        mark_connection_blocks(geom,stones,self.marked_dead,self.connection_blocks,locs=nearby_on_board)
+
+        self.scoring = self.full_rescore()
+        return self.scoring
+
+    def full_rescore(self) -> ScoringResult:
+        """Run every stage over the whole board, reusing the false eye and eye value results of unchanged eye clusters."""
+        geom = self.geom
+        stones = self.stones
+        marked_dead = self.marked_dead
+        connection_blocks = self.connection_blocks
+
+        self.strict_reaches_black = make_flat_array(geom,False)
+        self.strict_reaches_white = make_flat_array(geom,False)
+        mark_reachability_bitboard(geom,stones,marked_dead,None,self.strict_reaches_black,self.strict_reaches_white)
+        self.reaches_black = make_flat_array(geom,False)
+        self.reaches_white = make_flat_array(geom,False)
+        mark_reachability_bitboard(geom,stones,marked_dead,connection_blocks,self.reaches_black,self.reaches_white)
+
+        self.region_ids = make_flat_array(geom,-1)
+        self.region_infos_by_id = {}
+        mark_regions_bitboard(geom,stones,marked_dead,connection_blocks,self.reaches_black,self.reaches_white,self.region_ids,self.region_infos_by_id)
+        self.chain_ids = make_flat_array(geom,-1)
+        self.chain_infos_by_id = {}
+        mark_chains(geom,stones,marked_dead,self.region_ids,self.chain_ids,self.chain_infos_by_id)
+        self.is_pseudolegal_for = make_pseudolegality_index(geom)
+        mark_pseudolegal_points(geom,stones,self.chain_ids,self.chain_infos_by_id,self.is_pseudolegal_for)
+        self.macrochain_ids = make_flat_array(geom,-1)
+        self.macrochain_infos_by_id = {}
+        mark_macrochains(geom,stones,marked_dead,connection_blocks,self.region_ids,self.region_infos_by_id,self.chain_ids,self.chain_infos_by_id,self.macrochain_ids,self.macrochain_infos_by_id)
+        self.eye_ids = make_flat_array(geom,-1)
+        self.eye_infos_by_id = {}
+        mark_potential_eyes(geom,stones,marked_dead,self.strict_reaches_black,self.strict_reaches_white,self.region_ids,self.region_infos_by_id,self.macrochain_ids,self.macrochain_infos_by_id,self.eye_ids,self.eye_infos_by_id)
+
+        self.is_false_eye_point = make_flat_array(geom,False)
+        self.is_unscorable_false_eye_point = make_flat_array(geom,False)
+        cluster_results = {}
+        for cluster in group_eyes_into_clusters(geom,self.eye_ids,self.macrochain_infos_by_id,self.eye_infos_by_id):
+            signature = eye_cluster_signature(geom,stones,marked_dead,self.region_ids,self.is_pseudolegal_for,self.macrochain_infos_by_id,self.eye_infos_by_id,cluster)
+            result = self.cluster_results.get(signature) or self.previous_cluster_results.get(signature)
+            if result is None:
+                result = self.score_eye_cluster(cluster)
+            else:
+                for loc in result.false_eye_points:
+                    self.is_false_eye_point[loc] = True
+                for loc in result.unscorable_false_eye_points:
+                    self.is_unscorable_false_eye_point[loc] = True
+                for eye_id in cluster:
+                    eye_info = self.eye_infos_by_id[eye_id]
+                    eye_info.real_points = set(loc for loc in eye_info.potential_points if not self.is_false_eye_point[loc])
+                    eye_info.eye_value = result.eye_values[min(eye_info.potential_points)]
+            cluster_results[signature] = result
+        # Keep the results from one scoring further back too, so that undoing a toggle is just as fast.
+        self.previous_cluster_results = self.cluster_results
+        self.cluster_results = cluster_results
+
+        scoring = ScoringResult(geom.ysize,geom.xsize)
+        mark_scoring(geom,stones,marked_dead,self.score_false_eyes,self.strict_reaches_black,self.strict_reaches_white,self.region_ids,self.region_infos_by_id,self.chain_ids,self.chain_infos_by_id,self.is_false_eye_point,self.eye_ids,self.eye_infos_by_id,self.is_unscorable_false_eye_point,scoring)
+        return scoring
+
+    def score_eye_cluster(self, cluster: List[EyeId]) -> EyeClusterResult:
+        """Run the false eye and eye value stages on only the eyes of the cluster."""
+        geom = self.geom
+        cluster_eye_infos_by_id = { eye_id: self.eye_infos_by_id[eye_id] for eye_id in cluster }
+        failed_false_eye_searches = []
+        mark_false_eye_points(geom,self.region_ids,self.macrochain_ids,self.macrochain_infos_by_id,cluster_eye_infos_by_id,self.is_false_eye_point,failed_false_eye_searches)
+        mark_eye_values(geom,self.stones,self.marked_dead,self.region_ids,self.region_infos_by_id,self.is_pseudolegal_for,self.is_false_eye_point,self.eye_ids,cluster_eye_infos_by_id,self.eye_value_cache)
+        mark_unscorable_false_eye_points(cluster_eye_infos_by_id,failed_false_eye_searches,self.is_unscorable_false_eye_point)
+
+        points = [loc for eye_info in cluster_eye_infos_by_id.values() for loc in eye_info.potential_points]
+        return EyeClusterResult(
+            false_eye_points=[loc for loc in points if self.is_false_eye_point[loc]],
+            unscorable_false_eye_points=[loc for loc in points if self.is_unscorable_false_eye_point[loc]],
+            eye_values={ min(eye_info.potential_points): eye_info.eye_value for eye_info in cluster_eye_infos_by_id.values() },
+        )
+
+
+# Eye values of small solid eyes, see lookup_solid_eye_value. Keyed by (height, width, mask of the eye's points,
+# mask of its dead stones), where bit y*width+x of a mask is the point at row y and column x of the eye's bounding
+# box. Each value is either a single eye value, or 9 eye values by get_solid_eye_edge_index of the rows times 3
+# plus that of the columns, for eyes whose value depends on which edges of the board they touch.
+# BEGIN GENERATED EYE VALUE TABLE
+EYE_VALUE_TABLE = {
+    (1,1,1,0):"1", (1,1,1,1):"1", (1,2,3,0):"1", (1,2,3,1):"1", (1,2,3,2):"1", (1,2,3,3):"1",
+    (2,1,3,0):"1", (2,1,3,1):"1", (2,1,3,2):"1", (2,1,3,3):"1", (1,3,7,0):"2", (1,3,7,1):"2",
+    (1,3,7,2):"1", (1,3,7,3):"1", (1,3,7,4):"2", (1,3,7,5):"2", (1,3,7,6):"1", (1,3,7,7):"1",
+    (2,2,7,0):"2", (2,2,7,1):"1", (2,2,7,2):"2", (2,2,7,3):"1", (2,2,7,4):"2", (2,2,7,5):"1",
+    (2,2,7,6):"2", (2,2,7,7):"1", (2,2,11,0):"2", (2,2,11,1):"2", (2,2,11,2):"1", (2,2,11,3):"1",
+    (2,2,11,8):"2", (2,2,11,9):"2", (2,2,11,10):"1", (2,2,11,11):"1", (2,2,13,0):"2", (2,2,13,1):"2",
+    (2,2,13,4):"1", (2,2,13,5):"1", (2,2,13,8):"2", (2,2,13,9):"2", (2,2,13,12):"1", (2,2,13,13):"1",
+    (3,1,7,0):"2", (3,1,7,1):"2", (3,1,7,2):"1", (3,1,7,3):"1", (3,1,7,4):"2", (3,1,7,5):"2",
+    (3,1,7,6):"1", (3,1,7,7):"1", (2,2,14,0):"2", (2,2,14,2):"2", (2,2,14,4):"2", (2,2,14,6):"2",
+    (2,2,14,8):"1", (2,2,14,10):"1", (2,2,14,12):"1", (2,2,14,14):"1", (1,4,15,0):"2", (1,4,15,1):"2",
+    (1,4,15,2):"2", (1,4,15,3):"2", (1,4,15,4):"2", (1,4,15,5):"2", (1,4,15,6):"1", (1,4,15,7):"1",
+    (1,4,15,8):"2", (1,4,15,9):"2", (1,4,15,10):"2", (1,4,15,11):"2", (1,4,15,12):"2", (1,4,15,13):"2",
+    (1,4,15,14):"1", (1,4,15,15):"2", (2,3,15,0):"2", (2,3,15,1):"2", (2,3,15,2):"2", (2,3,15,3):"1",
+    (2,3,15,4):"2", (2,3,15,5):"2", (2,3,15,6):"2", (2,3,15,7):"1", (2,3,15,8):"2", (2,3,15,9):"2",
+    (2,3,15,10):"2", (2,3,15,11):"1", (2,3,15,12):"2", (2,3,15,13):"2", (2,3,15,14):"2", (2,3,15,15):"2",
+    (2,3,23,0):"2", (2,3,23,1):"2", (2,3,23,2):"1", (2,3,23,3):"1", (2,3,23,4):"2", (2,3,23,5):"2",
+    (2,3,23,6):"1", (2,3,23,7):"1", (2,3,23,16):"2", (2,3,23,17):"2", (2,3,23,18):"1", (2,3,23,19):"1",
+    (2,3,23,20):"2", (2,3,23,21):"2", (2,3,23,22):"1", (2,3,23,23):"1", (2,3,39,0):"2", (2,3,39,1):"2",
+    (2,3,39,2):"2", (2,3,39,3):"2", (2,3,39,4):"2", (2,3,39,5):"2", (2,3,39,6):"1", (2,3,39,7):"1",
+    (2,3,39,32):"2", (2,3,39,33):"2", (2,3,39,34):"2", (2,3,39,35):"2", (2,3,39,36):"2", (2,3,39,37):"2",
+    (2,3,39,38):"1", (2,3,39,39):"2", (2,2,15,0):"1", (2,2,15,1):"1", (2,2,15,2):"1", (2,2,15,3):"1",
+    (2,2,15,4):"1", (2,2,15,5):"1", (2,2,15,6):"122222221", (2,2,15,7):"1", (2,2,15,8):"1", (2,2,15,9):"221222122",
+    (2,2,15,10):"1", (2,2,15,11):"1", (2,2,15,12):"1", (2,2,15,13):"1", (2,2,15,14):"1", (2,2,15,15):"1",
+    (3,2,23,0):"2", (3,2,23,1):"2", (3,2,23,2):"2", (3,2,23,3):"2", (3,2,23,4):"2", (3,2,23,5):"1",
+    (3,2,23,6):"2", (3,2,23,7):"1", (3,2,23,16):"2", (3,2,23,17):"2", (3,2,23,18):"2", (3,2,23,19):"2",
+    (3,2,23,20):"2", (3,2,23,21):"1", (3,2,23,22):"2", (3,2,23,23):"2", (2,3,51,0):"2", (2,3,51,1):"2",
+    (2,3,51,2):"2", (2,3,51,3):"2", (2,3,51,16):"2", (2,3,51,17):"2", (2,3,51,18):"1", (2,3,51,19):"1",
+    (2,3,51,32):"2", (2,3,51,33):"2", (2,3,51,34):"2", (2,3,51,35):"2", (2,3,51,48):"2", (2,3,51,49):"2",
+    (2,3,51,50):"1", (2,3,51,51):"2", (3,2,43,0):"2", (3,2,43,1):"2", (3,2,43,2):"2", (3,2,43,3):"2",
+    (3,2,43,8):"2", (3,2,43,9):"2", (3,2,43,10):"1", (3,2,43,11):"1", (3,2,43,32):"2", (3,2,43,33):"2",
+    (3,2,43,34):"2", (3,2,43,35):"2", (3,2,43,40):"2", (3,2,43,41):"2", (3,2,43,42):"1", (3,2,43,43):"2",
+    (2,3,57,0):"2", (2,3,57,1):"2", (2,3,57,8):"2", (2,3,57,9):"2", (2,3,57,16):"2", (2,3,57,17):"2",
+    (2,3,57,24):"1", (2,3,57,25):"1", (2,3,57,32):"2", (2,3,57,33):"2", (2,3,57,40):"2", (2,3,57,41):"2",
+    (2,3,57,48):"2", (2,3,57,49):"2", (2,3,57,56):"1", (2,3,57,57):"2", (3,2,29,0):"2", (3,2,29,1):"2",
+    (3,2,29,4):"1", (3,2,29,5):"1", (3,2,29,8):"2", (3,2,29,9):"2", (3,2,29,12):"1", (3,2,29,13):"1",
+    (3,2,29,16):"2", (3,2,29,17):"2", (3,2,29,20):"1", (3,2,29,21):"1", (3,2,29,24):"2", (3,2,29,25):"2",
+    (3,2,29,28):"1", (3,2,29,29):"1", (3,2,45,0):"2", (3,2,45,1):"2", (3,2,45,4):"2", (3,2,45,5):"2",
+    (3,2,45,8):"2", (3,2,45,9):"2", (3,2,45,12):"1", (3,2,45,13):"1", (3,2,45,32):"2", (3,2,45,33):"2",
+    (3,2,45,36):"2", (3,2,45,37):"2", (3,2,45,40):"2", (3,2,45,41):"2", (3,2,45,44):"1", (3,2,45,45):"2",
+    (3,2,53,0):"2", (3,2,53,1):"2", (3,2,53,4):"2", (3,2,53,5):"2", (3,2,53,16):"2", (3,2,53,17):"2",
+    (3,2,53,20):"1", (3,2,53,21):"1", (3,2,53,32):"2", (3,2,53,33):"2", (3,2,53,36):"2", (3,2,53,37):"2",
+    (3,2,53,48):"2", (3,2,53,49):"2", (3,2,53,52):"1", (3,2,53,53):"2", (4,1,15,0):"2", (4,1,15,1):"2",
+    (4,1,15,2):"2", (4,1,15,3):"2", (4,1,15,4):"2", (4,1,15,5):"2", (4,1,15,6):"1", (4,1,15,7):"1",
+    (4,1,15,8):"2", (4,1,15,9):"2", (4,1,15,10):"2", (4,1,15,11):"2", (4,1,15,12):"2", (4,1,15,13):"2",
+    (4,1,15,14):"1", (4,1,15,15):"2", (2,3,30,0):"2", (2,3,30,2):"2", (2,3,30,4):"2", (2,3,30,6):"2",
+    (2,3,30,8):"2", (2,3,30,10):"2", (2,3,30,12):"2", (2,3,30,14):"2", (2,3,30,16):"2", (2,3,30,18):"1",
+    (2,3,30,20):"2", (2,3,30,22):"1", (2,3,30,24):"2", (2,3,30,26):"1", (2,3,30,28):"2", (2,3,30,30):"2",
+    (2,3,58,0):"2", (2,3,58,2):"2", (2,3,58,8):"2", (2,3,58,10):"2", (2,3,58,16):"1", (2,3,58,18):"1",
+    (2,3,58,24):"1", (2,3,58,26):"1", (2,3,58,32):"2", (2,3,58,34):"2", (2,3,58,40):"2", (2,3,58,42):"2",
+    (2,3,58,48):"1", (2,3,58,50):"1", (2,3,58,56):"1", (2,3,58,58):"1", (3,2,30,0):"2", (3,2,30,2):"2",
+    (3,2,30,4):"2", (3,2,30,6):"2", (3,2,30,8):"2", (3,2,30,10):"2", (3,2,30,12):"1", (3,2,30,14):"1",
+    (3,2,30,16):"2", (3,2,30,18):"2", (3,2,30,20):"2", (3,2,30,22):"2", (3,2,30,24):"2", (3,2,30,26):"2",
+    (3,2,30,28):"1", (3,2,30,30):"2", (3,2,46,0):"2", (3,2,46,2):"2", (3,2,46,4):"2", (3,2,46,6):"2",
+    (3,2,46,8):"1", (3,2,46,10):"1", (3,2,46,12):"1", (3,2,46,14):"1", (3,2,46,32):"2", (3,2,46,34):"2",
+    (3,2,46,36):"2", (3,2,46,38):"2", (3,2,46,40):"1", (3,2,46,42):"1", (3,2,46,44):"1", (3,2,46,46):"1",
+    (3,2,58,0):"2", (3,2,58,2):"2", (3,2,58,8):"2", (3,2,58,10):"2", (3,2,58,16):"2", (3,2,58,18):"2",
+    (3,2,58,24):"2", (3,2,58,26):"2", (3,2,58,32):"2", (3,2,58,34):"2", (3,2,58,40):"1", (3,2,58,42):"1",
+    (3,2,58,48):"2", (3,2,58,50):"2", (3,2,58,56):"1", (3,2,58,58):"2", (2,3,60,0):"2", (2,3,60,4):"2",
+    (2,3,60,8):"2", (2,3,60,12):"2", (2,3,60,16):"2", (2,3,60,20):"2", (2,3,60,24):"2", (2,3,60,28):"2",
+    (2,3,60,32):"2", (2,3,60,36):"2", (2,3,60,40):"2", (2,3,60,44):"2", (2,3,60,48):"1", (2,3,60,52):"1",
+    (2,3,60,56):"1", (2,3,60,60):"2", (1,5,31,0):"2", (2,4,31,0):"2", (2,4,47,0):"2", (2,4,79,0):"2",
+    (2,4,143,0):"2", (2,3,31,0):"2", (2,3,47,0):"2", (3,3,79,0):"2", (2,3,55,0):"2", (3,3,151,0):"2",
+    (2,4,199,0):"2", (3,3,295,0):"2", (2,3,59,0):"2", (3,2,31,0):"2", (3,2,47,0):"2", (3,2,55,0):"2",
+    (4,2,87,0):"2", (2,4,227,0):"2", (3,3,179,0):"2", (3,3,307,0):"2", (3,2,59,0):"2", (3,3,403,0):"2",
+    (4,2,171,0):"2", (2,3,61,0):"2", (2,4,241,0):"2", (3,3,121,0):"2", (3,3,185,0):"2", (3,3,313,0):"2",
+    (3,2,61,0):"2", (4,2,93,0):"2", (3,3,409,0):"2", (4,2,173,0):"2", (3,3,457,0):"2", (4,2,117,0):"2",
+    (4,2,181,0):"2", (4,2,213,0):"2", (5,1,31,0):"2", (2,4,62,0):"2", (2,3,62,0):"2", (3,3,94,0):"2",
+    (3,3,158,0):"2", (3,3,214,0):"2", (2,4,242,0):"2", (3,3,122,0):"2", (3,3,186,0):"2", (3,3,314,0):"2",
+    (3,2,62,0):"2", (4,2,94,0):"2", (3,3,410,0):"2", (4,2,174,0):"2", (3,3,242,0):"2", (3,3,466,0):"2",
+    (4,2,122,0):"2", (4,2,186,0):"2", (4,2,234,0):"2", (2,4,124,0):"2", (2,4,244,0):"2", (3,3,124,0):"2",
+    (3,3,188,0):"2", (3,3,316,0):"2", (3,3,244,0):"2", (3,3,484,0):"2", (2,4,248,0):"2", (1,6,63,0):"2",
+    (2,5,63,0):"2", (2,5,95,0):"2", (2,5,159,0):"2", (2,5,287,0):"2", (2,5,543,0):"2", (2,4,63,0):"2",
+    (2,4,95,0):"2", (2,4,159,0):"2", (3,4,287,0):"2", (2,4,111,0):"2", (2,4,175,0):"2", (3,4,559,0):"2",
+    (2,4,207,0):"2", (3,4,1103,0):"2", (2,5,783,0):"2", (3,4,2191,0):"2", (2,3,63,0):"2", (3,3,95,0):"2",
+    (3,3,159,0):"2", (2,4,215,0):"2", (3,3,111,0):"2", (3,3,303,0):"2", (3,3,207,0):"2", (4,3,591,0):"2",
+    (2,4,231,0):"2", (3,3,183,0):"2", (3,3,311,0):"2", (3,3,215,0):"2", (3,3,407,0):"2", (4,3,1175,0):"2",
+    (2,5,903,0):"2", (3,4,1223,0):"2", (3,4,2247,0):"2", (3,3,423,0):"2", (3,4,3143,0):"2", (4,3,2343,0):"2",
+    (2,4,235,0):"2", (2,4,243,0):"2", (3,3,123,0):"2", (3,3,187,0):"2", (3,3,315,0):"2", (3,2,63,0):"2",
+    (4,2,95,0):"2", (3,3,411,0):"2", (4,2,175,0):"2", (3,3,459,0):"2", (4,2,119,0):"2", (4,2,183,0):"2",
+    (4,2,215,0):"2", (5,2,343,0):"2", (2,5,963,0):"2", (3,4,739,0):"2", (3,4,1251,0):"2", (3,4,2275,0):"2",
+    (3,3,243,0):"2", (3,3,435,0):"2", (4,3,1203,0):"2", (3,4,3171,0):"2", (4,3,2355,0):"2", (3,3,467,0):"2",
+    (4,2,123,0):"2", (4,2,187,0):"2", (3,4,3619,0):"2", (4,3,1427,0):"2", (4,3,2451,0):"2", (4,2,235,0):"2",
+    (4,3,3219,0):"2", (5,2,683,0):"2", (2,4,125,0):"2", (2,4,245,0):"2", (3,3,125,0):"2", (3,3,189,0):"2",
+    (3,3,317,0):"2", (2,4,249,0):"2", (2,5,993,0):"2", (3,4,497,0):"2", (3,4,753,0):"2", (3,4,1265,0):"2",
+    (3,4,2289,0):"2", (3,3,249,0):"2", (3,3,377,0):"2", (4,3,633,0):"2", (3,3,441,0):"2", (4,3,1209,0):"2",
+    (3,4,3185,0):"2", (4,3,2361,0):"2", (3,3,473,0):"2", (4,2,125,0):"2", (4,2,189,0):"2", (4,2,221,0):"2",
+    (5,2,349,0):"2", (3,4,3633,0):"2", (4,3,1433,0):"2", (4,3,2457,0):"2", (4,2,237,0):"2", (4,3,3225,0):"2",
+    (5,2,685,0):"2", (3,3,489,0):"2", (3,4,3857,0):"2", (4,3,969,0):"2", (4,3,1481,0):"2", (4,3,2505,0):"2",
+    (4,2,245,0):"2", (5,2,373,0):"2", (4,3,3273,0):"2", (5,2,693,0):"2", (4,3,3657,0):"2", (5,2,469,0):"2",
+    (5,2,725,0):"2", (5,2,853,0):"2", (6,1,63,0):"2", (2,5,126,0):"2", (2,4,126,0):"2", (2,4,190,0):"2",
+    (3,4,318,0):"2", (3,4,574,0):"2", (3,4,814,0):"2", (2,4,246,0):"2", (3,3,126,0):"2", (3,3,190,0):"2",
+    (3,3,318,0):"2", (3,3,222,0):"2", (4,3,606,0):"2", (3,3,414,0):"2", (4,3,1182,0):"2", (3,3,246,0):"2",
+    (3,3,470,0):"2", (4,3,726,0):"2", (4,3,1238,0):"2", (4,3,1686,0):"2", (3,3,486,0):"2", (2,4,250,0):"2",
+    (2,5,994,0):"2", (3,4,498,0):"2", (3,4,754,0):"2", (3,4,1266,0):"2", (3,4,2290,0):"2", (3,3,250,0):"2",
+    (3,3,378,0):"2", (4,3,634,0):"2", (3,3,442,0):"2", (4,3,1210,0):"2", (3,4,3186,0):"2", (4,3,2362,0):"2",
+    (3,3,474,0):"2", (4,2,126,0):"2", (4,2,190,0):"2", (4,2,222,0):"2", (5,2,350,0):"2", (3,4,3634,0):"2",
+    (4,3,1434,0):"2", (4,3,2458,0):"2", (4,2,238,0):"2", (4,3,3226,0):"2", (5,2,686,0):"2", (3,4,994,0):"2",
+    (3,3,498,0):"2", (4,3,754,0):"2", (4,3,1266,0):"2", (4,3,1714,0):"2", (3,4,3874,0):"2", (4,3,978,0):"2",
+    (4,3,1490,0):"2", (4,3,2514,0):"2", (4,2,250,0):"2", (5,2,378,0):"2", (4,3,3282,0):"2", (5,2,698,0):"2",
+    (4,3,1938,0):"2", (4,3,3730,0):"2", (5,2,490,0):"2", (5,2,746,0):"2", (5,2,938,0):"2", (2,5,252,0):"2",
+    (2,4,252,0):"2", (3,4,380,0):"2", (3,4,636,0):"2", (3,4,1148,0):"2", (3,4,876,0):"2", (3,4,1868,0):"2",
+    (2,5,996,0):"2", (3,4,500,0):"2", (3,4,756,0):"2", (3,4,1268,0):"2", (3,4,2292,0):"2", (3,3,252,0):"2",
+    (3,3,380,0):"2", (4,3,636,0):"2", (3,3,444,0):"2", (4,3,1212,0):"2", (3,4,3188,0):"2", (4,3,2364,0):"2",
+    (3,3,492,0):"2", (3,4,996,0):"2", (3,3,500,0):"2", (4,3,756,0):"2", (4,3,1268,0):"2", (4,3,1716,0):"2",
+    (3,4,1988,0):"2", (3,4,3908,0):"2", (4,3,996,0):"2", (4,3,1508,0):"2", (4,3,2532,0):"2", (4,3,1956,0):"2",
+    (4,3,3876,0):"2", (2,5,504,0):"2", (2,5,1000,0):"2", (3,4,504,0):"2", (3,4,760,0):"2", (3,4,1272,0):"2",
+    (3,4,2296,0):"2", (3,4,1000,0):"2", (3,4,1992,0):"2", (3,4,3976,0):"2", (2,5,1008,0):"2", (1,7,127,0):"2",
+    (2,6,127,0):"2", (2,6,191,0):"2", (2,6,319,0):"2", (2,6,575,0):"2", (2,6,1087,0):"2", (2,6,2111,0):"2",
+    (2,5,127,0):"2", (2,5,191,0):"2", (2,5,319,0):"2", (2,5,575,0):"2", (3,5,1087,0):"2", (2,5,223,0):"2",
+    (2,5,351,0):"2", (2,5,607,0):"2", (3,5,2143,0):"2", (2,5,415,0):"2", (2,5,671,0):"2", (3,5,4255,0):"2",
+    (2,5,799,0):"2", (3,5,8479,0):"2", (2,6,3103,0):"2", (3,5,16927,0):"2", (2,4,127,0):"2", (2,4,191,0):"2",
+    (3,4,319,0):"2", (3,4,575,0):"2", (2,4,223,0):"2", (3,4,351,0):"2", (3,4,1119,0):"2", (2,5,815,0):"2",
+    (3,4,415,0):"2", (3,4,2207,0):"2", (3,4,799,0):"2", (4,4,4383,0):"2", (2,4,239,0):"2", (3,4,623,0):"2",
+    (3,4,1135,0):"2", (2,5,847,0):"2", (3,4,687,0):"2", (3,4,2223,0):"2", (3,4,815,0):"2", (3,4,1583,0):"2",
+    (4,4,8751,0):"2", (2,5,911,0):"2", (3,4,1231,0):"2", (3,4,2255,0):"2", (3,4,1615,0):"2", (3,4,3151,0):"2",
+    (4,4,17487,0):"2", (2,6,3599,0):"2", (3,5,8975,0):"2", (3,5,17167,0):"2", (3,4,3215,0):"2", (3,5,24847,0):"2",
+    (4,4,34959,0):"2", (2,5,919,0):"2", (2,4,247,0):"2", (3,3,127,0):"2", (3,3,191,0):"2", (3,3,319,0):"2",
+    (3,3,223,0):"2", (4,3,607,0):"2", (3,3,415,0):"2", (4,3,1183,0):"2", (2,5,935,0):"2", (3,4,471,0):"2",
+    (3,4,1239,0):"2", (3,4,2263,0):"2", (3,3,239,0):"2", (3,3,367,0):"2", (4,3,623,0):"2", (3,3,431,0):"2",
+    (3,4,3159,0):"2", (4,3,2351,0):"2", (3,3,463,0):"2", (4,3,719,0):"2", (4,3,1231,0):"2", (4,3,1615,0):"2",
+    (5,3,4687,0):"2", (2,5,967,0):"2", (3,4,743,0):"2", (3,4,1255,0):"2", (3,4,2279,0):"2", (3,3,247,0):"2",
+    (3,3,439,0):"2", (4,3,1207,0):"2", (3,4,3175,0):"2", (4,3,2359,0):"2", (3,3,471,0):"2", (4,3,727,0):"2",
+    (4,3,1239,0):"2", (3,4,3623,0):"2", (4,3,1431,0):"2", (4,3,2455,0):"2", (4,3,1687,0):"2", (4,3,3223,0):"2",
+    (5,3,9367,0):"2", (2,6,3847,0):"2", (3,5,4999,0):"2", (3,5,9095,0):"2", (3,5,17287,0):"2", (3,4,1735,0):"2",
+    (3,4,3271,0):"2", (4,4,17607,0):"2", (3,5,24967,0):"2", (4,4,35015,0):"2", (3,3,487,0):"2", (3,4,3655,0):"2",
+    (4,3,1447,0):"2", (4,3,2471,0):"2", (3,5,28807,0):"2", (4,4,19527,0):"2", (4,4,35911,0):"2", (4,3,3367,0):"2",
+    (4,4,50247,0):"2", (5,3,18727,0):"2", (2,5,475,0):"2", (2,4,251,0):"2", (2,5,971,0):"2", (3,4,747,0):"2",
+    (3,4,1259,0):"2", (3,4,2283,0):"2", (2,5,979,0):"2", (2,5,995,0):"2", (3,4,499,0):"2", (3,4,755,0):"2",
+    (3,4,1267,0):"2", (3,4,2291,0):"2", (3,3,251,0):"2", (3,3,379,0):"2", (4,3,635,0):"2", (3,3,443,0):"2",
+    (4,3,1211,0):"2", (3,4,3187,0):"2", (4,3,2363,0):"2", (3,3,475,0):"2", (4,2,127,0):"2", (4,2,191,0):"2",
+    (4,2,223,0):"2", (5,2,351,0):"2", (3,4,3635,0):"2", (4,3,1435,0):"2", (4,3,2459,0):"2", (4,2,239,0):"2",
+    (4,3,3227,0):"2", (5,2,687,0):"2", (3,3,491,0):"2", (3,4,3859,0):"2", (4,3,971,0):"2", (4,3,1483,0):"2",
+    (4,3,2507,0):"2", (4,2,247,0):"2", (5,2,375,0):"2", (4,3,3275,0):"2", (5,2,695,0):"2", (4,3,3659,0):"2",
+    (5,2,471,0):"2", (5,2,727,0):"2", (5,2,855,0):"2", (6,2,1367,0):"2", (2,6,3971,0):"2", (3,5,3011,0):"2",
+    (3,5,5059,0):"2", (3,5,9155,0):"2", (3,5,17347,0):"2", (3,4,995,0):"2", (3,4,1763,0):"2", (3,4,2787,0):"2",
+    (4,4,8931,0):"2", (3,4,3299,0):"2", (4,4,17635,0):"2", (3,5,25027,0):"2", (4,4,35043,0):"2", (3,3,499,0):"2",
+    (4,3,755,0):"2", (4,3,1267,0):"2", (3,4,3683,0):"2", (4,3,1459,0):"2", (4,3,2483,0):"2", (4,3,1715,0):"2",
+    (4,3,3251,0):"2", (5,3,9395,0):"2", (3,5,28867,0):"2", (4,4,19555,0):"2", (4,4,35939,0):"2", (4,3,3379,0):"2",
+    (4,4,50275,0):"2", (5,3,18739,0):"2", (3,4,3747,0):"2", (3,4,3875,0):"2", (4,3,979,0):"2", (4,3,1491,0):"2",
+    (4,3,2515,0):"2", (4,2,251,0):"2", (5,2,379,0):"2", (4,3,3283,0):"2", (5,2,699,0):"2", (3,5,30787,0):"2",
+    (4,4,11811,0):"2", (4,4,20003,0):"2", (4,4,36387,0):"2", (4,3,1939,0):"2", (4,3,3475,0):"2", (5,3,9619,0):"2",
+    (4,4,50723,0):"2", (5,3,18835,0):"2", (4,3,3731,0):"2", (5,2,491,0):"2", (5,2,747,0):"2", (4,4,57891,0):"2",
+    (5,3,11411,0):"2", (5,3,19603,0):"2", (5,2,939,0):"2", (5,3,25747,0):"2", (6,2,2731,0):"2", (2,5,253,0):"2",
+    (2,4,253,0):"2", (3,4,381,0):"2", (3,4,637,0):"2", (3,4,1149,0):"2", (2,5,997,0):"2", (3,4,501,0):"2",
+    (3,4,757,0):"2", (3,4,1269,0):"2", (3,4,2293,0):"2", (3,3,253,0):"2", (3,3,381,0):"2", (4,3,637,0):"2",
+    (3,3,445,0):"2", (4,3,1213,0):"2", (3,4,3189,0):"2", (4,3,2365,0):"2", (3,3,493,0):"2", (2,5,505,0):"2",
+    (2,5,1001,0):"2", (3,4,505,0):"2", (3,4,761,0):"2", (3,4,1273,0):"2", (3,4,2297,0):"2", (2,5,1009,0):"2",
+    (2,6,4033,0):"2", (3,5,2017,0):"2", (3,5,3041,0):"2", (3,5,5089,0):"2", (3,5,9185,0):"2", (3,5,17377,0):"2",
+    (3,4,1009,0):"2", (3,4,1521,0):"2", (3,4,2545,0):"2", (4,4,4593,0):"2", (3,4,1777,0):"2", (3,4,2801,0):"2",
+    (4,4,8945,0):"2", (3,4,3313,0):"2", (4,4,17649,0):"2", (3,5,25057,0):"2", (4,4,35057,0):"2", (3,3,505,0):"2",
+    (4,3,761,0):"2", (4,3,1273,0):"2", (3,4,3441,0):"2", (4,3,889,0):"2", (4,3,2425,0):"2", (4,3,1657,0):"2",
+    (5,3,4729,0):"2", (3,4,3697,0):"2", (4,3,1465,0):"2", (4,3,2489,0):"2", (4,3,1721,0):"2", (4,3,3257,0):"2",
+    (5,3,9401,0):"2", (3,5,28897,0):"2", (4,4,19569,0):"2", (4,4,35953,0):"2", (4,3,3385,0):"2", (4,4,50289,0):"2",
+    (5,3,18745,0):"2", (3,4,3761,0):"2", (3,4,3889,0):"2", (4,3,985,0):"2", (4,3,1497,0):"2", (4,3,2521,0):"2",
+    (4,2,253,0):"2", (5,2,381,0):"2", (4,3,3289,0):"2", (5,2,701,0):"2", (4,3,3673,0):"2", (5,2,477,0):"2",
+    (5,2,733,0):"2", (5,2,861,0):"2", (6,2,1373,0):"2", (3,5,30817,0):"2", (4,4,11825,0):"2", (4,4,20017,0):"2",
+    (4,4,36401,0):"2", (4,3,1945,0):"2", (4,3,3481,0):"2", (5,3,9625,0):"2", (4,4,50737,0):"2", (5,3,18841,0):"2",
+    (4,3,3737,0):"2", (5,2,493,0):"2", (5,2,749,0):"2", (4,4,57905,0):"2", (5,3,11417,0):"2", (5,3,19609,0):"2",
+    (5,2,941,0):"2", (5,3,25753,0):"2", (6,2,2733,0):"2", (3,4,2001,0):"2", (3,4,3921,0):"2", (4,3,1001,0):"2",
+    (4,3,1513,0):"2", (4,3,2537,0):"2", (3,4,3985,0):"2", (3,5,31777,0):"2", (4,4,7953,0):"2", (4,4,12049,0):"2",
+    (4,4,20241,0):"2", (4,4,36625,0):"2", (4,3,1993,0):"2", (4,3,3017,0):"2", (5,3,5065,0):"2", (4,3,3529,0):"2",
+    (5,3,9673,0):"2", (4,4,50961,0):"2", (5,3,18889,0):"2", (4,3,3785,0):"2", (5,2,501,0):"2", (5,2,757,0):"2",
+    (5,2,885,0):"2", (6,2,1397,0):"2", (4,4,58129,0):"2", (5,3,11465,0):"2", (5,3,19657,0):"2", (5,2,949,0):"2",
+    (5,3,25801,0):"2", (6,2,2741,0):"2", (4,3,3913,0):"2", (4,4,61713,0):"2", (5,3,7753,0):"2", (5,3,11849,0):"2",
+    (5,3,20041,0):"2", (5,2,981,0):"2", (6,2,1493,0):"2", (5,3,26185,0):"2", (6,2,2773,0):"2", (5,3,29257,0):"2",
+    (6,2,1877,0):"2", (6,2,2901,0):"2", (6,2,3413,0):"2", (7,1,127,0):"2", (2,6,254,0):"2", (2,5,254,0):"2",
+    (2,5,382,0):"2", (2,5,638,0):"2", (3,5,1150,0):"2", (3,5,2174,0):"2", (3,5,3166,0):"2", (2,4,254,0):"2",
+    (3,4,382,0):"2", (3,4,638,0):"2", (3,4,1150,0):"2", (2,5,878,0):"2", (3,4,446,0):"2", (3,4,702,0):"2",
+    (3,4,2238,0):"2", (3,4,830,0):"2", (4,4,4414,0):"2", (3,4,1598,0):"2", (4,4,8766,0):"2", (3,4,878,0):"2",
+    (3,4,942,0):"2", (3,4,1838,0):"2", (4,4,4910,0):"2", (4,4,9006,0):"2", (4,4,12846,0):"2", (3,4,1870,0):"2",
+    (2,5,998,0):"2", (3,4,502,0):"2", (3,4,758,0):"2", (3,4,1270,0):"2", (3,4,2294,0):"2", (3,3,254,0):"2",
+    (3,3,382,0):"2", (4,3,638,0):"2", (3,3,446,0):"2", (4,3,1214,0):"2", (3,4,3190,0):"2", (4,3,2366,0):"2",
+    (3,3,478,0):"2", (4,3,734,0):"2", (4,3,1246,0):"2", (4,3,1630,0):"2", (5,3,4702,0):"2", (3,4,3638,0):"2",
+    (4,3,1438,0):"2", (4,3,2462,0):"2", (4,3,1694,0):"2", (4,3,3230,0):"2", (5,3,9374,0):"2", (3,3,494,0):"2",
+    (3,4,998,0):"2", (3,3,502,0):"2", (4,3,758,0):"2", (4,3,1270,0):"2", (4,3,1718,0):"2", (3,4,3878,0):"2",
+    (4,3,982,0):"2", (4,3,1494,0):"2", (4,3,2518,0):"2", (4,3,1750,0):"2", (5,3,4822,0):"2", (4,3,3286,0):"2",
+    (5,3,9430,0):"2", (4,3,1942,0):"2", (4,3,3734,0):"2", (5,3,5782,0):"2", (5,3,9878,0):"2", (5,3,13462,0):"2",
+    (3,4,1990,0):"2", (3,4,3910,0):"2", (4,3,998,0):"2", (4,3,1510,0):"2", (4,3,2534,0):"2", (4,3,1958,0):"2",
+    (4,3,3878,0):"2", (2,5,506,0):"2", (2,5,1002,0):"2", (3,4,506,0):"2", (3,4,762,0):"2", (3,4,1274,0):"2",
+    (3,4,2298,0):"2", (3,4,1002,0):"2", (2,5,1010,0):"2", (2,6,4034,0):"2", (3,5,2018,0):"2", (3,5,3042,0):"2",
+    (3,5,5090,0):"2", (3,5,9186,0):"2", (3,5,17378,0):"2", (3,4,1010,0):"2", (3,4,1522,0):"2", (3,4,2546,0):"2",
+    (4,4,4594,0):"2", (3,4,1778,0):"2", (3,4,2802,0):"2", (4,4,8946,0):"2", (3,4,3314,0):"2", (4,4,17650,0):"2",
+    (3,5,25058,0):"2", (4,4,35058,0):"2", (3,3,506,0):"2", (4,3,762,0):"2", (4,3,1274,0):"2", (3,4,3442,0):"2",
+    (4,3,890,0):"2", (4,3,2426,0):"2", (4,3,1658,0):"2", (5,3,4730,0):"2", (3,4,3698,0):"2", (4,3,1466,0):"2",
+    (4,3,2490,0):"2", (4,3,1722,0):"2", (4,3,3258,0):"2", (5,3,9402,0):"2", (3,5,28898,0):"2", (4,4,19570,0):"2",
+    (4,4,35954,0):"2", (4,3,3386,0):"2", (4,4,50290,0):"2", (5,3,18746,0):"2", (3,4,3762,0):"2", (3,4,3890,0):"2",
+    (4,3,986,0):"2", (4,3,1498,0):"2", (4,3,2522,0):"2", (4,2,254,0):"2", (5,2,382,0):"2", (4,3,3290,0):"2",
+    (5,2,702,0):"2", (4,3,3674,0):"2", (5,2,478,0):"2", (5,2,734,0):"2", (5,2,862,0):"2", (6,2,1374,0):"2",
+    (3,5,30818,0):"2", (4,4,11826,0):"2", (4,4,20018,0):"2", (4,4,36402,0):"2", (4,3,1946,0):"2", (4,3,3482,0):"2",
+    (5,3,9626,0):"2", (4,4,50738,0):"2", (5,3,18842,0):"2", (4,3,3738,0):"2", (5,2,494,0):"2", (5,2,750,0):"2",
+    (4,4,57906,0):"2", (5,3,11418,0):"2", (5,3,19610,0):"2", (5,2,942,0):"2", (5,3,25754,0):"2", (6,2,2734,0):"2",
+    (3,5,4034,0):"2", (3,4,2018,0):"2", (3,4,3042,0):"2", (4,4,5090,0):"2", (4,4,9186,0):"2", (4,4,13026,0):"2",
+    (3,4,3938,0):"2", (4,3,1010,0):"2", (4,3,1522,0):"2", (4,3,2546,0):"2", (4,3,1778,0):"2", (5,3,4850,0):"2",
+    (4,3,3314,0):"2", (5,3,9458,0):"2", (4,3,1970,0):"2", (4,3,3762,0):"2", (5,3,5810,0):"2", (5,3,9906,0):"2",
+    (5,3,13490,0):"2", (4,3,3890,0):"2", (3,4,4002,0):"2", (3,5,31810,0):"2", (4,4,7970,0):"2", (4,4,12066,0):"2",
+    (4,4,20258,0):"2", (4,4,36642,0):"2", (4,3,2002,0):"2", (4,3,3026,0):"2", (5,3,5074,0):"2", (4,3,3538,0):"2",
+    (5,3,9682,0):"2", (4,4,50978,0):"2", (5,3,18898,0):"2", (4,3,3794,0):"2", (5,2,506,0):"2", (5,2,762,0):"2",
+    (5,2,890,0):"2", (6,2,1402,0):"2", (4,4,58146,0):"2", (5,3,11474,0):"2", (5,3,19666,0):"2", (5,2,954,0):"2",
+    (5,3,25810,0):"2", (6,2,2746,0):"2", (4,4,15906,0):"2", (4,3,3986,0):"2", (5,3,6034,0):"2", (5,3,10130,0):"2",
+    (5,3,13714,0):"2", (4,4,61986,0):"2", (5,3,7826,0):"2", (5,3,11922,0):"2", (5,3,20114,0):"2", (5,2,1002,0):"2",
+    (6,2,1514,0):"2", (5,3,26258,0):"2", (6,2,2794,0):"2", (5,3,15506,0):"2", (5,3,29842,0):"2", (6,2,1962,0):"2",
+    (6,2,2986,0):"2", (6,2,3754,0):"2", (2,6,508,0):"2", (2,5,508,0):"2", (2,5,764,0):"2", (3,5,1276,0):"2",
+    (3,5,2300,0):"2", (3,5,4348,0):"2", (3,5,3292,0):"2", (3,5,7324,0):"2", (2,5,1004,0):"2", (3,4,508,0):"2",
+    (3,4,764,0):"2", (3,4,1276,0):"2", (3,4,2300,0):"2", (3,4,892,0):"2", (3,4,1404,0):"2", (4,4,4476,0):"2",
+    (3,4,1660,0):"2", (4,4,8828,0):"2", (3,4,3196,0):"2", (4,4,17532,0):"2", (3,4,1884,0):"2", (3,4,1004,0):"2",
+    (3,4,1900,0):"2", (4,4,4972,0):"2", (4,4,9068,0):"2", (4,4,12908,0):"2", (3,4,1996,0):"2", (3,4,3916,0):"2",
+    (4,4,5964,0):"2", (4,4,10060,0):"2", (4,4,18252,0):"2", (4,4,13900,0):"2", (4,4,29772,0):"2", (3,4,3980,0):"2",
+    (2,5,1012,0):"2", (2,6,4036,0):"2", (3,5,2020,0):"2", (3,5,3044,0):"2", (3,5,5092,0):"2", (3,5,9188,0):"2",
+    (3,5,17380,0):"2", (3,4,1012,0):"2", (3,4,1524,0):"2", (3,4,2548,0):"2", (4,4,4596,0):"2", (3,4,1780,0):"2",
+    (3,4,2804,0):"2", (4,4,8948,0):"2", (3,4,3316,0):"2", (4,4,17652,0):"2", (3,5,25060,0):"2", (4,4,35060,0):"2",
+    (3,3,508,0):"2", (4,3,764,0):"2", (4,3,1276,0):"2", (3,4,3444,0):"2", (4,3,892,0):"2", (4,3,2428,0):"2",
+    (4,3,1660,0):"2", (5,3,4732,0):"2", (3,4,3700,0):"2", (4,3,1468,0):"2", (4,3,2492,0):"2", (4,3,1724,0):"2",
+    (4,3,3260,0):"2", (5,3,9404,0):"2", (3,5,28900,0):"2", (4,4,19572,0):"2", (4,4,35956,0):"2", (4,3,3388,0):"2",
+    (4,4,50292,0):"2", (5,3,18748,0):"2", (3,4,2004,0):"2", (3,4,3924,0):"2", (4,3,1004,0):"2", (4,3,1516,0):"2",
+    (4,3,2540,0):"2", (3,5,4036,0):"2", (3,4,2020,0):"2", (3,4,3044,0):"2", (4,4,5092,0):"2", (4,4,9188,0):"2",
+    (4,4,13028,0):"2", (3,4,3940,0):"2", (4,3,1012,0):"2", (4,3,1524,0):"2", (4,3,2548,0):"2", (4,3,1780,0):"2",
+    (5,3,4852,0):"2", (4,3,3316,0):"2", (5,3,9460,0):"2", (4,3,1972,0):"2", (4,3,3764,0):"2", (5,3,5812,0):"2",
+    (5,3,9908,0):"2", (5,3,13492,0):"2", (4,3,3892,0):"2", (3,5,8068,0):"2", (3,4,4036,0):"2", (4,4,6084,0):"2",
+    (4,4,10180,0):"2", (4,4,18372,0):"2", (4,4,14020,0):"2", (4,4,29892,0):"2", (3,5,31876,0):"2", (4,4,8004,0):"2",
+    (4,4,12100,0):"2", (4,4,20292,0):"2", (4,4,36676,0):"2", (4,3,2020,0):"2", (4,3,3044,0):"2", (5,3,5092,0):"2",
+    (4,3,3556,0):"2", (5,3,9700,0):"2", (4,4,51012,0):"2", (5,3,18916,0):"2", (4,3,3940,0):"2", (4,4,15940,0):"2",
+    (4,3,4004,0):"2", (5,3,6052,0):"2", (5,3,10148,0):"2", (5,3,13732,0):"2", (4,4,31812,0):"2", (4,4,62532,0):"2",
+    (5,3,7972,0):"2", (5,3,12068,0):"2", (5,3,20260,0):"2", (5,3,15652,0):"2", (5,3,31012,0):"2", (2,6,1016,0):"2",
+    (2,5,1016,0):"2", (3,5,1528,0):"2", (3,5,2552,0):"2", (3,5,4600,0):"2", (3,5,8696,0):"2", (3,5,3544,0):"2",
+    (3,5,7576,0):"2", (3,5,15640,0):"2", (2,6,4040,0):"2", (3,5,2024,0):"2", (3,5,3048,0):"2", (3,5,5096,0):"2",
+    (3,5,9192,0):"2", (3,5,17384,0):"2", (3,4,1016,0):"2", (3,4,1528,0):"2", (3,4,2552,0):"2", (4,4,4600,0):"2",
+    (3,4,1784,0):"2", (3,4,2808,0):"2", (4,4,8952,0):"2", (3,4,3320,0):"2", (4,4,17656,0):"2", (3,5,25064,0):"2",
+    (4,4,35064,0):"2", (3,4,3768,0):"2", (3,4,2008,0):"2", (3,4,3992,0):"2", (3,5,4040,0):"2", (3,4,2024,0):"2",
+    (3,4,3048,0):"2", (4,4,5096,0):"2", (4,4,9192,0):"2", (4,4,13032,0):"2", (3,4,4008,0):"2", (3,5,8072,0):"2",
+    (3,4,4040,0):"2", (4,4,6088,0):"2", (4,4,10184,0):"2", (4,4,18376,0):"2", (4,4,14024,0):"2", (4,4,29896,0):"2",
+    (3,5,16136,0):"2", (3,5,32008,0):"2", (4,4,8072,0):"2", (4,4,12168,0):"2", (4,4,20360,0):"2", (4,4,36744,0):"2",
+    (4,4,16008,0):"2", (4,4,31880,0):"2", (4,4,63624,0):"2", (2,6,2032,0):"2", (2,6,4048,0):"2", (3,5,2032,0):"2",
+    (3,5,3056,0):"2", (3,5,5104,0):"2", (3,5,9200,0):"2", (3,5,17392,0):"2", (3,5,4048,0):"2", (3,5,8080,0):"2",
+    (3,5,16144,0):"2", (3,5,32272,0):"2", (2,6,4064,0):"2",
+}
+# END GENERATED EYE VALUE TABLE
@@ -1,8 +1,11 @@
 import os
 import re
 import inspect
+import json
 
-from goscorer import final_territory_score, final_area_score, territory_scoring, area_scoring, string2d, string2d2, EMPTY, BLACK, WHITE
+import pytest
+
+from goscorer import final_territory_score, final_area_score, territory_scoring, area_scoring, territory_scoring_batch, final_territory_score_batch, ScoringSession, ScoringCache, ScoringResult, ScratchPool, Board, LocScore, string2d, string2d2, EMPTY, BLACK, WHITE
 
 def stones_and_marked_dead_of_str(stonestr: str):
     rows = stonestr.split("\n")
@@ -141,6 +144,516 @@ def test_final_scoring():
     assert final_territory_score(stones,marked_dead,black_points_from_captures=0,white_points_from_captures=0,komi=0) == { BLACK: 5, WHITE: 8 }
     assert final_area_score(stones,marked_dead,komi=0) == { BLACK: 19, WHITE: 24 }
 
+def test_large_open_board():
+    # Large open areas should not run into any recursion limit
+    size = 41
+    stones = [[BLACK if x == 10 else WHITE if x == 30 else EMPTY for x in range(size)] for y in range(size)]
+    marked_dead = [[False for x in range(size)] for y in range(size)]
+    assert final_territory_score(stones,marked_dead,black_points_from_captures=0,white_points_from_captures=0,komi=0) == { BLACK: 410, WHITE: 410 }
+    assert final_area_score(stones,marked_dead,komi=0) == { BLACK: 451, WHITE: 451 }
+
+    stones = [[EMPTY for x in range(size)] for y in range(size)]
+    stones[0][0] = BLACK
+    assert final_territory_score(stones,marked_dead,black_points_from_captures=0,white_points_from_captures=0,komi=0) == { BLACK: size*size-1, WHITE: 0 }
+
+def test_bitboard_engine():
+    stonestr = """
+    .xo.oxxo.
+    x.o.oxo.o
+    ooooxxob.
+    xxxxxxooo
+    w..wx.x.o
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    assert territory_scoring(stones,marked_dead,use_bitboards=True) == territory_scoring(stones,marked_dead)
+    assert area_scoring(stones,marked_dead,use_bitboards=True) == area_scoring(stones,marked_dead)
+    assert final_territory_score(stones,marked_dead,black_points_from_captures=0,white_points_from_captures=0,komi=0,use_bitboards=True) == { BLACK: 6, WHITE: 5 }
+    assert final_area_score(stones,marked_dead,komi=0,use_bitboards=True) == { BLACK: 21, WHITE: 22 }
+
+def test_numpy_arrays():
+    np = pytest.importorskip("numpy")
+    stonestr = """
+    .xo.oxxo.
+    x.o.oxo.o
+    ooooxxob.
+    xxxxxxooo
+    w..wx.x.o
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    stones_arr = np.array(stones,dtype=np.uint8)
+    marked_dead_arr = np.array(marked_dead)
+    assert territory_scoring(stones_arr,marked_dead_arr) == territory_scoring(stones,marked_dead)
+    assert territory_scoring(stones_arr,marked_dead_arr,score_false_eyes=True) == territory_scoring(stones,marked_dead,score_false_eyes=True)
+    assert area_scoring(stones_arr,marked_dead_arr).tolist() == area_scoring(stones,marked_dead)
+    assert final_territory_score(stones_arr,marked_dead_arr,black_points_from_captures=0,white_points_from_captures=0,komi=0) == { BLACK: 6, WHITE: 5 }
+    assert final_area_score(stones_arr,marked_dead_arr,komi=0) == { BLACK: 21, WHITE: 22 }
+    # Scores are plain Python numbers, so they can be serialized like those for lists.
+    assert json.dumps(final_area_score(stones_arr,marked_dead_arr,komi=0.5)) == json.dumps(final_area_score(stones,marked_dead,komi=0.5))
+    assert json.dumps(final_territory_score(stones_arr,marked_dead_arr,0,0,0)) == json.dumps(final_territory_score(stones,marked_dead,0,0,0))
+
+    with pytest.raises(ValueError):
+        territory_scoring(stones_arr + 1,marked_dead_arr)
+    with pytest.raises(ValueError):
+        area_scoring(stones_arr,marked_dead_arr[:,1:])
+
+def test_batch_scoring():
+    stonestrs = [
+    """
+    .xo.oxxo.
+    x.o.oxo.o
+    ooooxxob.
+    xxxxxxooo
+    w..wx.x.o
+    """,
+    """
+    ......x..
+    .xx.x.x..
+    ......x..
+    ......x..
+    oooooox..
+    .....oxxx
+    .....o.o.
+    ...o.o..o
+    .....o...
+    """,
+    """
+    .x.o
+    xx.o
+    """,
+    ]
+    positions = [stones_and_marked_dead_of_str(stonestr) for stonestr in stonestrs] * 3
+    expected = [territory_scoring(stones,marked_dead) for (stones,marked_dead) in positions]
+    assert territory_scoring_batch(positions,processes=1) == expected
+    assert territory_scoring_batch(positions,processes=2,chunksize=2) == expected
+
+    expected_scores = [final_territory_score(stones,marked_dead,1,2,6.5) for (stones,marked_dead) in positions]
+    assert final_territory_score_batch(positions,1,2,6.5,processes=2) == expected_scores
+    komis = [0.5 * i for i in range(len(positions))]
+    expected_scores = [final_territory_score(stones,marked_dead,0,0,komi) for ((stones,marked_dead),komi) in zip(positions,komis)]
+    assert final_territory_score_batch(positions,0,0,komis,processes=1) == expected_scores
+
+def test_scoring_session():
+    stonestr = """
+    .x.xo.o..
+    xxxxooo.o
+    .o.xxo.oo
+    ooxx.xoo.
+    .o.x.xo.o
+    ooxxxxoo.
+    .xx..xo.o
+    x..x.xooo
+    .x.xxxo..
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    session = ScoringSession(stones,marked_dead)
+    assert session.scoring == territory_scoring(stones,marked_dead)
+
+    # Toggle some groups dead and back alive again, checking against scoring from scratch each time.
+    for (y,x) in [(2,1),(0,4),(6,1),(2,1),(0,4),(3,3),(3,3),(6,1)]:
+        was_dead = session.get_marked_dead()[y][x]
+        scoring = session.toggle_dead(y,x)
+        marked_dead = session.get_marked_dead()
+        assert marked_dead[y][x] != was_dead
+        assert scoring == territory_scoring(stones,marked_dead)
+    assert session.get_marked_dead() == stones_and_marked_dead_of_str(stonestr)[1]
+
+    with pytest.raises(ValueError):
+        session.toggle_dead(0,0)
+
+def test_scoring_cache():
+    stonestr = """
+    .xo.oxxo.
+    x.o.oxo.o
+    ooooxxob.
+    xxxxxxooo
+    w..wx.x.o
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    other_stones,other_marked_dead = stones_and_marked_dead_of_str(stonestr.replace("w","o"))
+    cache = ScoringCache(capacity=2)
+
+    expected = territory_scoring(stones,marked_dead)
+    assert cache.territory_scoring(stones,marked_dead) == expected
+    result = cache.territory_scoring(stones,marked_dead)
+    assert result == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Modifying a returned result must not affect the cache.
+    result.is_territory_for[0] = 3 - expected.is_territory_for[0]
+    assert result != expected
+    assert cache.territory_scoring(stones,marked_dead) == expected
+    assert cache.territory_scoring(stones,marked_dead,score_false_eyes=True) == territory_scoring(stones,marked_dead,score_false_eyes=True)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # Least recently used entries are evicted beyond the capacity.
+    assert cache.territory_scoring(other_stones,other_marked_dead) == territory_scoring(other_stones,other_marked_dead)
+    assert len(cache) == 2 and cache.evictions == 1
+    cache.territory_scoring(stones,marked_dead)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    assert cache.area_scoring(stones,marked_dead) == area_scoring(stones,marked_dead)
+    assert cache.area_scoring(stones,marked_dead) == area_scoring(stones,marked_dead)
+    assert cache.final_territory_score(stones,marked_dead,0,0,0) == { BLACK: 6, WHITE: 5 }
+    assert cache.final_territory_score(stones,marked_dead,1,2,6.5) == { BLACK: 7, WHITE: 13.5 }
+    assert (cache.hits, cache.misses) == (4, 6)
+
+def test_scoring_cache_orientations():
+    import random
+    def rotate(board):
+        return [list(row) for row in zip(*board[::-1])]
+    def mirror(board):
+        return [list(row[::-1]) for row in board]
+    symmetries = [
+        lambda board: board,
+        rotate,
+        lambda board: rotate(rotate(board)),
+        lambda board: rotate(rotate(rotate(board))),
+        mirror,
+        lambda board: mirror(rotate(board)),
+        lambda board: mirror(rotate(rotate(board))),
+        lambda board: mirror(rotate(rotate(rotate(board)))),
+    ]
+
+    stonestr = """
+    .xo.oxxo.
+    x.o.oxo.o
+    ooooxxob.
+    xxxxxxooo
+    w..wx.x.o
+    """
+    positions = [stones_and_marked_dead_of_str(stonestr)]
+    rand = random.Random(9)
+    for _ in range(20):
+        (ysize, xsize) = (rand.randint(3,8), rand.randint(3,8))
+        stones = [[rand.choice([EMPTY,EMPTY,BLACK,WHITE]) for x in range(xsize)] for y in range(ysize)]
+        marked_dead = [[stone != EMPTY and rand.random() < 0.2 for stone in row] for row in stones]
+        positions.append((stones,marked_dead))
+
+    # Territory scoring heuristics depend on orientation, so every orientation of a position is its own entry
+    # and cached results always equal uncached ones.
+    cache = ScoringCache()
+    for (stones,marked_dead) in positions:
+        for _ in range(2):
+            for transform in symmetries:
+                (transformed_stones, transformed_marked_dead) = (transform(stones), transform(marked_dead))
+                for score_false_eyes in [False,True]:
+                    assert cache.territory_scoring(transformed_stones,transformed_marked_dead,score_false_eyes) == territory_scoring(transformed_stones,transformed_marked_dead,score_false_eyes)
+                    assert cache.final_territory_score(transformed_stones,transformed_marked_dead,0,0,0,score_false_eyes) == final_territory_score(transformed_stones,transformed_marked_dead,0,0,0,score_false_eyes)
+                assert cache.area_scoring(transformed_stones,transformed_marked_dead) == area_scoring(transformed_stones,transformed_marked_dead)
+
+    cache = ScoringCache()
+    (stones,marked_dead) = positions[0]
+    for _ in range(2):
+        for transform in symmetries:
+            cache.territory_scoring(transform(stones),transform(marked_dead))
+    assert (cache.hits, cache.misses) == (8, 8) and len(cache) == 8
+
+def test_scoring_result():
+    stonestr = """
+    .xo.oxxo.
+    x.o.oxo.o
+    ooooxxob.
+    xxxxxxooo
+    w..wx.x.o
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    scoring = territory_scoring(stones,marked_dead)
+    assert isinstance(scoring,ScoringResult)
+    assert len(scoring) == 5 and len(scoring[0]) == 9
+
+    lists = scoring.to_lists()
+    assert all(isinstance(locscore,LocScore) for row in lists for locscore in row)
+    assert scoring == lists
+    assert scoring[-1][-1] == lists[4][8]
+    assert scoring[1:3] == lists[1:3]
+    assert [list(row) for row in scoring] == lists
+
+    arrays = scoring.arrays()
+    assert list(arrays) == ["is_territory_for","belongs_to_seki_group","is_false_eye","is_unscorable_false_eye","is_dame","eye_value"]
+    for y in range(5):
+        for x in range(9):
+            assert arrays["is_territory_for"][y*9+x] == lists[y][x].is_territory_for
+            assert arrays["eye_value"][y*9+x] == lists[y][x].eye_value
+
+    # LocScores are created on demand, so modifying one does not modify the result.
+    locscore = scoring[0][0]
+    locscore.is_territory_for = 3 - locscore.is_territory_for
+    assert scoring[0][0] != locscore and scoring == lists
+    copied = scoring.copy()
+    copied.is_territory_for[0] = WHITE
+    assert copied != scoring and copied[0][0].is_territory_for == WHITE
+
+def test_scratch_pool():
+    stonestrs = [
+        """
+        ..xx.o.xobbb.oxxw.
+        wwwxooxxobboooxw.w
+        ww.xox.xooooo.xwwx
+        xxxxoxx.xo...xx.xx
+        """,
+        """
+        .xo.oxxo.
+        x.o.oxo.o
+        ooooxxob.
+        """,
+        """
+        .wxx.o.xob.b.oxxww
+        w.wxooxxo.boooxwww
+        ...xox.xooooo.xww.
+        xxxxoxx.xo..xxxxxx
+        """,
+    ]
+    pool = ScratchPool()
+    previous = {}
+    for stonestr in stonestrs * 2:
+        stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+        expected = territory_scoring(stones,marked_dead)
+        size = (len(stones),len(stones[0]))
+        out = previous.get(size)
+        scoring = territory_scoring(stones,marked_dead,scratch=pool,out=out)
+        assert scoring == expected
+        assert out is None or scoring is out
+        previous[size] = scoring
+        assert final_territory_score(stones,marked_dead,0,0,0,scratch=pool) == final_territory_score(stones,marked_dead,0,0,0)
+    assert len(pool.buffers_by_size) == 2
+
+    # Reset arrays hold exactly their initial values, not merely equal ones such as 0 for False.
+    from goscorer import get_geometry, SCRATCH_ARRAY_INITIAL_VALUES
+    buffers = pool.get_buffers(get_geometry(len(stones),len(stones[0])))
+    for (name, initial_value) in SCRATCH_ARRAY_INITIAL_VALUES:
+        assert all(type(value) is type(initial_value) and value == initial_value for value in getattr(buffers,name))
+    assert all(value is False for value in buffers.is_pseudolegal_for[BLACK] + buffers.is_pseudolegal_for[WHITE])
+
+    with pytest.raises(ValueError):
+        territory_scoring(stones,marked_dead,out=ScoringResult(3,3))
+
+def test_board():
+    stonestr = """
+    .wxx.o.xob.b.oxxww
+    w.wxooxxo.boooxwww
+    ...xox.xooooo.xww.
+    xxxxoxx.xo..xxxxxx
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    board = Board(stones,marked_dead)
+    assert board.get_stones() == stones
+    assert board.get_marked_dead() == marked_dead
+    assert board == Board(stones,marked_dead)
+    assert hash(board) == hash(Board(stones,marked_dead))
+    assert board != Board(stones)
+    with pytest.raises(AttributeError):
+        board.xsize = 3
+
+    expected = territory_scoring(stones,marked_dead)
+    assert territory_scoring(board) == expected
+    assert territory_scoring(board,use_bitboards=True,scratch=ScratchPool()) == expected
+    assert territory_scoring(board,score_false_eyes=True) == territory_scoring(stones,marked_dead,score_false_eyes=True)
+    assert final_territory_score(board,None,1,2,3) == final_territory_score(stones,marked_dead,1,2,3)
+    assert area_scoring(board) == area_scoring(stones,marked_dead)
+    assert final_area_score(board,None,komi=3) == final_area_score(stones,marked_dead,komi=3)
+    assert territory_scoring_batch([board,(stones,marked_dead)],processes=1) == [expected,expected]
+    assert final_territory_score_batch([board],0,0,0,processes=1) == [final_territory_score(stones,marked_dead,0,0,0)]
+    assert ScoringSession(board).scoring == expected
+    cache = ScoringCache()
+    assert cache.territory_scoring(board) == expected
+    assert cache.territory_scoring(stones,marked_dead) == expected
+    assert cache.hits == 1
+
+    with pytest.raises(ValueError):
+        territory_scoring(board,marked_dead)
+    with pytest.raises(ValueError):
+        territory_scoring(stones)
+    with pytest.raises(ValueError):
+        Board(stones,marked_dead[1:])
+    with pytest.raises(ValueError):
+        Board([[EMPTY,3]])
+
+def test_buffer_inputs():
+    import array
+    stonestr = """
+    .wxx.o.xob.b.oxxww
+    w.wxooxxo.boooxwww
+    ...xox.xooooo.xww.
+    xxxxoxx.xo..xxxxxx
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    (ysize, xsize) = (len(stones), len(stones[0]))
+    stones_bytes = bytes(value for row in stones for value in row)
+    marked_dead_bytes = bytes(value for row in marked_dead for value in row)
+    expected = territory_scoring(stones,marked_dead)
+    for (stones_buffer, marked_dead_buffer) in [
+        (stones_bytes, marked_dead_bytes),
+        (bytearray(stones_bytes), memoryview(marked_dead_bytes)),
+        (array.array("B",stones_bytes), array.array("b",marked_dead_bytes)),
+    ]:
+        assert territory_scoring(stones_buffer,marked_dead_buffer,ysize=ysize,xsize=xsize) == expected
+        assert territory_scoring(stones_buffer,marked_dead_buffer,scratch=ScratchPool(),ysize=ysize,xsize=xsize) == expected
+        assert final_territory_score(stones_buffer,marked_dead_buffer,1,2,3,ysize=ysize,xsize=xsize) == final_territory_score(stones,marked_dead,1,2,3)
+        assert area_scoring(stones_buffer,marked_dead_buffer,ysize=ysize,xsize=xsize) == area_scoring(stones,marked_dead)
+        assert final_area_score(stones_buffer,marked_dead_buffer,komi=3,ysize=ysize,xsize=xsize) == final_area_score(stones,marked_dead,komi=3)
+
+    with pytest.raises(ValueError):
+        territory_scoring(stones_bytes,marked_dead_bytes)
+    with pytest.raises(ValueError):
+        territory_scoring(stones_bytes,marked_dead_bytes[1:],ysize=ysize,xsize=xsize)
+    with pytest.raises(ValueError):
+        territory_scoring(stones_bytes[:-1] + bytes([3]),marked_dead_bytes,ysize=ysize,xsize=xsize)
+    with pytest.raises(ValueError):
+        area_scoring(array.array("i",list(stones_bytes)),marked_dead_bytes,ysize=ysize,xsize=xsize)
+
+def test_encode_scoring():
+    stonestr = """
+    .xo.oxxo.
+    x.o.oxo.o
+    ooooxxob.
+    xxxxxxooo
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    scoring = territory_scoring(stones,marked_dead)
+    encoded = scoring.encode()
+    # Also checked by the javascript decoder tests, so the formats can't drift apart.
+    assert encoded.hex() == "010409000002000200280000a516841aa05a405501410001010100140000000000000000000000000004000000"
+    assert ScoringResult.decode(encoded) == scoring
+
+    stonestr = """
+    .wxx.o.xob.b.oxxww
+    w.wxooxxo.boooxwww
+    ...xox.xooooo.xww.
+    xxxxoxx.xo..xxxxxx
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    for score_false_eyes in [False,True]:
+        scoring = territory_scoring(stones,marked_dead,score_false_eyes=score_false_eyes)
+        assert ScoringResult.decode(scoring.encode()) == scoring
+    assert len(ScoringResult(19,19).encode()) == 414
+
+    with pytest.raises(ValueError):
+        ScoringResult.decode(encoded[:-1])
+    with pytest.raises(ValueError):
+        ScoringResult.decode(encoded + bytes(1))
+    with pytest.raises(ValueError):
+        ScoringResult.decode(bytes([0]) + encoded[1:])
+    with pytest.raises(ValueError):
+        ScoringResult(256,1).encode()
+
+def test_bottlenecks():
+    import random
+    from goscorer import get_geometry, fill_mask, iter_mask_locs, find_bottlenecks, get_piece_counts, count_pieces
+    rand = random.Random(1234)
+    geom = get_geometry(9,11)
+
+    def get_pieces(points_mask):
+        pieces = []
+        while points_mask:
+            piece = fill_mask(geom,points_mask & -points_mask,points_mask,points_mask)
+            pieces.append(list(iter_mask_locs(piece)))
+            points_mask &= ~piece
+        return pieces
+
+    for _ in range(300):
+        density = rand.random()
+        points = set(loc for loc in geom.locs if rand.random() < density)
+        is_marked = {loc: rand.random() < 0.3 for loc in points}
+        bottlenecks = find_bottlenecks(geom,points,[lambda loc: True, lambda loc: is_marked[loc]])
+        points_mask = sum(1 << loc for loc in points)
+        assert len(bottlenecks.component_roots) == len(get_pieces(points_mask))
+        for point_to_delete in points:
+            pieces = get_pieces(points_mask & ~(1 << point_to_delete))
+            expected = sorted([len(piece), sum(is_marked[loc] for loc in piece)] for piece in pieces)
+            assert sorted(get_piece_counts(bottlenecks,point_to_delete)) == expected
+            assert count_pieces(bottlenecks,point_to_delete) == len(pieces)
+
+def test_graph_forest():
+    import random
+    from goscorer import find_graph_forest
+    rand = random.Random(5678)
+    for _ in range(200):
+        num_nodes = rand.randint(1,12)
+        adjacency = [[] for _ in range(num_nodes)]
+        for _ in range(rand.randint(0,2*num_nodes)):
+            (a, b) = (rand.randrange(num_nodes), rand.randrange(num_nodes))
+            if a != b and b not in adjacency[a]:
+                adjacency[a].append(b)
+                adjacency[b].append(a)
+        forest = find_graph_forest(adjacency)
+
+        def component(start, excluded):
+            reached = set([start])
+            stack = [start]
+            while stack:
+                for neighbor in adjacency[stack.pop()]:
+                    if neighbor != excluded and neighbor not in reached:
+                        reached.add(neighbor)
+                        stack.append(neighbor)
+            return reached
+
+        for node in range(num_nodes):
+            index = forest.preorder_of_node[node]
+            assert forest.node_at[index] == node
+            pieces = set(frozenset(component(neighbor,node)) for neighbor in adjacency[node])
+            assert forest.is_cut_vertex[index] == (len(pieces) > 1)
+            # Pieces of each neighbor are the subtrees separated from the node, or the rest of its component.
+            separated_children = [child for child in forest.children[index] if forest.low[child] >= index]
+            root = forest.component_root[index]
+            for neighbor in adjacency[node]:
+                nindex = forest.preorder_of_node[neighbor]
+                child = next((child for child in separated_children if child <= nindex < forest.subtree_end[child]), -1)
+                if child == -1:
+                    separated = set(i for child in separated_children for i in range(child,forest.subtree_end[child]))
+                    indices = [i for i in range(root,forest.subtree_end[root]) if i != index and i not in separated]
+                else:
+                    indices = range(child,forest.subtree_end[child])
+                assert set(forest.node_at[i] for i in indices) == component(neighbor,node)
+
+def test_eye_value_cache():
+    stonestr = """
+    .b.oxxo.bbb.oxxo.bb
+    boooxxoooboooxxooob
+    .o.xxxx.o.o.xxxx.o.
+    oox....xooox....xoo
+    xxx....xxxxx....xxx
+    """
+    stones,marked_dead = stones_and_marked_dead_of_str(stonestr)
+    pool = ScratchPool()
+    uncached = territory_scoring(stones,marked_dead)
+    assert territory_scoring(stones,marked_dead,scratch=pool) == uncached
+    num_shapes = len(pool.eye_value_cache)
+    assert num_shapes > 0
+    assert territory_scoring(stones,marked_dead,scratch=pool) == uncached
+    assert len(pool.eye_value_cache) == num_shapes
+
+    # With colors swapped, every eye has the same shape relative to its owner.
+    swapped_stones = [[{EMPTY: EMPTY, BLACK: WHITE, WHITE: BLACK}[stone] for stone in row] for row in stones]
+    swapped = territory_scoring(swapped_stones,marked_dead,scratch=pool)
+    assert len(pool.eye_value_cache) == num_shapes
+    assert swapped == territory_scoring(swapped_stones,marked_dead)
+    assert [[locscore.eye_value for locscore in row] for row in swapped] == [[locscore.eye_value for locscore in row] for row in uncached]
+
+    pool.clear()
+    assert len(pool.eye_value_cache) == 0
+
+def test_eye_value_table(monkeypatch):
+    import random
+    import goscorer
+    from generate_eye_table import enumerate_shapes, eye_value_of_placement
+    table = goscorer.EYE_VALUE_TABLE
+    assert len(table) > 0
+    # Spot check the table against the full heuristics.
+    monkeypatch.setattr(goscorer, "EYE_VALUE_TABLE", {})
+    rand = random.Random(4321)
+    shapes = enumerate_shapes(goscorer.EYE_VALUE_TABLE_MAX_EYE_SIZE)
+    for shape in rand.sample(shapes,50):
+        height = max(y for (y,x) in shape) + 1
+        width = max(x for (y,x) in shape) + 1
+        dead_points = set(point for point in shape if len(shape) <= goscorer.EYE_VALUE_TABLE_MAX_DEAD_STONE_EYE_SIZE and rand.random() < 0.5)
+        mask = sum(1 << (y * width + x) for (y,x) in shape)
+        dead_mask = sum(1 << (y * width + x) for (y,x) in dead_points)
+        values = table[(height,width,mask,dead_mask)]
+        for offset_y in range(3):
+            for offset_x in range(3):
+                expected = values[0] if len(values) == 1 else values[offset_y * 3 + offset_x]
+                assert eye_value_of_placement(shape,dead_points,offset_y,offset_x) == int(expected)
+
 def test_empty():
     stonestr = """
     .........